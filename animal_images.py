@@ -0,0 +1,132 @@
+import math
+import os
+import tkinter as tk
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+
+class AnimalImages:
+    """
+    Optional pictures of the adult animals, read from images/<animal>.png.
+    Files are read on a worker thread ahead of time and decoded on the Tk thread (Tk images cannot be
+    made elsewhere) while the feedback screen is up. Showing a question never waits for the disk: a
+    picture that has not arrived yet is handed over when it does.
+    Decoded images are kept in an LRU cache bounded by their size in memory.
+    """
+
+    MAX_SIDE = 160  # Larger pictures are shrunk to fit this many pixels
+    POLL_MS = 15  # How often finished reads are checked for while any are pending
+
+    def __init__(self, root, directory="images", max_bytes=32 * 1024 * 1024):
+        """
+        Initializes the AnimalImages.
+        :param root: The main tkinter root window.
+        :param directory: Folder of <animal>.png files; missing or empty means no pictures.
+        :param max_bytes: Memory budget for decoded images (4 bytes per pixel).
+        """
+        self.root = root
+        self.max_bytes = max_bytes
+        self.images = OrderedDict()  # Lower-case animal -> (PhotoImage, bytes), least recently used first
+        self.total_bytes = 0
+        self.pending = {}  # Lower-case animal -> Future of the file's bytes
+        self.waiting = {}  # Lower-case animal -> callbacks to give the picture to once it is decoded
+        self.poll_id = None
+        self.executor = None
+        # The folder is listed once, so animals without a picture cost a single set lookup
+        self.paths = {}
+        if os.path.isdir(directory):
+            for file_name in os.listdir(directory):
+                stem, extension = os.path.splitext(file_name)
+                if extension.lower() == ".png":
+                    self.paths[stem.strip().lower()] = os.path.join(directory, file_name)
+
+    def prefetch(self, animal):
+        """Starts reading an animal's picture in the background if it is not cached already."""
+        key = animal.lower()
+        if key not in self.paths or key in self.images or key in self.pending:
+            return
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="animal-images")
+        self.pending[key] = self.executor.submit(read_file, self.paths[key])
+        if self.poll_id is None:
+            self.poll_id = self.root.after(self.POLL_MS, self.poll)
+
+    def poll(self):
+        """Decodes pictures whose files have finished reading; runs on the Tk thread."""
+        self.poll_id = None
+        for key, future in list(self.pending.items()):
+            if future.done():
+                self.finish(key)
+        if self.pending:
+            self.poll_id = self.root.after(self.POLL_MS, self.poll)
+
+    def get(self, animal, on_ready=None):
+        """
+        Returns the PhotoImage for an animal if it is ready, or None. Never waits for the disk.
+        :param animal: The animal's name.
+        :param on_ready: Optional callback given the PhotoImage on the Tk thread if it is still being read;
+            a picture that was not prefetched starts reading now.
+        """
+        key = animal.lower()
+        if key not in self.paths:
+            return None
+        if key not in self.images:
+            future = self.pending.get(key)
+            if future is not None and future.done():
+                self.finish(key)
+            else:
+                if on_ready is not None:
+                    self.waiting.setdefault(key, []).append(on_ready)
+                self.prefetch(animal)
+                return None
+        if key not in self.images:
+            return None
+        self.images.move_to_end(key)
+        return self.images[key][0]
+
+    def finish(self, key):
+        """Decodes a picture whose file has been read and hands it to anyone waiting for it."""
+        self.decode(key, self.pending.pop(key).result())
+        callbacks = self.waiting.pop(key, ())
+        if key in self.images:
+            for callback in callbacks:
+                callback(self.images[key][0])
+
+    def decode(self, key, data):
+        """Turns PNG bytes into a PhotoImage, shrinking it to MAX_SIDE, and caches it."""
+        if data is None:
+            return
+        try:
+            image = tk.PhotoImage(master=self.root, data=data, format="png")
+        except tk.TclError:
+            # Not a PNG Tk can read; leave this animal without a picture
+            del self.paths[key]
+            return
+        factor = math.ceil(max(image.width(), image.height()) / self.MAX_SIDE)
+        if factor > 1:
+            image = image.subsample(factor)
+        size = image.width() * image.height() * 4
+        self.images[key] = (image, size)
+        self.total_bytes += size
+        while self.total_bytes > self.max_bytes and len(self.images) > 1:
+            _, (_, evicted_size) = self.images.popitem(last=False)
+            self.total_bytes -= evicted_size
+
+    def close(self):
+        """Stops polling and lets the reader thread finish."""
+        self.waiting.clear()
+        if self.poll_id is not None:
+            self.root.after_cancel(self.poll_id)
+            self.poll_id = None
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+
+def read_file(path):
+    """Worker task: reads a picture's bytes, or returns None if it cannot be read."""
+    try:
+        with open(path, "rb") as file:
+            return file.read()
+    except OSError:
+        return None
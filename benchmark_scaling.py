@@ -0,0 +1,242 @@
+import argparse
+import csv
+import itertools
+import json
+import math
+import os
+import platform
+import random
+import tempfile
+import time
+from datetime import datetime, timezone
+
+from quiz_data import QuizData, SeenBitset
+
+# The most common young-names in animals_young_only.csv, most shared first
+COMMON_YOUNG_NAMES = ["calf", "pup", "chick", "cub", "joey", "kitten", "kit", "hatchling", "foal", "kid", "cria"]
+SYLLABLES = ["ka", "lo", "mi", "ru", "te", "no", "sa", "vi", "do", "pe", "zu", "ga", "li", "mo", "ta", "ne"]
+YOUNG_SUFFIXES = ["ling", "let", "y", "ette", "kin", ""]
+
+# Stages timed once per bank (seconds); every other stage is timed per call
+WHOLE_BANK_STAGES = ("load", "search_index")
+# Expected log-log slope of each stage. Whole-bank stages touch each row a constant number of times and
+# per-call stages should not depend on the bank at all, with two exceptions: typo matching walks a tree of
+# the distinct young-names, which grow with the square root of the bank, and substring search checks the
+# rows sharing the query's rarest trigram, which grow with the bank.
+EXPECTED_SLOPES = {
+    "load": 1.0,
+    "draw_deck": 0.0,
+    "draw_deck_profile": 0.0,
+    "make_question": 0.0,
+    "make_reverse_question": 0.0,
+    "is_correct": 0.0,
+    "resolve_answer": 0.5,
+    "search_index": 1.0,
+    "search": 1.0,
+}
+SLOPE_TOLERANCE = 0.25  # How far above its expected slope a stage may measure before it is flagged
+
+
+def syllable_word(number, length):
+    """Spells a number as a fixed count of syllables, so distinct numbers give distinct words."""
+    return "".join(SYLLABLES[(number >> (4 * i)) & 15] for i in range(length))
+
+
+def generate_bank(path, rows, seed=0):
+    """
+    Writes a synthetic Animal,Young bank with the real bank's skew: a few young-names ("calf", "pup")
+    are shared by many animals and most are rare. Distinct young-names grow with the square root of
+    the bank, as they would when more animals are catalogued, and follow a Zipf curve with exponent 1.2.
+    :param path: CSV file to write.
+    :param rows: Number of animals.
+    :param seed: Seed for the young-name draws.
+    """
+    rng = random.Random(seed)
+    distinct = max(len(COMMON_YOUNG_NAMES), round(31 * math.sqrt(rows / 113)))
+    young_names = list(COMMON_YOUNG_NAMES)
+    young_length = max(2, math.ceil(math.log(distinct, 16)))
+    for number in range(distinct - len(young_names)):
+        # Shared suffixes give the distractor index realistic families like duckling/gosling
+        young_names.append(syllable_word(number, young_length) + YOUNG_SUFFIXES[number % len(YOUNG_SUFFIXES)])
+    cumulative_weights = list(itertools.accumulate(1 / (rank + 1) ** 1.2 for rank in range(distinct)))
+    name_length = max(2, math.ceil(math.log(rows, 16)))
+    with open(path, "w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(["Animal", "Young"])
+        for start in range(0, rows, 10_000):
+            count = min(10_000, rows - start)
+            young = rng.choices(young_names, cum_weights=cumulative_weights, k=count)
+            writer.writerows((syllable_word(start + i, name_length).capitalize(), young[i]) for i in range(count))
+
+
+def time_calls(function, calls, repeats=3):
+    """Best-of-repeats seconds per call of function(i) over calls consecutive i."""
+    best = math.inf
+    for _ in range(repeats):
+        started = time.perf_counter()
+        for i in range(calls):
+            function(i)
+        best = min(best, (time.perf_counter() - started) / calls)
+    return best
+
+
+def benchmark_bank(path, calls=2000, seed=0):
+    """
+    Times each stage of the quiz on one bank.
+    :return: Stage name mapped to seconds (for the whole bank or per call).
+    """
+    timings = {}
+    started = time.perf_counter()
+    # No tier cache, so every run times the distractor scoring itself
+    quiz_data = QuizData(path, cache_directory=None)
+    timings["load"] = time.perf_counter() - started
+    count = len(quiz_data.questions)
+    rng = random.Random(seed)
+    indexes = [rng.randrange(count) for _ in range(calls)]
+
+    # Play.__init__: draw a ten-question deck, for an anonymous player and for one with a profile
+    timings["draw_deck"] = time_calls(lambda i: quiz_data.draw_deck(10, rng=rng), calls)
+    seen = SeenBitset(count)
+    for index in rng.sample(range(count), count // 3):
+        seen.add(index)
+    timings["draw_deck_profile"] = time_calls(lambda i: quiz_data.draw_deck(10, rng=rng, seen=seen), calls)
+
+    timings["make_question"] = time_calls(lambda i: quiz_data.make_question(indexes[i], "medium", rng), calls)
+    timings["make_reverse_question"] = time_calls(
+        lambda i: quiz_data.make_reverse_question(indexes[i], "medium", rng), calls)
+    questions = [quiz_data.make_question(index, "medium", rng) for index in indexes]
+    timings["is_correct"] = time_calls(lambda i: quiz_data.is_correct(questions[i], questions[i]["options"][0]),
+                                       calls)
+    # Typed answers with one typo in the middle
+    typed = [quiz_data.questions[index]["answer"] for index in indexes]
+    typed = [answer[:len(answer) // 2] + "x" + answer[len(answer) // 2 + 1:] for answer in typed]
+    timings["resolve_answer"] = time_calls(lambda i: quiz_data.resolve_answer(typed[i]), calls)
+
+    started = time.perf_counter()
+    search_index = quiz_data.get_search_index()
+    timings["search_index"] = time.perf_counter() - started
+    timings["search"] = time_calls(lambda i: search_index.search(quiz_data.questions[indexes[i]]["animal"][:4]),
+                                   min(calls, 200))
+    return timings
+
+
+def log_log_slope(sizes, seconds):
+    """Least-squares slope of log(time) against log(rows): about 0 for constant, 1 for linear stages."""
+    points = [(math.log(size), math.log(value)) for size, value in zip(sizes, seconds) if value > 0]
+    if len(points) < 2:
+        return 0.0
+    mean_x = sum(x for x, _ in points) / len(points)
+    mean_y = sum(y for _, y in points) / len(points)
+    spread = sum((x - mean_x) ** 2 for x, _ in points)
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / spread if spread else 0.0
+
+
+def run_suite(sizes, calls=2000, seed=0):
+    """
+    Generates a bank of each size, times every stage and fits its growth.
+    :return: Results ready to be saved as JSON.
+    """
+    results = {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "seed": seed,
+        "calls": calls,
+        "sizes": list(sizes),
+        "stages": {},
+    }
+    per_size = []
+    with tempfile.TemporaryDirectory() as directory:
+        for rows in sizes:
+            path = os.path.join(directory, f"bank_{rows}.csv")
+            started = time.perf_counter()
+            generate_bank(path, rows, seed)
+            generated = time.perf_counter() - started
+            timings = benchmark_bank(path, calls, seed)
+            os.remove(path)
+            per_size.append(timings)
+            print(f"{rows:>10} rows: generated in {generated:.2f}s, loaded in {timings['load']:.2f}s")
+
+    for stage in per_size[0]:
+        seconds = [timings[stage] for timings in per_size]
+        results["stages"][stage] = {
+            "unit": "seconds" if stage in WHOLE_BANK_STAGES else "seconds per call",
+            "seconds": seconds,
+            "slope": round(log_log_slope(sizes, seconds), 3),
+            "expected_slope": EXPECTED_SLOPES[stage],
+        }
+    return results
+
+
+def grows_too_fast(result):
+    """True if a stage's fitted slope is above its expected slope by more than SLOPE_TOLERANCE."""
+    return result["slope"] > result["expected_slope"] + SLOPE_TOLERANCE
+
+
+def print_results(results):
+    """Prints each stage's timings, fitted growth and expected growth."""
+    sizes = results["sizes"]
+    print(f"{'stage':<28}" + "".join(f"{rows:>12}" for rows in sizes) + f"{'slope':>8}{'expected':>10}")
+    for stage, result in results["stages"].items():
+        # Per-call stages in microseconds, whole-bank stages in milliseconds
+        scale, unit = (1e3, "ms") if result["unit"] == "seconds" else (1e6, "us")
+        print(f"{stage + ' (' + unit + ')':<28}" + "".join(f"{value * scale:>12.2f}" for value in result["seconds"])
+              + f"{result['slope']:>8.2f}{result['expected_slope']:>10.1f}"
+              + ("  too fast" if grows_too_fast(result) else ""))
+
+
+def compare_to_baseline(results, baseline, threshold=0.25):
+    """
+    Flags stages that grow faster than their expected slope, or got slower than the baseline by more than threshold.
+    :param threshold: Allowed slowdown as a fraction, e.g. 0.25 for 25%.
+    :return: Descriptions of each problem found; empty if none.
+    """
+    problems = []
+    baseline_sizes = baseline.get("sizes", [])
+    for stage, result in results["stages"].items():
+        if grows_too_fast(result):
+            problems.append(f"{stage}: grows faster than expected (slope {result['slope']:.2f}, "
+                            f"expected {result['expected_slope']:.1f})")
+        old = baseline.get("stages", {}).get(stage)
+        if old is None:
+            continue
+        if result["slope"] > old["slope"] + 0.2:
+            problems.append(f"{stage}: slope rose from {old['slope']:.2f} to {result['slope']:.2f}")
+        for rows, seconds in zip(results["sizes"], result["seconds"]):
+            if rows in baseline_sizes:
+                old_seconds = old["seconds"][baseline_sizes.index(rows)]
+                if old_seconds > 0 and seconds > old_seconds * (1 + threshold):
+                    problems.append(f"{stage} at {rows} rows: {seconds / old_seconds:.2f}x the baseline time")
+    return problems
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time how the quiz scales with synthetic question banks.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000, 1_000_000],
+                        help="bank sizes in rows (10000000 needs several GB of memory)")
+    parser.add_argument("--calls", type=int, default=2000, help="calls timed per per-call stage")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the banks and the draws")
+    parser.add_argument("--out", default="scaling_results.json", help="JSON file for the results")
+    parser.add_argument("--baseline", help="earlier results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown against the baseline")
+    args = parser.parse_args()
+
+    suite_results = run_suite(sorted(args.sizes), args.calls, args.seed)
+    print_results(suite_results)
+    with open(args.out, "w", encoding="utf-8") as out_file:
+        json.dump(suite_results, out_file, indent=2)
+    print(f"Results saved to '{args.out}'.")
+
+    if args.baseline:
+        try:
+            with open(args.baseline, encoding="utf-8") as baseline_file:
+                baseline_results = json.load(baseline_file)
+        except (OSError, ValueError) as error:
+            print(f"Error: could not read baseline '{args.baseline}': {error}")
+            raise SystemExit(1)
+        found = compare_to_baseline(suite_results, baseline_results, args.threshold)
+        for problem in found:
+            print(f"Error: {problem}")
+        if found:
+            raise SystemExit(1)
+        print(f"No stage is more than {args.threshold:.0%} slower than '{args.baseline}'.")
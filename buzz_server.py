@@ -0,0 +1,379 @@
+import argparse
+import asyncio
+import json
+import multiprocessing
+import random
+import sys
+import threading
+import time
+
+from quiz_data import QuizData
+
+
+class BuzzProtocol(asyncio.Protocol):
+    """One student's connection: JSON lines in, JSON lines out."""
+
+    def __init__(self, hub):
+        """
+        Initializes the BuzzProtocol.
+        :param hub: The BuzzHub this connection belongs to.
+        """
+        self.hub = hub
+        self.transport = None
+        self.buffer = b""
+        self.name = None
+        self.score = 0
+        self.answered = 0  # Number of the last question this player answered
+
+    def connection_made(self, transport):
+        """Remembers the transport; the player joins once they send their name."""
+        self.transport = transport
+
+    def data_received(self, data):
+        """Stamps the arrival time first, before any parsing, so answers are ordered as they reached the server."""
+        arrived_ns = time.monotonic_ns()
+        self.buffer += data
+        *lines, self.buffer = self.buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                self.hub.received(self, line, arrived_ns)
+
+    def connection_lost(self, exc):
+        """Leaves the game."""
+        self.hub.players.discard(self)
+
+    def send(self, message):
+        """Sends one message to this player only."""
+        self.transport.write((json.dumps(message, separators=(",", ":")) + "\n").encode("utf-8"))
+
+
+class BuzzHub:
+    """
+    Classroom buzz-in game: every player gets the same question at once and the fastest correct answers win points.
+    Each broadcast is serialized once and the same bytes are written to every connection, so fan-out cost is one
+    json.dumps plus a buffered write per player. Answers are ordered by the server's monotonic clock on arrival,
+    never by anything the client claims.
+    """
+
+    POINTS = (3, 2, 1)  # Points for the first, second and third correct answer to a question
+    MAX_BUFFERED_BYTES = 256 * 1024  # A player this far behind is disconnected rather than slowing everyone
+
+    def __init__(self, quiz_data, rounds=10, seconds=15.0, difficulty="medium", pause=3.0, rng=None):
+        """
+        Initializes the BuzzHub.
+        :param quiz_data: The QuizData object containing quiz questions.
+        :param rounds: Number of questions in the game.
+        :param seconds: Time allowed per question; a question also closes once everyone has answered.
+        :param difficulty: Distractor tier, one of "easy", "medium" or "hard".
+        :param pause: Seconds the result of each question stays up before the next one.
+        :param rng: Random number generator for the questions and options.
+        """
+        self.quiz_data = quiz_data
+        self.rounds = rounds
+        self.seconds = seconds
+        self.difficulty = difficulty
+        self.pause = pause
+        self.rng = rng or random.Random()
+        self.players = set()
+        self.joined = asyncio.Event()
+        self.all_answered = asyncio.Event()
+        self.number = 0
+        self.question_data = None  # The open question, or None between questions
+        self.correct_names = []  # Players who answered the open question correctly, fastest first
+        self.answer_count = 0
+        self.arrivals = []  # (question number, player name, arrival time in ns) for every answer
+        self.broadcast_ns = []  # Time spent serializing and writing each broadcast
+
+    async def start(self, host="127.0.0.1", port=8765):
+        """Starts listening; returns the asyncio server."""
+        loop = asyncio.get_running_loop()
+        return await loop.create_server(lambda: BuzzProtocol(self), host, port)
+
+    def received(self, player, line, arrived_ns):
+        """Handles one message from a player."""
+        try:
+            message = json.loads(line)
+            kind = message["type"]
+        except (ValueError, KeyError, TypeError):
+            player.send({"type": "error", "error": "Expected a JSON object with a type."})
+            return
+        if kind == "join":
+            self.join(player, str(message.get("name", "")).strip() or "Player")
+        elif kind == "answer" and player.name:
+            self.answer(player, message.get("number"), message.get("option"), arrived_ns)
+
+    def join(self, player, name):
+        """Adds a player, making their name unique in this game."""
+        taken = {other.name for other in self.players}
+        unique_name = name
+        suffix = 2
+        while unique_name in taken:
+            unique_name = f"{name} {suffix}"
+            suffix += 1
+        player.name = unique_name
+        self.players.add(player)
+        player.send({"type": "welcome", "name": unique_name})
+        if self.question_data:
+            player.send(self.question_message(time.monotonic_ns()))
+        self.joined.set()
+
+    def answer(self, player, number, option, arrived_ns):
+        """Records an answer to the open question; only a player's first answer counts."""
+        if self.question_data is None or number != self.number or player.answered == number:
+            return
+        player.answered = number
+        self.answer_count += 1
+        self.arrivals.append((number, player.name, arrived_ns))
+        if self.quiz_data.is_correct(self.question_data, str(option)):
+            place = len(self.correct_names)
+            self.correct_names.append(player.name)
+            if place < len(self.POINTS):
+                player.score += self.POINTS[place]
+                # Standings only change when points are won, at most len(POINTS) times a question
+                self.broadcast({"type": "standings", "standings": self.standings()})
+        if self.answer_count >= len(self.players):
+            self.all_answered.set()
+
+    def standings(self):
+        """Returns [name, score] pairs, highest score first."""
+        return sorted(([player.name, player.score] for player in self.players), key=lambda pair: (-pair[1], pair[0]))
+
+    def question_message(self, sent_ns):
+        """The open question as sent to players, with the server time it went out."""
+        return {"type": "question", "number": self.number, "question": self.question_data["question"],
+                "options": self.question_data["options"], "seconds": self.seconds, "sent_ns": sent_ns}
+
+    def broadcast(self, message):
+        """Serializes a message once and queues the same bytes on every connection."""
+        started = time.monotonic_ns()
+        data = (json.dumps(message, separators=(",", ":")) + "\n").encode("utf-8")
+        for player in list(self.players):
+            transport = player.transport
+            if transport.get_write_buffer_size() > self.MAX_BUFFERED_BYTES:
+                transport.abort()
+            else:
+                transport.write(data)
+        self.broadcast_ns.append(time.monotonic_ns() - started)
+
+    async def run_game(self, min_players=1, quiet=False):
+        """
+        Waits for enough players, then plays every round and announces the winner.
+        :param min_players: Players needed before the first question.
+        :param quiet: True to skip printing questions to the console (load tests).
+        """
+        while len(self.players) < min_players:
+            self.joined.clear()
+            await self.joined.wait()
+        deck = self.quiz_data.draw_deck(self.rounds, rng=self.rng)
+        for number, index in enumerate(deck, 1):
+            self.number = number
+            self.question_data = self.quiz_data.make_question(index, self.difficulty, rng=self.rng)
+            self.correct_names = []
+            self.answer_count = 0
+            self.all_answered.clear()
+            if not quiet:
+                # The console is what gets projected for the class
+                print(f"\nQuestion {self.number} of {len(deck)}: {self.question_data['question']}")
+                for i, option in enumerate(self.question_data["options"], 1):
+                    print(f"  {i}. {option}")
+            self.broadcast(self.question_message(time.monotonic_ns()))
+            try:
+                await asyncio.wait_for(self.all_answered.wait(), self.seconds)
+            except asyncio.TimeoutError:
+                pass
+            correct_option = self.question_data["options"][self.question_data["correct_index"]]
+            self.question_data = None
+            winner = self.correct_names[0] if self.correct_names else None
+            self.broadcast({"type": "result", "number": self.number, "answer": correct_option, "winner": winner,
+                            "standings": self.standings()})
+            if not quiet:
+                print(f"Answer: {correct_option}. " + (f"Fastest: {winner}." if winner else "Nobody got it."))
+            await asyncio.sleep(self.pause)
+        standings = self.standings()
+        self.broadcast({"type": "game_over", "standings": standings})
+        if not quiet:
+            print("\nFinal standings:")
+            for place, (name, score) in enumerate(standings, 1):
+                print(f"{place:>3}. {name:<20}{score:>4}")
+
+
+async def serve(bank, host, port, rounds, seconds, difficulty, min_players):
+    """Runs one game for a classroom."""
+    hub = BuzzHub(QuizData(bank), rounds, seconds, difficulty)
+    server = await hub.start(host, port)
+    print(f"Buzz-in hub on {host}:{port}; waiting for {min_players} player(s).")
+    async with server:
+        await hub.run_game(min_players)
+        await asyncio.sleep(1)  # Let the final standings reach everyone
+
+
+async def play(host, port, name):
+    """A plain terminal client for one student: type the option number and press Enter."""
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write((json.dumps({"type": "join", "name": name}) + "\n").encode("utf-8"))
+    loop = asyncio.get_running_loop()
+    current = {}  # The latest question; a slow typist answers whatever is on screen now
+
+    def typed(line):
+        if line is None:
+            print("\nInput closed; you can still watch the rest of the game.")
+        elif "question" in current and not writer.is_closing():
+            send_choice(writer, current["question"], line)
+
+    # A daemon thread, so a read still waiting for Enter never keeps the program open after the game
+    threading.Thread(target=read_lines, args=(loop, typed), name="buzz-stdin", daemon=True).start()
+    while True:
+        line = await reader.readline()
+        if not line:
+            break
+        message = json.loads(line)
+        if message["type"] == "welcome":
+            print(f"Joined as {message['name']}. Waiting for the first question...")
+        elif message["type"] == "question":
+            current["question"] = message
+            print(f"\n{message['question']}")
+            for i, option in enumerate(message["options"], 1):
+                print(f"  {i}. {option}")
+            print("Your answer (number): ", end="", flush=True)
+        elif message["type"] == "result":
+            print(f"Answer: {message['answer']}. " + (f"Fastest: {message['winner']}." if message["winner"] else ""))
+        elif message["type"] == "game_over":
+            print("\nFinal standings:")
+            for place, (player_name, score) in enumerate(message["standings"], 1):
+                print(f"{place:>3}. {player_name:<20}{score:>4}")
+            break
+    writer.close()
+
+
+def read_lines(loop, on_line):
+    """Input thread: hands each line typed on stdin to on_line on the event loop, then None once stdin closes."""
+    try:
+        for line in sys.stdin:
+            loop.call_soon_threadsafe(on_line, line)
+        loop.call_soon_threadsafe(on_line, None)
+    except RuntimeError:
+        pass  # The game ended and its loop closed while this thread waited for a line
+
+
+def send_choice(writer, question, typed):
+    """Sends the option a student typed by number."""
+    try:
+        option = question["options"][int(typed) - 1]
+    except (ValueError, IndexError):
+        print("Error: please type one of the option numbers.")
+        return
+    writer.write((json.dumps({"type": "answer", "number": question["number"], "option": option}) + "\n")
+                 .encode("utf-8"))
+
+
+async def simulated_client(port, name, rng, latencies, sends):
+    """A load-test student who answers each question at a random moment in the first 50 ms."""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write((json.dumps({"type": "join", "name": name}) + "\n").encode("utf-8"))
+    while True:
+        line = await reader.readline()
+        if not line:
+            break
+        received_ns = time.monotonic_ns()
+        message = json.loads(line)
+        if message["type"] == "question":
+            latencies.append(received_ns - message["sent_ns"])
+            await asyncio.sleep(rng.uniform(0, 0.05))
+            answer = {"type": "answer", "number": message["number"], "option": rng.choice(message["options"])}
+            sends.append((message["number"], name, time.monotonic_ns()))
+            writer.write((json.dumps(answer) + "\n").encode("utf-8"))
+        elif message["type"] == "game_over":
+            break
+    writer.close()
+
+
+def run_swarm(port, clients, seed, results):
+    """Load-test process: runs every simulated client and reports their measurements."""
+    async def swarm():
+        latencies = []
+        sends = []
+        rng = random.Random(seed)
+        await asyncio.gather(*(simulated_client(port, f"sim{i:03d}", random.Random(rng.random()), latencies, sends)
+                               for i in range(clients)))
+        return latencies, sends
+
+    results.put(asyncio.run(swarm()))
+
+
+def percentile(values, fraction):
+    """The value at a fraction of the way through the sorted values."""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+async def load_test(bank, clients, rounds, seed):
+    """
+    Plays a game against simulated clients in a separate process and measures fan-out latency and ordering fairness.
+    Both processes read the same system monotonic clock, so send and arrival times can be compared directly.
+    """
+    hub = BuzzHub(QuizData(bank), rounds, seconds=2.0, pause=0.05, rng=random.Random(seed))
+    server = await hub.start("127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    swarm = context.Process(target=run_swarm, args=(port, clients, seed, results))
+    swarm.start()
+    async with server:
+        await hub.run_game(clients, quiet=True)
+        latencies, sends = await asyncio.get_running_loop().run_in_executor(None, results.get)
+    swarm.join()
+
+    # Fairness: any two answers the server ordered differently from the order they were sent in
+    sent_at = {(number, name): sent_ns for number, name, sent_ns in sends}
+    inversions = pairs = 0
+    worst_gap_ns = 0
+    delays = []
+    for number in range(1, hub.number + 1):
+        arrivals = [(arrived_ns, sent_at[(number, name)]) for arrived_number, name, arrived_ns in hub.arrivals
+                    if arrived_number == number]
+        arrivals.sort()
+        delays.extend(arrived_ns - sent_ns for arrived_ns, sent_ns in arrivals)
+        for i, (_, earlier_sent) in enumerate(arrivals):
+            for _, later_sent in arrivals[i + 1:]:
+                pairs += 1
+                if later_sent < earlier_sent:
+                    inversions += 1
+                    worst_gap_ns = max(worst_gap_ns, earlier_sent - later_sent)
+
+    print(f"{clients} clients, {hub.number} questions, {len(hub.arrivals)} answers.")
+    print(f"Fan-out latency (server send to client receipt): median {percentile(latencies, 0.5) / 1e6:.2f} ms, "
+          f"99th percentile {percentile(latencies, 0.99) / 1e6:.2f} ms, worst {max(latencies) / 1e6:.2f} ms")
+    print(f"Broadcast cost (serialize once + write to all): median {percentile(hub.broadcast_ns, 0.5) / 1e3:.1f} us")
+    print(f"Answer delivery (client send to server stamp): median {percentile(delays, 0.5) / 1e6:.2f} ms, "
+          f"99th percentile {percentile(delays, 0.99) / 1e6:.2f} ms")
+    print(f"Ordering: {inversions} of {pairs} answer pairs stamped out of send order"
+          + (f", worst by {worst_gap_ns / 1e6:.3f} ms" if inversions else ""))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Classroom buzz-in quiz over the local network.")
+    parser.add_argument("--bank", default="animals_young_only.csv", help="CSV file of animals and young-names")
+    commands = parser.add_subparsers(dest="command", required=True)
+    serve_parser = commands.add_parser("serve", help="run a game for a class")
+    serve_parser.add_argument("--host", default="127.0.0.1", help="address to listen on; 0.0.0.0 for the LAN")
+    serve_parser.add_argument("--port", type=int, default=8765)
+    serve_parser.add_argument("--rounds", type=int, default=10)
+    serve_parser.add_argument("--seconds", type=float, default=15.0, help="time allowed per question")
+    serve_parser.add_argument("--difficulty", choices=("easy", "medium", "hard"), default="medium")
+    serve_parser.add_argument("--players", type=int, default=1, help="players to wait for before starting")
+    play_parser = commands.add_parser("play", help="join a game from a terminal")
+    play_parser.add_argument("name")
+    play_parser.add_argument("--host", default="127.0.0.1")
+    play_parser.add_argument("--port", type=int, default=8765)
+    test_parser = commands.add_parser("load-test", help="measure fan-out latency and fairness with simulated clients")
+    test_parser.add_argument("--clients", type=int, default=30)
+    test_parser.add_argument("--rounds", type=int, default=20)
+    test_parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        asyncio.run(serve(args.bank, args.host, args.port, args.rounds, args.seconds, args.difficulty, args.players))
+    elif args.command == "play":
+        asyncio.run(play(args.host, args.port, args.name))
+    else:
+        asyncio.run(load_test(args.bank, args.clients, args.rounds, args.seed))
@@ -0,0 +1,185 @@
+import argparse
+import atexit
+import glob
+import gzip
+import json
+import os
+import queue
+import shutil
+import tempfile
+import threading
+import time
+from collections import deque
+
+
+class EventLog:
+    """
+    JSON-lines event log for quiz sessions.
+    emit() only appends a tuple to a deque, so the Tk thread never formats or writes anything.
+    A writer thread turns batches into lines, flushing when enough events are waiting or a
+    time limit passes, and starts a new segment when the file grows too big. Closed segments
+    are gzipped on another thread.
+    """
+
+    def __init__(self, path=os.path.join("logs", "events.jsonl"), flush_events=256, flush_seconds=1.0,
+                 max_segment_bytes=8 * 1024 * 1024):
+        """
+        Initializes the EventLog and starts its writer thread.
+        :param path: The live segment; closed ones sit next to it as <name>-<time>-<n>.jsonl.gz.
+        :param flush_events: Write as soon as this many events are waiting.
+        :param flush_seconds: Otherwise write this long after the first waiting event.
+        :param max_segment_bytes: Start a new segment once the live one reaches this size.
+        """
+        self.path = path
+        self.flush_events = flush_events
+        self.flush_seconds = flush_seconds
+        self.max_segment_bytes = max_segment_bytes
+        self.queue = deque()
+        self.wakeup = threading.Event()  # Set by the first event of a batch
+        self.full = threading.Event()  # Set once flush_events are waiting
+        self.closed = False
+        self.segments = 0
+        directory = os.path.dirname(path) or "."
+        os.makedirs(directory, exist_ok=True)
+        self.file = open(path, "a", encoding="utf-8")
+        # Closed segments waiting for gzip, including any an earlier run left uncompressed
+        self.closed_segments = queue.SimpleQueue()
+        for segment in glob.glob(self.segment_prefix() + "*.jsonl"):
+            self.closed_segments.put(segment)
+        self.compressor = threading.Thread(target=self.compress_closed_segments, name="event-log-gzip", daemon=True)
+        self.compressor.start()
+        self.writer = threading.Thread(target=self.run, name="event-log-writer", daemon=True)
+        self.writer.start()
+        atexit.register(self.close)
+
+    def segment_prefix(self):
+        """Start of the file names of closed segments."""
+        return os.path.splitext(self.path)[0] + "-"
+
+    def emit(self, event, **fields):
+        """Records an event; the only work on the calling thread is a deque append."""
+        waiting_events = self.queue
+        waiting_events.append((time.time(), event, fields))
+        waiting = len(waiting_events)
+        if waiting == 1:
+            self.wakeup.set()
+        elif waiting >= self.flush_events:
+            self.full.set()
+
+    def run(self):
+        """Writer thread: waits for a batch to fill up or age, then writes it out."""
+        while True:
+            self.wakeup.wait()
+            if not self.closed:
+                self.full.wait(self.flush_seconds)
+            # Cleared before draining, so an event arriving during the write wakes the next round
+            self.wakeup.clear()
+            self.full.clear()
+            self.write_waiting()
+            if self.closed and not self.queue:
+                break
+
+    def write_waiting(self):
+        """Writes every waiting event as one line of JSON, rotating the segment whenever it is full."""
+        waiting_events = self.queue
+        while waiting_events:
+            # Written in slices of flush_events so a large backlog still rotates near the size limit
+            lines = []
+            while waiting_events and len(lines) < self.flush_events:
+                timestamp, event, fields = waiting_events.popleft()
+                record = {"t": timestamp, "event": event}
+                record.update(fields)
+                lines.append(json.dumps(record, separators=(",", ":")))
+            self.file.write("\n".join(lines) + "\n")
+            if self.file.tell() >= self.max_segment_bytes:
+                self.rotate()
+        self.file.flush()
+
+    def rotate(self):
+        """Closes the live segment, renames it and hands it to the compressor."""
+        self.file.close()
+        self.segments += 1
+        segment = f"{self.segment_prefix()}{time.strftime('%Y%m%d-%H%M%S')}-{self.segments}.jsonl"
+        os.replace(self.path, segment)
+        self.file = open(self.path, "a", encoding="utf-8")
+        self.closed_segments.put(segment)
+
+    def compress_closed_segments(self):
+        """Compressor thread: gzips closed segments until the log is closed."""
+        while True:
+            segment = self.closed_segments.get()
+            if segment is None:
+                break
+            compress_segment(segment)
+
+    def close(self):
+        """Writes everything still waiting and waits for compression to finish."""
+        if self.closed:
+            return
+        self.closed = True
+        self.wakeup.set()
+        self.full.set()
+        self.writer.join()
+        self.file.close()
+        self.closed_segments.put(None)
+        self.compressor.join()
+
+
+def compress_segment(segment):
+    """Gzips a closed segment next to itself and removes the original."""
+    temp_path = segment + ".gz.tmp"
+    with open(segment, "rb") as source, gzip.open(temp_path, "wb") as target:
+        shutil.copyfileobj(source, target)
+    os.replace(temp_path, segment + ".gz")
+    os.remove(segment)
+
+
+def benchmark(events=200_000, max_segment_bytes=4 * 1024 * 1024):
+    """
+    Measures emit() on the calling thread and checks that every event reaches the disk.
+    Events are timed one by one in UI-like bursts (a few events, then a pause), then all at once in
+    a tight loop, where the caller also competes with the writer thread for the interpreter.
+    :return: Median microseconds per emit() call in the paced run.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        event_log = EventLog(os.path.join(directory, "events.jsonl"), max_segment_bytes=max_segment_bytes)
+        paced = []
+        for i in range(min(events, 20_000)):
+            started = time.perf_counter_ns()
+            event_log.emit("answer", session="0123456789abcdef0123456789abcdef", round=i % 10, animal="Kangaroo",
+                           answer="Joey", correct=True, seconds=1.25)
+            paced.append(time.perf_counter_ns() - started)
+            if i % 4 == 3:
+                time.sleep(0.0002)
+        paced.sort()
+
+        started = time.perf_counter()
+        for i in range(events):
+            event_log.emit("answer", session="0123456789abcdef0123456789abcdef", round=i % 10, animal="Kangaroo",
+                           answer="Joey", correct=True, seconds=1.25)
+        emit_seconds = time.perf_counter() - started
+        event_log.close()
+        drain_seconds = time.perf_counter() - started - emit_seconds
+        events += len(paced)
+
+        written = 0
+        for segment in glob.glob(os.path.join(directory, "events*")):
+            opener = gzip.open if segment.endswith(".gz") else open
+            with opener(segment, "rt", encoding="utf-8") as file:
+                written += sum(1 for _ in file)
+        median = paced[len(paced) // 2] / 1000
+        print(f"emit, paced: median {median:.2f} us, 99th percentile {paced[int(0.99 * len(paced))] / 1000:.2f} us "
+              f"({len(paced)} events)")
+        print(f"emit, tight loop: {emit_seconds / (events - len(paced)) * 1e6:.2f} us/event; writer finished "
+              f"{drain_seconds:.2f}s later; {event_log.segments} segments rotated; {written} lines on disk.")
+        if written != events:
+            print(f"Error: {events - written} events were not written.")
+        return median
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the quiz event log.")
+    parser.add_argument("--events", type=int, default=200_000, help="events to emit")
+    parser.add_argument("--segment-bytes", type=int, default=4 * 1024 * 1024, help="rotation size")
+    args = parser.parse_args()
+    benchmark(args.events, args.segment_bytes)
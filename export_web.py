@@ -0,0 +1,286 @@
+import argparse
+import glob
+import gzip
+import hashlib
+import json
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from localization import load_catalog
+from quiz_data import QuizData
+from worksheet_generator import RANK_STRIDE, count_decks, paper_rank, unrank_deck
+
+CHUNK_PATTERN = "decks-{number:04d}.{digest}.js"
+UI_MESSAGES = ["Welcome to the Young Animal Quiz!", "Question {number} of {total}", "Score: {score}", "Correct!",
+               "Incorrect! The correct answer is {answer}.", "Next Question",
+               "End of {rounds} rounds. Your final score is {score}", "Play Again",
+               "Could not load the questions."]
+
+# The whole page: inline styles and plain ES5 script, so there is nothing else to fetch before it is usable.
+# __LANG__ and __MANIFEST__ are filled in by write_page.
+PAGE = """<!DOCTYPE html>
+<html lang="__LANG__">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title></title>
+<style>
+body{font-family:Arial,sans-serif;background:#d5e8d4;color:#222;margin:0;padding:1em;text-align:center}
+main{max-width:36em;margin:0 auto}
+button{display:block;width:100%;margin:.5em 0;padding:.8em;font:inherit;font-size:1.1em;border:2px solid #82b366;
+background:#fff;border-radius:6px;cursor:pointer}
+button:disabled{cursor:default;color:#222}
+.right{background:#b9e0a5}.wrong{background:#f8cecc}
+#status{display:flex;justify-content:space-between;font-size:.9em}
+</style>
+</head>
+<body>
+<main>
+<h1 id="title"></h1>
+<div id="status"><span id="progress"></span><span id="score"></span></div>
+<h2 id="question"></h2>
+<div id="options"></div>
+<p id="feedback"></p>
+<button id="next" hidden></button>
+</main>
+<script>
+(function () {
+  var manifest = __MANIFEST__;
+  var ui = manifest.ui;
+  var chunks = {};
+  var waiting = {};
+  var state = {};
+  function $(id) { return document.getElementById(id); }
+  function fill(text, values) {
+    return text.replace(/\\{(\\w+)\\}/g, function (field, name) { return name in values ? values[name] : field; });
+  }
+  // Chunks are JSON wrapped in a call, so they load with a script tag even from a page opened as a file
+  window.quizChunk = function (number, chunk) {
+    chunks[number] = chunk;
+    var callbacks = waiting[number] || [];
+    delete waiting[number];
+    for (var i = 0; i < callbacks.length; i++) { callbacks[i](chunk); }
+  };
+  function withChunk(number, callback) {
+    if (chunks[number]) { callback(chunks[number]); return; }
+    if (waiting[number]) { waiting[number].push(callback); return; }
+    waiting[number] = [callback];
+    var script = document.createElement("script");
+    script.src = manifest.chunks[number];
+    script.charset = "utf-8";
+    script.onerror = function () { $("question").textContent = ui["Could not load the questions."]; };
+    document.head.appendChild(script);
+  }
+  function startDeck(deck) {
+    var number = Math.floor(deck / manifest.chunkSize);
+    withChunk(number, function (chunk) {
+      state = {deck: deck, strings: chunk.strings, questions: chunk.decks[deck - number * manifest.chunkSize],
+               position: 0, score: 0};
+      showQuestion();
+    });
+    // Fetch the chunk after this one while the player is busy, so playing again never waits
+    var following = (number + 1) % manifest.chunks.length;
+    if (!chunks[following] && !waiting[following]) {
+      setTimeout(function () { withChunk(following, function () {}); }, 2000);
+    }
+  }
+  function showQuestion() {
+    var total = state.questions.length / 6;
+    var base = state.position * 6;
+    var animal = state.strings[state.questions[base]];
+    $("progress").textContent = fill(ui["Question {number} of {total}"], {number: state.position + 1, total: total});
+    $("score").textContent = fill(ui["Score: {score}"], {score: state.score});
+    $("question").textContent = manifest.question[0] + animal + manifest.question[1];
+    $("feedback").textContent = "";
+    $("next").hidden = true;
+    var options = $("options");
+    options.textContent = "";
+    for (var i = 0; i < 4; i++) {
+      var button = document.createElement("button");
+      button.textContent = state.strings[state.questions[base + 1 + i]];
+      button.onclick = answer.bind(null, i);
+      options.appendChild(button);
+    }
+    options.firstChild.focus();
+  }
+  function answer(choice) {
+    var base = state.position * 6;
+    var correct = state.questions[base + 5];
+    var buttons = $("options").childNodes;
+    if (buttons[0].disabled) { return; }
+    for (var i = 0; i < buttons.length; i++) { buttons[i].disabled = true; }
+    buttons[correct].className = "right";
+    if (choice === correct) {
+      state.score++;
+      $("feedback").textContent = ui["Correct!"];
+    } else {
+      buttons[choice].className = "wrong";
+      $("feedback").textContent = fill(ui["Incorrect! The correct answer is {answer}."],
+                                       {answer: buttons[correct].textContent});
+    }
+    $("score").textContent = fill(ui["Score: {score}"], {score: state.score});
+    state.position++;
+    var finished = state.position * 6 >= state.questions.length;
+    $("next").textContent = finished ? ui["Play Again"] : ui["Next Question"];
+    $("next").hidden = false;
+    $("next").focus();
+    if (finished) {
+      $("question").textContent = fill(ui["End of {rounds} rounds. Your final score is {score}"],
+                                       {rounds: state.position, score: state.score});
+    }
+  }
+  $("next").onclick = function () {
+    if (state.position * 6 < state.questions.length) { showQuestion(); }
+    else { startDeck((state.deck + 1) % manifest.decks); }
+  };
+  document.onkeydown = function (event) {
+    var choice = event.keyCode - 49;  // Keys 1 to 4 pick an option
+    if (choice >= 0 && choice < 4 && $("options").childNodes[choice]) { answer(choice); }
+  };
+  document.title = $("title").textContent = ui["Welcome to the Young Animal Quiz!"];
+  // ?deck=N replays a particular deck, e.g. the same one for a whole class
+  var match = /[?&]deck=(\\d+)/.exec(location.search);
+  startDeck(match ? Number(match[1]) % manifest.decks : Math.floor(Math.random() * manifest.decks));
+})();
+</script>
+</body>
+</html>
+"""
+
+# Each worker process loads the bank once and keeps it here
+worker_quiz_data = None
+
+
+def load_worker_bank(csv_file, locale, seed):
+    """Process pool initializer: loads the question bank once per worker."""
+    global worker_quiz_data
+    # Large banks draw distractor candidates from this rng, so every worker builds the export seed's tiers
+    worker_quiz_data = QuizData(csv_file, catalog=load_catalog(locale), rng=random.Random(seed))
+
+
+def build_chunk(job):
+    """
+    Worker task: precomputes one chunk of decks and writes it under a name made from its content.
+    Each question is six integers: the animal, the four options and the correct option's position. They index
+    the chunk's own string table, so the page needs nothing but this one file, and long runs of small numbers
+    compress well.
+    :param job: Tuple of (chunk number, settings dict).
+    :return: (chunk number, file name, bytes, gzipped bytes).
+    """
+    number, settings = job
+    quiz_data = worker_quiz_data
+    bank_size = len(quiz_data.questions)
+    string_ids = {}
+    decks = []
+    first = number * settings["chunk_size"]
+    for deck_number in range(first, min(first + settings["chunk_size"], settings["decks"])):
+        rank = paper_rank(deck_number, settings["first_rank"], settings["total"])
+        # Options are shuffled from a per-deck seed, so the same seed always exports the same files
+        rng = random.Random(settings["seed"] * RANK_STRIDE + deck_number)
+        deck = []
+        for index in unrank_deck(rank, bank_size, settings["rounds"]):
+            question_data = quiz_data.make_question(index, settings["difficulty"], rng)
+            for text in [quiz_data.questions[index]["animal"]] + question_data["options"]:
+                deck.append(string_ids.setdefault(text, len(string_ids)))
+            deck.append(question_data["correct_index"])
+        decks.append(deck)
+
+    payload = json.dumps({"strings": list(string_ids), "decks": decks}, ensure_ascii=False, separators=(",", ":"))
+    data = f"quizChunk({number},{payload});\n".encode("utf-8")
+    file_name = CHUNK_PATTERN.format(number=number, digest=hashlib.sha256(data).hexdigest()[:12])
+    path = os.path.join(settings["out"], "data", file_name)
+    if not os.path.exists(path):  # Same name, same content: an unchanged chunk is left alone
+        with open(path + ".tmp", "wb") as file:
+            file.write(data)
+        os.replace(path + ".tmp", path)
+    return number, file_name, len(data), len(gzip.compress(data, 6))
+
+
+def write_page(out, manifest, locale):
+    """Writes index.html with the manifest inlined; the page itself is never cached under a hashed name."""
+    script_safe = json.dumps(manifest, ensure_ascii=False, separators=(",", ":")).replace("</", "<\\/")
+    page = PAGE.replace("__LANG__", locale).replace("__MANIFEST__", script_safe)
+    path = os.path.join(out, "index.html")
+    with open(path + ".tmp", "w", encoding="utf-8") as file:
+        file.write(page)
+    os.replace(path + ".tmp", path)
+
+
+def export(csv_file, out="web_quiz", decks=5000, rounds=10, difficulty="medium", locale=None, seed=None,
+           workers=None, chunk_size=256):
+    """
+    Exports a self-contained static quiz: index.html plus data/ chunks of precomputed decks.
+    :param csv_file: Question bank to draw from.
+    :param out: Output folder.
+    :param decks: Number of distinct decks to precompute.
+    :param rounds: Questions per deck.
+    :param difficulty: Distractor tier, one of "easy", "medium" or "hard".
+    :param locale: Language of the page and questions, e.g. "es"; English if not given.
+    :param seed: Export seed; the same seed exports the same decks and file names.
+    :param workers: Number of worker processes (default: one per core).
+    :param chunk_size: Decks per chunk file.
+    :return: (chunk results, seconds taken).
+    """
+    catalog = load_catalog(locale)
+    seed = random.randrange(2 ** 32) if seed is None else seed
+    # Loading the bank here also caches its distractor tiers before the workers load it
+    bank_size = len(QuizData(csv_file, catalog=catalog, rng=random.Random(seed)).questions)
+    if not 1 <= rounds <= bank_size:
+        raise ValueError(f"Questions per deck must be between 1 and {bank_size}.")
+    total = count_decks(bank_size, rounds)
+    if decks > total:
+        raise ValueError(f"The bank only has {total} distinct question orders for {rounds} questions.")
+
+    settings = {"rounds": rounds, "difficulty": difficulty, "seed": seed, "decks": decks, "chunk_size": chunk_size,
+                "first_rank": random.Random(seed).randrange(total), "total": total, "out": out}
+    os.makedirs(os.path.join(out, "data"), exist_ok=True)
+    jobs = [(number, settings) for number in range(-(-decks // chunk_size))]
+
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=load_worker_bank,
+                             initargs=(csv_file, catalog.locale, seed)) as pool:
+        results = list(pool.map(build_chunk, jobs))
+
+    # The question is split around the animal here once, so the page only joins strings
+    question = catalog.template("What is a baby {animal} called?")
+    affixes = question.around("animal") or (question.plain, "")
+    manifest = {"decks": decks, "chunkSize": chunk_size, "question": affixes,
+                "chunks": [f"data/{file_name}" for _, file_name, _, _ in results],
+                "ui": {message: catalog.translations.gettext(message) for message in UI_MESSAGES}}
+    write_page(out, manifest, catalog.locale)
+
+    # Chunks from earlier exports are no longer referenced by the page
+    current = {file_name for _, file_name, _, _ in results}
+    for path in glob.glob(os.path.join(out, "data", "decks-*.js")):
+        if os.path.basename(path) not in current:
+            os.remove(path)
+    return results, time.perf_counter() - started
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export the quiz as a static web page that needs no Python.")
+    parser.add_argument("--bank", default="animals_young_only.csv", help="CSV file of animals and young-names")
+    parser.add_argument("--out", default="web_quiz", help="output folder")
+    parser.add_argument("--decks", type=int, default=5000, help="number of precomputed decks")
+    parser.add_argument("--rounds", type=int, default=10, help="questions per deck")
+    parser.add_argument("--difficulty", choices=("easy", "medium", "hard"), default="medium")
+    parser.add_argument("--locale", help="language of the page, e.g. es (default: English)")
+    parser.add_argument("--seed", type=int, help="export seed for reproducible decks")
+    parser.add_argument("--workers", type=int, help="worker processes (default: one per core)")
+    parser.add_argument("--chunk-size", type=int, default=256, help="decks per chunk file")
+    args = parser.parse_args()
+
+    try:
+        chunk_results, seconds = export(args.bank, args.out, args.decks, args.rounds, args.difficulty, args.locale,
+                                        args.seed, args.workers, args.chunk_size)
+    except ValueError as error:
+        print(f"Error: {error}")
+        raise SystemExit(1)
+    raw_bytes = sum(size for _, _, size, _ in chunk_results)
+    gzipped_bytes = sum(size for _, _, _, size in chunk_results)
+    print(f"Exported {args.decks} decks in {len(chunk_results)} chunks to '{args.out}' in {seconds:.2f}s "
+          f"({args.decks / seconds:.0f} decks/sec).")
+    print(f"Each chunk averages {raw_bytes / len(chunk_results) / 1024:.1f} KB, "
+          f"{gzipped_bytes / len(chunk_results) / 1024:.1f} KB gzipped; open '{args.out}/index.html' to play.")
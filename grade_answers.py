@@ -0,0 +1,227 @@
+import argparse
+import csv
+import itertools
+import time
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+LETTER_CODES = {letter: code for code, letter in enumerate("abcd")}
+# Written-out answers are coded after the four letters
+TEXT_CODE_OFFSET = len(LETTER_CODES)
+
+
+class AnswerKey:
+    """Correct answers for every (paper, question) slot of a worksheet batch, stored as flat columns."""
+
+    def __init__(self, key_file):
+        """
+        Reads an answer_key.csv as written by worksheet_generator.py.
+        :param key_file: CSV with paper, question, animal, letter and answer columns.
+        """
+        with open(key_file, newline="", encoding="utf-8") as file:
+            rows = list(csv.DictReader(file))
+        self.questions_per_paper = max((int(row["question"]) for row in rows), default=1)
+        self.papers = max((int(row["paper"]) for row in rows), default=0) + 1
+
+        # One extra slot at the end catches answers for papers or questions that are not in the key
+        slots = self.papers * self.questions_per_paper + 1
+        self.letter_codes = [-1] * slots
+        self.text_codes = [-1] * slots
+        self.animal_ids = [0] * slots
+        self.animals = []
+        self.text_ids = {}
+        animal_ids = {}
+        for row in rows:
+            slot = self.slot(int(row["paper"]), int(row["question"]))
+            self.letter_codes[slot] = LETTER_CODES[row["letter"].lower()]
+            text_id = self.text_ids.setdefault(row["answer"].strip().lower(), len(self.text_ids))
+            self.text_codes[slot] = TEXT_CODE_OFFSET + text_id
+            self.animal_ids[slot] = animal_ids.setdefault(row["animal"], len(animal_ids))
+        self.animals = list(animal_ids)
+
+        # Every recognised answer spelling and its code, so coding an answer is one dict lookup
+        self.answer_codes = dict(LETTER_CODES)
+        self.answer_codes.update((text, TEXT_CODE_OFFSET + text_id) for text, text_id in self.text_ids.items())
+
+    def slot(self, paper, question):
+        """Returns the flat column position for a paper's question, or the catch-all slot."""
+        if 0 <= paper < self.papers and 1 <= question <= self.questions_per_paper:
+            return paper * self.questions_per_paper + question - 1
+        return len(self.letter_codes) - 1
+
+    def answer_code(self, answer):
+        """Codes a student's answer: 0-3 for letters a-d, higher for a written young-name, -1 if unknown."""
+        return self.answer_codes.get(answer.strip().lower(), -1)
+
+
+def parse_numbers(cells):
+    """
+    Converts a column of paper or question numbers to integers. A blank or garbled cell becomes -1,
+    which is outside every key, so its row is counted as skipped instead of ending the run.
+    """
+    try:
+        return list(map(int, cells))
+    except ValueError:
+        numbers = []
+        for cell in cells:
+            try:
+                numbers.append(int(cell))
+            except ValueError:
+                numbers.append(-1)
+        return numbers
+
+
+class Grader:
+    """Scores answer sheets against an AnswerKey in chunks, using NumPy when it is installed."""
+
+    def __init__(self, key, use_numpy=True):
+        """
+        Initializes the Grader.
+        :param key: The AnswerKey to mark against.
+        :param use_numpy: Set to False to force the pure Python scoring path.
+        """
+        self.key = key
+        self.use_numpy = use_numpy and numpy is not None
+        self.student_ids = {}
+        self.student_answered = []
+        self.student_correct = []
+        self.animal_attempts = [0] * len(key.animals)
+        self.animal_correct = [0] * len(key.animals)
+        self.rows_graded = 0
+        self.rows_skipped = 0
+        if self.use_numpy:
+            # Key columns and running totals live in arrays so each chunk adds in place
+            self.letter_codes = numpy.array(key.letter_codes, dtype=numpy.int32)
+            self.text_codes = numpy.array(key.text_codes, dtype=numpy.int32)
+            self.animal_ids = numpy.array(key.animal_ids, dtype=numpy.int64)
+            self.student_answered = numpy.zeros(0, dtype=numpy.int64)
+            self.student_correct = numpy.zeros(0, dtype=numpy.int64)
+            self.animal_attempts = numpy.zeros(len(key.animals), dtype=numpy.int64)
+            self.animal_correct = numpy.zeros(len(key.animals), dtype=numpy.int64)
+
+    def grade_file(self, sheet_file, chunk_size=100_000):
+        """
+        Streams an answer sheet CSV through the grader, one chunk of rows at a time.
+        :param sheet_file: CSV with student, paper, question and answer columns.
+        :param chunk_size: Rows held in memory at once.
+        """
+        with open(sheet_file, newline="", encoding="utf-8") as file:
+            reader = csv.reader(file)
+            header = [column.strip().lower() for column in next(reader)]
+            columns = [header.index(name) for name in ("student", "paper", "question", "answer")]
+            while True:
+                chunk = list(itertools.islice(reader, chunk_size))
+                if not chunk:
+                    break
+                self.grade_chunk([[row[column] for column in columns] for row in chunk])
+
+    def grade_chunk(self, rows):
+        """Scores one chunk of (student, paper, question, answer) rows."""
+        student_ids = self.student_ids
+        students = [student_ids.setdefault(row[0], len(student_ids)) for row in rows]
+        answer_codes = self.key.answer_codes
+        codes = [answer_codes.get(row[3].strip().lower(), -1) for row in rows]
+
+        new_students = len(student_ids) - len(self.student_answered)
+        if self.use_numpy:
+            padding = numpy.zeros(new_students, dtype=numpy.int64)
+            self.student_answered = numpy.concatenate((self.student_answered, padding))
+            self.student_correct = numpy.concatenate((self.student_correct, padding))
+            self.score_with_numpy(students, parse_numbers([row[1] for row in rows]),
+                                  parse_numbers([row[2] for row in rows]), codes)
+        else:
+            self.student_answered.extend([0] * new_students)
+            self.student_correct.extend([0] * new_students)
+            slots = [self.key.slot(paper, question) for paper, question in
+                     zip(parse_numbers([row[1] for row in rows]), parse_numbers([row[2] for row in rows]))]
+            self.score_with_python(students, slots, codes)
+
+    def score_with_numpy(self, student_ids, papers, questions, codes):
+        """Vectorized scoring: slot arithmetic, one fancy-index lookup, comparison and bincount per column."""
+        key = self.key
+        papers = numpy.array(papers, dtype=numpy.int64)
+        questions = numpy.array(questions, dtype=numpy.int64)
+        in_key = (papers >= 0) & (papers < key.papers) & (questions >= 1) & (questions <= key.questions_per_paper)
+        slots = numpy.where(in_key, papers * key.questions_per_paper + questions - 1, len(key.letter_codes) - 1)
+        codes = numpy.array(codes, dtype=numpy.int32)
+        students = numpy.array(student_ids, dtype=numpy.int64)
+
+        valid = self.letter_codes[slots] >= 0
+        correct = valid & ((codes == self.letter_codes[slots]) | (codes == self.text_codes[slots]))
+        self.rows_graded += int(valid.sum())
+        self.rows_skipped += int(len(slots) - valid.sum())
+
+        size = len(self.student_answered)
+        self.student_answered += numpy.bincount(students[valid], minlength=size)
+        self.student_correct += numpy.bincount(students[correct], minlength=size)
+
+        animals = self.animal_ids[slots]
+        self.animal_attempts += numpy.bincount(animals[valid], minlength=len(self.animal_attempts))
+        self.animal_correct += numpy.bincount(animals[correct], minlength=len(self.animal_attempts))
+
+    def score_with_python(self, student_ids, slots, codes):
+        """Pure Python fallback with the same results as score_with_numpy."""
+        key = self.key
+        for student, slot, code in zip(student_ids, slots, codes):
+            letter_code = key.letter_codes[slot]
+            if letter_code < 0:
+                self.rows_skipped += 1
+                continue
+            self.rows_graded += 1
+            is_correct = code == letter_code or code == key.text_codes[slot]
+            animal = key.animal_ids[slot]
+            self.student_answered[student] += 1
+            self.animal_attempts[animal] += 1
+            if is_correct:
+                self.student_correct[student] += 1
+                self.animal_correct[animal] += 1
+
+    def write_scores(self, scores_file):
+        """Writes one row per student: answered, correct and percentage score."""
+        with open(scores_file, "w", newline="", encoding="utf-8") as file:
+            writer = csv.writer(file)
+            writer.writerow(["student", "answered", "correct", "percent"])
+            answered_counts = list(map(int, self.student_answered))
+            correct_counts = list(map(int, self.student_correct))
+            for student, student_id in self.student_ids.items():
+                answered = answered_counts[student_id]
+                correct = correct_counts[student_id]
+                writer.writerow([student, answered, correct, f"{100 * correct / answered:.1f}" if answered else ""])
+
+    def write_question_stats(self, stats_file):
+        """Writes per-animal difficulty: attempts, correct answers and p-value (share correct), hardest first."""
+        rows = []
+        for animal_id, animal in enumerate(self.key.animals):
+            attempts = int(self.animal_attempts[animal_id])
+            correct = int(self.animal_correct[animal_id])
+            if attempts:
+                rows.append((correct / attempts, animal, attempts, correct))
+        rows.sort()
+        with open(stats_file, "w", newline="", encoding="utf-8") as file:
+            writer = csv.writer(file)
+            writer.writerow(["animal", "attempts", "correct", "p_value"])
+            for p_value, animal, attempts, correct in rows:
+                writer.writerow([animal, attempts, correct, f"{p_value:.3f}"])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Grade paper quiz answer sheets against a worksheet answer key.")
+    parser.add_argument("key", help="answer_key.csv written by worksheet_generator.py")
+    parser.add_argument("sheets", help="CSV of student, paper, question, answer rows")
+    parser.add_argument("--scores", default="scores.csv", help="per-student scores output")
+    parser.add_argument("--stats", default="question_stats.csv", help="per-animal difficulty output")
+    parser.add_argument("--chunk-size", type=int, default=100_000, help="rows processed per chunk")
+    parser.add_argument("--no-numpy", action="store_true", help="use the pure Python scorer")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    grader = Grader(AnswerKey(args.key), use_numpy=not args.no_numpy)
+    grader.grade_file(args.sheets, args.chunk_size)
+    grader.write_scores(args.scores)
+    grader.write_question_stats(args.stats)
+    elapsed = time.perf_counter() - started
+    print(f"Graded {grader.rows_graded} answers from {len(grader.student_ids)} students in {elapsed:.2f}s "
+          f"({'NumPy' if grader.use_numpy else 'pure Python'}); skipped {grader.rows_skipped} rows not in the key.")
@@ -0,0 +1,182 @@
+import csv
+import json
+import time
+import tkinter as tk
+
+
+class InputRecorder:
+    """
+    Records what a player does in the quiz, one JSON line per input, so a session from a kiosk can be
+    played back exactly. Each game's random seed is recorded too, so replayed games draw the same
+    questions and options. Lines are flushed as they are written, so a crash keeps everything before it.
+    """
+
+    def __init__(self, path):
+        """
+        Initializes the InputRecorder.
+        :param path: JSON-lines file to write; an existing file is replaced.
+        """
+        self.path = path
+        self.started = time.monotonic()
+        self.file = open(path, "w", encoding="utf-8")
+
+    def record(self, action, **fields):
+        """Writes one input, stamped with the seconds since recording started."""
+        record = {"t": round(time.monotonic() - self.started, 4), "action": action}
+        record.update(fields)
+        self.file.write(json.dumps(record, separators=(",", ":")) + "\n")
+        self.file.flush()
+
+    def close(self):
+        """Closes the recording file."""
+        self.file.close()
+
+
+class InputReplayer:
+    """
+    Feeds a recording back into a running YoungAnimalQuiz, at the recorded pace or as fast as possible,
+    and times every screen transition: from calling the screen's own handler until Tk has finished
+    laying it out.
+    """
+
+    def __init__(self, path):
+        """
+        Initializes the InputReplayer.
+        :param path: JSON-lines file written by InputRecorder.
+        """
+        with open(path, encoding="utf-8") as file:
+            self.records = [json.loads(line) for line in file if line.strip()]
+        self.root = None
+        self.app = None
+        self.fast = False
+        self.on_finish = None
+        self.position = 0
+        self.started = 0.0
+        self.timings = []  # (record index, action, milliseconds) for each replayed input
+        self.diverged = 0  # Games whose deck differs from the recording
+
+    def seeds(self):
+        """Returns an iterator over the recorded game seeds, for YoungAnimalQuiz to use in order."""
+        return iter([record["seed"] for record in self.records if record["action"] == "session"])
+
+    def start(self, root, app, fast=False, on_finish=None):
+        """
+        Starts replaying on the Tk event loop.
+        :param root: The main tkinter root window.
+        :param app: The YoungAnimalQuiz to drive, built with seeds=self.seeds().
+        :param fast: True to replay as fast as possible instead of at the recorded pace.
+        :param on_finish: Called once every input has been replayed, or the replay has stopped.
+        """
+        self.root = root
+        self.app = app
+        self.fast = fast
+        self.on_finish = on_finish
+        self.started = time.monotonic()
+        self.root.after(0, self.step)
+
+    def step(self):
+        """Replays the next input, then schedules the one after it."""
+        if self.position >= len(self.records):
+            self.finish()
+            return
+        record = self.records[self.position]
+        if not self.fast:
+            wait = self.started + record["t"] - time.monotonic()
+            if wait > 0.001:
+                self.root.after(int(wait * 1000), self.step)
+                return
+        try:
+            started = time.perf_counter()
+            replayed = self.perform(record)
+            self.root.update_idletasks()
+            if replayed:
+                self.timings.append((self.position, record["action"], (time.perf_counter() - started) * 1000))
+        except (AttributeError, IndexError, KeyError, tk.TclError) as error:
+            print(f"Error: replay stopped at input {self.position + 1} ({record['action']}): {error}")
+            self.finish()
+            return
+        self.position += 1
+        self.root.after(0, self.step)
+
+    def perform(self, record):
+        """
+        Carries out one recorded input through the screen that handled it.
+        :return: False if there was nothing to do, e.g. a speed round that had already moved on by itself.
+        """
+        app = self.app
+        action = record["action"]
+        if action == "submit":
+            menu = app.menu
+            menu.rounds_entry.delete(0, "end")
+            menu.rounds_entry.insert(0, record["rounds"])
+            menu.difficulty.set(record["difficulty"])
+            menu.mode.set(record["mode"])
+            menu.name_entry.delete(0, "end")
+            menu.name_entry.insert(0, record["player"])
+            menu.submit_rounds()
+        elif action == "session":
+            # Not an input: checks the replayed game drew the same questions as the recorded one
+            if app.play.deck[:len(record["deck"])] != record["deck"]:
+                self.diverged += 1
+            return False
+        elif action == "theme":
+            app.menu.high_contrast.set(record["high_contrast"])
+            app.menu.switch_theme()
+        elif action == "answer":
+            app.play.check_answer(record["answer"])
+        elif action == "timeout":
+            if app.play.timer is None:
+                return False  # The replayed countdown already ran out
+            app.play.timer.cancel()
+            app.play.time_out()
+        elif action == "next":
+            if record.get("auto") and app.play.advance_id is None:
+                return False  # The replayed speed round already moved on
+            app.play.next_question()
+        elif action == "help":
+            app.show_help()
+        elif action == "dismiss":
+            app.dismiss_help()
+        elif action == "cancel":
+            app.play.cancel()
+        elif action == "resume":
+            app.resume_game()
+        elif action == "browse":
+            app.show_browse()
+        elif action == "back":
+            app.close_browse()
+        elif action == "play_again":
+            app.play_again()
+        else:
+            raise KeyError(f"unknown input '{action}'")
+        return True
+
+    def finish(self):
+        """Stops replaying and hands over to on_finish."""
+        if self.on_finish:
+            self.on_finish()
+
+    def report(self, path=None):
+        """
+        Prints transition timings per input type and optionally writes every transition to a CSV file.
+        :return: The slowest transition in milliseconds.
+        """
+        print(f"Replayed {len(self.timings)} inputs in {time.monotonic() - self.started:.2f}s "
+              f"({'as fast as possible' if self.fast else 'at recorded pace'}).")
+        if self.diverged:
+            print(f"Error: {self.diverged} games drew different questions from the recording.")
+        by_action = {}
+        for _, action, milliseconds in self.timings:
+            by_action.setdefault(action, []).append(milliseconds)
+        print(f"{'transition':<12}{'count':>7}{'median ms':>11}{'95th ms':>9}{'max ms':>9}")
+        for action, times in sorted(by_action.items()):
+            times.sort()
+            print(f"{action:<12}{len(times):>7}{times[len(times) // 2]:>11.2f}"
+                  f"{times[int(0.95 * (len(times) - 1))]:>9.2f}{times[-1]:>9.2f}")
+        if path:
+            with open(path, "w", newline="", encoding="utf-8") as file:
+                writer = csv.writer(file)
+                writer.writerow(["input", "action", "milliseconds"])
+                writer.writerows((index + 1, action, round(milliseconds, 3))
+                                 for index, action, milliseconds in self.timings)
+        return max((milliseconds for _, _, milliseconds in self.timings), default=0.0)
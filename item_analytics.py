@@ -0,0 +1,309 @@
+import argparse
+import csv
+import glob
+import gzip
+import itertools
+import json
+import math
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Room for this many distinct chosen answers per animal when pairs are packed into one integer
+OPTION_CODE_SPACE = 1 << 20
+# Rotated event log segments: events-<date>-<time>-<n>.jsonl, gzipped once closed
+SEGMENT_NAME = re.compile(r"-(\d{8}-\d{6})-(\d+)\.jsonl(\.gz)?$")
+
+
+class ItemStatistics:
+    """
+    Aggregates answer logs into per-animal difficulty statistics in one streaming pass.
+    Logs must keep each session's answers together (as the kiosks write them), so only the
+    session currently being read is ever held in memory.
+    """
+
+    def __init__(self, use_numpy=True):
+        """
+        Initializes the ItemStatistics.
+        :param use_numpy: Set to False to force the pure Python aggregation path.
+        """
+        self.use_numpy = use_numpy and numpy is not None
+        self.animal_ids = {}
+        self.option_ids = {}
+        # Per animal: attempts, correct, and the sums needed for the item-rest correlation
+        self.attempts = []
+        self.correct = []
+        self.paired = []
+        self.sum_rest = []
+        self.sum_rest_squared = []
+        self.sum_correct_rest = []
+        self.sum_correct_paired = []
+        self.wrong_choices = {}
+        self.rows_read = 0
+        self.carry = []  # Rows of a session that continues into the next chunk
+
+    def intern(self, table, name):
+        """Returns the id for a name, growing the per-animal columns for new animals."""
+        name_id = table.get(name)
+        if name_id is None:
+            name_id = table[name] = len(table)
+            if table is self.animal_ids:
+                for column in (self.attempts, self.correct, self.paired, self.sum_rest, self.sum_rest_squared,
+                               self.sum_correct_rest, self.sum_correct_paired):
+                    column.append(0)
+        return name_id
+
+    def read_log(self, log_file, chunk_size=500_000):
+        """
+        Streams a CSV answer log with session, animal, answer and correct columns, or the kiosks' event log.
+        :param log_file: Path of a CSV log, an event log segment (.jsonl or .jsonl.gz), or a logs folder
+            whose segments are read oldest first as one log.
+        :param chunk_size: Rows held in memory at once.
+        """
+        if os.path.isdir(log_file):
+            rows = event_rows(event_log_segments(log_file))
+        elif log_file.endswith((".jsonl", ".jsonl.gz")):
+            rows = event_rows([log_file])
+        else:
+            rows = csv_rows(log_file)
+        while True:
+            chunk = list(itertools.islice(rows, chunk_size))
+            if not chunk:
+                break
+            self.add_rows(chunk, final=False)
+        self.add_rows([], final=True)
+
+    def add_rows(self, rows, final=True):
+        """
+        Adds a chunk of (session, animal, answer, correct answer) rows.
+        :param final: False if more rows may follow, so the last session is held back until it is complete.
+        """
+        rows = self.carry + rows
+        self.carry = []
+        if not final and rows:
+            # Hold back the trailing session; it may continue in the next chunk
+            last_session = rows[-1][0]
+            split = len(rows)
+            while split and rows[split - 1][0] == last_session:
+                split -= 1
+            rows, self.carry = rows[:split], rows[split:]
+        if not rows:
+            return
+        self.rows_read += len(rows)
+
+        # Sessions become run numbers: a new run starts wherever the session id changes
+        runs = []
+        run = -1
+        previous = None
+        for row in rows:
+            if row[0] != previous:
+                run += 1
+                previous = row[0]
+            runs.append(run)
+        animals = [self.intern(self.animal_ids, row[1]) for row in rows]
+        options = [self.intern(self.option_ids, row[2].strip().lower()) for row in rows]
+        correct = [row[2].strip().lower() == row[3].strip().lower() for row in rows]
+
+        if self.use_numpy:
+            self.aggregate_with_numpy(runs, animals, options, correct)
+        else:
+            self.aggregate_with_python(runs, animals, options, correct)
+
+    def aggregate_with_numpy(self, runs, animals, options, correct):
+        """Vectorized aggregation with bincount over run and animal ids."""
+        runs = numpy.array(runs, dtype=numpy.int64)
+        animals = numpy.array(animals, dtype=numpy.int64)
+        options = numpy.array(options, dtype=numpy.int64)
+        correct = numpy.array(correct, dtype=numpy.float64)
+        count = len(self.animal_ids)
+
+        # Rest score: the share of the session's other answers that were right
+        run_lengths = numpy.bincount(runs)[runs]
+        run_correct = numpy.bincount(runs, weights=correct)[runs]
+        paired = run_lengths > 1
+        rest = numpy.where(paired, (run_correct - correct) / numpy.maximum(run_lengths - 1, 1), 0.0)
+
+        updates = (
+            (self.attempts, numpy.ones(len(animals))),
+            (self.correct, correct),
+            (self.paired, paired.astype(numpy.float64)),
+            (self.sum_rest, rest),
+            (self.sum_rest_squared, rest * rest),
+            (self.sum_correct_rest, correct * rest),
+            (self.sum_correct_paired, correct * paired),
+        )
+        for column, values in updates:
+            totals = numpy.bincount(animals, weights=values, minlength=count)
+            for animal_id, total in enumerate(totals.tolist()):
+                column[animal_id] += total
+
+        wrong = correct == 0
+        pairs, counts = numpy.unique(animals[wrong] * OPTION_CODE_SPACE + options[wrong], return_counts=True)
+        for pair, pair_count in zip(pairs.tolist(), counts.tolist()):
+            self.wrong_choices[pair] = self.wrong_choices.get(pair, 0) + pair_count
+
+    def aggregate_with_python(self, runs, animals, options, correct):
+        """Pure Python fallback with the same results as aggregate_with_numpy."""
+        run_lengths = {}
+        run_correct = {}
+        for run, is_correct in zip(runs, correct):
+            run_lengths[run] = run_lengths.get(run, 0) + 1
+            run_correct[run] = run_correct.get(run, 0) + is_correct
+        for run, animal, option, is_correct in zip(runs, animals, options, correct):
+            self.attempts[animal] += 1
+            self.correct[animal] += is_correct
+            if run_lengths[run] > 1:
+                rest = (run_correct[run] - is_correct) / (run_lengths[run] - 1)
+                self.paired[animal] += 1
+                self.sum_rest[animal] += rest
+                self.sum_rest_squared[animal] += rest * rest
+                self.sum_correct_rest[animal] += is_correct * rest
+                self.sum_correct_paired[animal] += is_correct
+            if not is_correct:
+                pair = animal * OPTION_CODE_SPACE + option
+                self.wrong_choices[pair] = self.wrong_choices.get(pair, 0) + 1
+
+    def merge(self, other):
+        """Adds the totals from another ItemStatistics, e.g. one built from a different log in a worker."""
+        columns = ("attempts", "correct", "paired", "sum_rest", "sum_rest_squared", "sum_correct_rest",
+                   "sum_correct_paired")
+        for animal, other_id in other.animal_ids.items():
+            animal_id = self.intern(self.animal_ids, animal)
+            for column in columns:
+                getattr(self, column)[animal_id] += getattr(other, column)[other_id]
+        other_animals = list(other.animal_ids)
+        other_options = list(other.option_ids)
+        for pair, pair_count in other.wrong_choices.items():
+            other_animal, other_option = divmod(pair, OPTION_CODE_SPACE)
+            pair = self.animal_ids[other_animals[other_animal]] * OPTION_CODE_SPACE + \
+                self.intern(self.option_ids, other_options[other_option])
+            self.wrong_choices[pair] = self.wrong_choices.get(pair, 0) + pair_count
+        self.rows_read += other.rows_read
+
+    def discrimination(self, animal_id):
+        """Point-biserial correlation between answering this animal right and the rest of the session."""
+        paired = self.paired[animal_id]
+        sum_correct = self.sum_correct_paired[animal_id]
+        sum_rest = self.sum_rest[animal_id]
+        covariance = paired * self.sum_correct_rest[animal_id] - sum_correct * sum_rest
+        spread = (paired * sum_correct - sum_correct ** 2) * (paired * self.sum_rest_squared[animal_id] - sum_rest ** 2)
+        return covariance / math.sqrt(spread) if spread > 1e-9 else 0.0
+
+    def write_table(self, table_file):
+        """
+        Writes the difficulty table QuizData loads at startup, hardest animals first:
+        animal, attempts, p_value, discrimination, top_wrong, top_wrong_share.
+        """
+        options = list(self.option_ids)
+        top_wrong = {}
+        for pair, pair_count in self.wrong_choices.items():
+            animal_id, option_id = divmod(pair, OPTION_CODE_SPACE)
+            if not options[option_id]:
+                continue  # A blank answer (time ran out) is wrong but not a distractor anyone chose
+            # Ties go to the alphabetically first option so results do not depend on input order
+            best_count, best_option = top_wrong.get(animal_id, (0, ""))
+            if pair_count > best_count or (pair_count == best_count and options[option_id] < best_option):
+                top_wrong[animal_id] = (pair_count, options[option_id])
+
+        rows = []
+        for animal, animal_id in self.animal_ids.items():
+            attempts = int(self.attempts[animal_id])
+            wrong_count, wrong_option = top_wrong.get(animal_id, (0, ""))
+            rows.append((self.correct[animal_id] / attempts, animal, attempts, self.discrimination(animal_id),
+                         wrong_option, wrong_count / attempts))
+        rows.sort()
+        with open(table_file, "w", newline="", encoding="utf-8") as file:
+            writer = csv.writer(file)
+            writer.writerow(["animal", "attempts", "p_value", "discrimination", "top_wrong", "top_wrong_share"])
+            for p_value, animal, attempts, discrimination, wrong_option, wrong_share in rows:
+                writer.writerow([animal, attempts, f"{p_value:.4f}", f"{discrimination:.4f}", wrong_option,
+                                 f"{wrong_share:.4f}"])
+
+
+def csv_rows(log_file):
+    """Yields [session, animal, answer, correct answer] for each row of a CSV answer log."""
+    with open(log_file, newline="", encoding="utf-8") as file:
+        reader = csv.reader(file)
+        header = [column.strip().lower() for column in next(reader)]
+        columns = [header.index(name) for name in ("session", "animal", "answer", "correct")]
+        for row in reader:
+            yield [row[column] for column in columns]
+
+
+def event_log_segments(directory):
+    """The event log files in a logs folder, oldest first: rotated segments, then the live events.jsonl."""
+    segments = []
+    for path in glob.glob(os.path.join(directory, "events-*.jsonl*")):
+        match = SEGMENT_NAME.search(path)
+        if match:
+            segments.append((match.group(1), int(match.group(2)), path))
+    paths = [path for _, _, path in sorted(segments)]
+    live = os.path.join(directory, "events.jsonl")
+    if os.path.exists(live):
+        paths.append(live)
+    return paths
+
+
+def event_rows(paths):
+    """
+    Yields [session, animal, answer, correct answer] for each answer event in event log files.
+    Reverse-mode sessions are skipped, since their answers are animals rather than baby names, and so are
+    answers logged before the events carried the animal. A timed-out answer counts as a wrong, blank answer.
+    :param paths: Event log files in the order they were written.
+    """
+    reverse_sessions = set()
+    for path in paths:
+        opener = gzip.open if path.endswith(".gz") else open
+        with opener(path, "rt", encoding="utf-8") as file:
+            for line in file:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # A line cut short when a kiosk lost power
+                event = record.get("event")
+                if event == "session_start":
+                    if record.get("mode") == "reverse":
+                        reverse_sessions.add(record.get("session"))
+                elif event == "answer" and "animal" in record and record.get("session") not in reverse_sessions:
+                    yield [record["session"], record["animal"], record.get("answer") or "", record["correct_answer"]]
+
+
+def read_one_log(job):
+    """Worker task: aggregates a single log file or logs folder."""
+    log_file, chunk_size, use_numpy = job
+    statistics = ItemStatistics(use_numpy)
+    statistics.read_log(log_file, chunk_size)
+    return statistics
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the item difficulty table from quiz answer logs.")
+    parser.add_argument("logs", nargs="+", help="CSV answer logs with session, animal, answer, correct columns, "
+                                                "event log segments (.jsonl, .jsonl.gz) or logs folders")
+    parser.add_argument("--out", default="item_difficulty.csv", help="difficulty table to write")
+    parser.add_argument("--chunk-size", type=int, default=500_000, help="rows processed per chunk")
+    parser.add_argument("--no-numpy", action="store_true", help="use the pure Python aggregation")
+    parser.add_argument("--workers", type=int, default=1, help="log files aggregated in parallel")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    statistics = ItemStatistics(use_numpy=not args.no_numpy)
+    jobs = [(log, args.chunk_size, not args.no_numpy) for log in args.logs]
+    if args.workers > 1 and len(jobs) > 1:
+        # Each log is aggregated separately; the totals are additive so merging is exact
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            for partial in pool.map(read_one_log, jobs):
+                statistics.merge(partial)
+    else:
+        for job in jobs:
+            statistics.merge(read_one_log(job))
+    statistics.write_table(args.out)
+    elapsed = time.perf_counter() - started
+    print(f"Read {statistics.rows_read} answers for {len(statistics.animal_ids)} animals in {elapsed:.2f}s "
+          f"({statistics.rows_read / max(elapsed, 1e-9):.0f} rows/sec); wrote '{args.out}'.")
@@ -0,0 +1,175 @@
+import argparse
+import csv
+import datetime
+import heapq
+import json
+import os
+import socket
+import time
+
+RESULT_FIELDS = ["finished_at", "session_id", "kiosk", "mode", "difficulty", "rounds", "score"]
+
+
+class ResultLog:
+    """Appends one row per finished game to a kiosk's results file, in finish-time order."""
+
+    def __init__(self, path="results.csv", kiosk=None):
+        """
+        Initializes the ResultLog.
+        :param path: The kiosk's results CSV file.
+        :param kiosk: Name of this kiosk; defaults to the host name.
+        """
+        self.path = path
+        self.kiosk = kiosk or socket.gethostname()
+        # Carried over from the file so a clock set back between runs cannot unsort it
+        self.last_finished_at = last_finished_at(path)
+
+    def record(self, session_id, mode, difficulty, rounds, score):
+        """Appends a finished game. Timestamps never go backwards, so the file stays sorted for merging."""
+        finished_at = datetime.datetime.now(datetime.timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+        finished_at = self.last_finished_at = max(finished_at, self.last_finished_at)
+        new_file = not os.path.exists(self.path)
+        with open(self.path, "a", newline="", encoding="utf-8") as file:
+            writer = csv.writer(file)
+            if new_file:
+                writer.writerow(RESULT_FIELDS)
+            writer.writerow([finished_at, session_id, self.kiosk, mode, difficulty, rounds, score])
+
+
+def last_finished_at(path, tail_bytes=4096):
+    """Finish time on the last row of a results file, or "" if it has no rows yet; only the tail is read."""
+    try:
+        with open(path, "rb") as file:
+            file.seek(0, os.SEEK_END)
+            file.seek(max(file.tell() - tail_bytes, 0))
+            lines = file.read().decode("utf-8", errors="replace").splitlines()
+    except FileNotFoundError:
+        return ""
+    for line in reversed(lines):
+        finished_at = line.split(",", 1)[0]
+        if finished_at and finished_at != RESULT_FIELDS[0]:
+            return finished_at
+    return ""
+
+
+def read_sorted_results(path, source):
+    """
+    Yields ((finished_at, session_id), source, row) from a results file, checking it is sorted.
+    :param path: Results CSV with the RESULT_FIELDS header.
+    :param source: Position of this file in the merge; lower sources win ties.
+    """
+    with open(path, newline="", encoding="utf-8") as file:
+        reader = csv.reader(file)
+        header = next(reader, None)
+        if header is None:
+            return
+        if header != RESULT_FIELDS:
+            raise ValueError(f"'{path}' does not have the expected columns {RESULT_FIELDS}.")
+        previous = None
+        for row in reader:
+            key = (row[0], row[1])
+            if previous is not None and key < previous:
+                raise ValueError(f"'{path}' is not sorted by finish time at session {row[1]}.")
+            previous = key
+            yield key, source, row
+
+
+def add_to_aggregates(aggregates, row):
+    """Counts one result row into the per-kiosk, per-day totals."""
+    day_key = f"{row[2]}|{row[0][:10]}"
+    totals = aggregates["by_kiosk_day"].setdefault(day_key, {"sessions": 0, "rounds": 0, "score": 0})
+    totals["sessions"] += 1
+    totals["rounds"] += int(row[5])
+    totals["score"] += int(row[6])
+    aggregates["rows"] += 1
+
+
+def load_aggregates(path):
+    """Reads the aggregates file, or returns empty aggregates if there is none yet."""
+    try:
+        with open(path, encoding="utf-8") as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return {"rows": 0, "by_kiosk_day": {}}
+
+
+def write_atomically(path, write):
+    """Writes a file through a temporary copy so readers never see a half-written file."""
+    temp_path = path + ".tmp"
+    try:
+        with open(temp_path, "w", newline="", encoding="utf-8") as file:
+            write(file)
+        os.replace(temp_path, path)
+    except BaseException:
+        # E.g. an unsorted kiosk file found halfway through the merge: leave no partial copy behind
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def merge_results(central_path, kiosk_paths, aggregates_path):
+    """
+    Merges sorted kiosk result files into the sorted central store with a streaming k-way heap merge.
+    Only one row per input is held at a time, so memory is O(number of kiosks), not O(total rows). The
+    merged stream is sorted, so a row already in the store (same finish time and session id) arrives right
+    after the stored copy and is skipped; merging the same files twice changes nothing.
+    Aggregates are updated from the new rows only.
+    :return: (rows in the central store, rows added by this merge).
+    """
+    aggregates = load_aggregates(aggregates_path)
+    new_rows = {"rows": 0, "by_kiosk_day": {}}
+    counts = {"stored": 0}
+
+    # The central store is source 0, so on a tie its copy wins and the kiosk duplicate is dropped
+    sources = []
+    if os.path.exists(central_path):
+        sources.append(read_sorted_results(central_path, 0))
+    sources.extend(read_sorted_results(path, source) for source, path in enumerate(kiosk_paths, 1))
+
+    def write_merged(file):
+        writer = csv.writer(file)
+        writer.writerow(RESULT_FIELDS)
+        previous_key = None
+        for key, source, row in heapq.merge(*sources):
+            if key == previous_key:
+                continue
+            previous_key = key
+            writer.writerow(row)
+            if source == 0:
+                counts["stored"] += 1
+            else:
+                add_to_aggregates(new_rows, row)
+
+    write_atomically(central_path, write_merged)
+
+    if aggregates["rows"] != counts["stored"]:
+        # The aggregates missed an earlier merge (e.g. a crash between the two writes): rebuild them
+        aggregates = {"rows": 0, "by_kiosk_day": {}}
+        for _, _, row in read_sorted_results(central_path, 0):
+            add_to_aggregates(aggregates, row)
+    else:
+        aggregates["rows"] += new_rows["rows"]
+        for day_key, totals in new_rows["by_kiosk_day"].items():
+            stored = aggregates["by_kiosk_day"].setdefault(day_key, {"sessions": 0, "rounds": 0, "score": 0})
+            for name, value in totals.items():
+                stored[name] += value
+    write_atomically(aggregates_path, lambda file: json.dump(aggregates, file, indent=1, sort_keys=True))
+    return aggregates["rows"], new_rows["rows"]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Merge per-kiosk quiz result files into a central store.")
+    parser.add_argument("central", help="central results CSV (created if missing)")
+    parser.add_argument("kiosk_files", nargs="+", help="sorted results.csv files collected from kiosks")
+    parser.add_argument("--aggregates", help="per-kiosk, per-day totals JSON (default: next to the central store)")
+    args = parser.parse_args()
+
+    aggregates_file = args.aggregates or os.path.splitext(args.central)[0] + "_aggregates.json"
+    started = time.perf_counter()
+    try:
+        total_rows, added_rows = merge_results(args.central, args.kiosk_files, aggregates_file)
+    except ValueError as error:
+        print(f"Error: {error} Nothing was merged.")
+        raise SystemExit(1)
+    print(f"Merged {len(args.kiosk_files)} kiosk files in {time.perf_counter() - started:.2f}s: "
+          f"{added_rows} new results, {total_rows} in '{args.central}'.")
@@ -0,0 +1,177 @@
+import argparse
+import gettext
+import glob
+import json
+import os
+import string
+import struct
+
+LOCALE_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "locales")
+SOURCE_LOCALE = "en"  # Messages are written in English, so English needs no catalog at all
+CONTEXTS = {"animals": "animal", "young": "young"}  # Source sections stored under a gettext context
+MO_MAGIC = 0x950412DE
+
+
+class Template:
+    """A message with {name} fields, parsed once so formatting it is only string joins."""
+
+    def __init__(self, text):
+        """
+        Initializes the Template.
+        :param text: The message, e.g. "Pregunta {number} de {total}".
+        """
+        self.parts = [(literal, field) for literal, field, _, _ in string.Formatter().parse(text)]
+        self.fields = tuple(field for _, field in self.parts if field is not None)
+        self.plain = "".join(literal for literal, _ in self.parts)  # The text with {{ }} unescaped
+
+    def format(self, **values):
+        """Fills in the fields; a field with no value is left as {name} rather than failing."""
+        if not self.fields:
+            return self.plain
+        return "".join(literal + (str(values.get(field, "{" + field + "}")) if field is not None else "")
+                       for literal, field in self.parts)
+
+    def around(self, field):
+        """
+        Returns the (prefix, suffix) around a template's only field, or None if it has other fields.
+        Loops over the whole bank concatenate these directly instead of formatting every row.
+        """
+        if self.fields != (field,):
+            return None
+        return self.parts[0][0], "".join(literal for literal, _ in self.parts[1:])
+
+
+class Catalog:
+    """The translations for one locale, with its parsed templates cached."""
+
+    def __init__(self, locale, translations):
+        """
+        Initializes the Catalog.
+        :param locale: Locale code, e.g. "es".
+        :param translations: gettext translations; NullTranslations for the source language.
+        """
+        self.locale = locale
+        self.translations = translations
+        self.templates = {}  # Source message -> Template of its translation
+
+    def text(self, message, **values):
+        """Translates a message and fills in its fields."""
+        template = self.templates.get(message)
+        if template is None:
+            template = self.template(message)
+        return template.format(**values)
+
+    def template(self, message):
+        """Returns the parsed Template of a message's translation."""
+        template = self.templates.get(message)
+        if template is None:
+            template = self.templates[message] = Template(self.translations.gettext(message))
+        return template
+
+    def animal(self, name):
+        """Translates an animal name from the question bank; untranslated names stay as they are."""
+        return self.translations.pgettext("animal", name)
+
+    def young(self, name):
+        """Translates a young-name from the question bank."""
+        return self.translations.pgettext("young", name)
+
+
+catalogs = {}  # Locale -> Catalog, filled in on first use
+active_catalog = None
+
+
+def load_catalog(locale=None, directory=LOCALE_DIRECTORY):
+    """
+    Returns the Catalog for a locale, reading its compiled file the first time it is asked for.
+    A missing or unreadable catalog falls back to English with an error message.
+    :param locale: Locale code such as "es"; None or "en" for English.
+    :param directory: Folder of <locale>.mo files.
+    """
+    locale = locale or SOURCE_LOCALE
+    catalog = catalogs.get(locale)
+    if catalog is None:
+        translations = gettext.NullTranslations()
+        if locale != SOURCE_LOCALE:
+            try:
+                with open(os.path.join(directory, f"{locale}.mo"), "rb") as file:
+                    translations = gettext.GNUTranslations(file)
+            except OSError:
+                print(f"Error: no compiled catalog for locale '{locale}'; using English.")
+        catalog = catalogs[locale] = Catalog(locale, translations)
+    return catalog
+
+
+def set_locale(locale):
+    """Makes a locale the one translate() uses."""
+    global active_catalog
+    active_catalog = load_catalog(locale)
+
+
+def get_catalog():
+    """Returns the active Catalog; English until set_locale is called."""
+    return active_catalog or load_catalog()
+
+
+def translate(message, **values):
+    """Translates a message into the active locale and fills in its fields."""
+    return get_catalog().text(message, **values)
+
+
+def compile_catalog(source, target):
+    """
+    Compiles a JSON catalog into a GNU .mo file that gettext can read.
+    The source has a "strings" section of English messages and optional "animals" and "young" sections
+    for the question bank, which are stored under their own gettext context.
+    Translations that use a field their English message does not have are reported and left out.
+    :return: Number of messages written.
+    """
+    with open(source, encoding="utf-8") as file:
+        catalog = json.load(file)
+    locale = os.path.splitext(os.path.basename(source))[0]
+    messages = {"": f"Content-Type: text/plain; charset=UTF-8\nLanguage: {locale}\n"}
+    for message, translation in catalog.get("strings", {}).items():
+        unknown = set(Template(translation).fields) - set(Template(message).fields)
+        if unknown:
+            print(f"Error: {source}: '{translation}' uses {', '.join(sorted(unknown))}, which '{message}' does not.")
+            continue
+        messages[message] = translation
+    for section, context in CONTEXTS.items():
+        for name, translation in catalog.get(section, {}).items():
+            messages[f"{context}\x04{name}"] = translation
+
+    # Layout as in GNU gettext: header, original and translation tables of (length, offset), then the strings
+    keys = sorted(messages, key=lambda key: key.encode("utf-8"))
+    originals = [key.encode("utf-8") for key in keys]
+    translations = [messages[key].encode("utf-8") for key in keys]
+    count = len(keys)
+    originals_offset = 7 * 4
+    translations_offset = originals_offset + count * 8
+    data_offset = translations_offset + count * 8
+    tables = []
+    data = b""
+    for strings in (originals, translations):
+        table = []
+        for encoded in strings:
+            table.append((len(encoded), data_offset + len(data)))
+            data += encoded + b"\0"
+        tables.append(table)
+    temp_path = target + ".tmp"
+    with open(temp_path, "wb") as file:
+        file.write(struct.pack("<7I", MO_MAGIC, 0, count, originals_offset, translations_offset, 0, data_offset))
+        for table in tables:
+            for length, offset in table:
+                file.write(struct.pack("<2I", length, offset))
+        file.write(data)
+    os.replace(temp_path, target)
+    return count - 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compile the quiz's translation catalogs.")
+    parser.add_argument("sources", nargs="*", help="JSON catalogs to compile (default: every locales/*.json)")
+    args = parser.parse_args()
+    for source_file in args.sources or sorted(glob.glob(os.path.join(LOCALE_DIRECTORY, "*.json"))):
+        target_file = os.path.splitext(source_file)[0] + ".mo"
+        written = compile_catalog(source_file, target_file)
+        print(f"{source_file}: {written} messages -> {target_file} ({os.path.getsize(target_file)} bytes)")
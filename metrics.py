@@ -0,0 +1,193 @@
+import bisect
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+
+class Counter:
+    """A Prometheus counter, optionally split by one label."""
+
+    def __init__(self, name, help_text, label=None):
+        """
+        Initializes the Counter.
+        :param name: Metric name.
+        :param help_text: Description shown in the exposition.
+        :param label: Optional label name, e.g. "result".
+        """
+        self.name = name
+        self.help_text = help_text
+        self.label = label
+        self.values = {} if label else {None: 0}  # Label value (or None) -> count
+
+    def inc(self, amount=1, label_value=None):
+        """Adds to the counter; called only from the Tk thread, so no lock is needed."""
+        self.values[label_value] = self.values.get(label_value, 0) + amount
+
+    def render(self):
+        """Returns the counter in Prometheus text format."""
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        for label_value, value in list(self.values.items()):
+            labels = f'{{{self.label}="{label_value}"}}' if self.label else ""
+            lines.append(f"{self.name}{labels} {value}")
+        return lines
+
+
+class Gauge:
+    """A Prometheus gauge, either set by the app or read from a function at scrape time."""
+
+    def __init__(self, name, help_text, read=None):
+        """
+        Initializes the Gauge.
+        :param name: Metric name.
+        :param help_text: Description shown in the exposition.
+        :param read: Optional function returning the current value when scraped.
+        """
+        self.name = name
+        self.help_text = help_text
+        self.read = read
+        self.value = 0
+
+    def set(self, value):
+        """Sets the gauge."""
+        self.value = value
+
+    def inc(self, amount=1):
+        """Raises the gauge."""
+        self.value += amount
+
+    def render(self):
+        """Returns the gauge in Prometheus text format."""
+        value = self.read() if self.read else self.value
+        return [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} gauge", f"{self.name} {value}"]
+
+
+class Histogram:
+    """A Prometheus histogram with fixed bucket bounds."""
+
+    def __init__(self, name, help_text, buckets):
+        """
+        Initializes the Histogram.
+        :param name: Metric name.
+        :param help_text: Description shown in the exposition.
+        :param buckets: Increasing upper bounds in seconds; +Inf is added.
+        """
+        self.name = name
+        self.help_text = help_text
+        self.bounds = list(buckets)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value):
+        """Counts one observation in its bucket; O(log buckets), Tk thread only."""
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+    def render(self):
+        """Returns the histogram in Prometheus text format, with cumulative buckets."""
+        counts = list(self.counts)
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        total = 0
+        for bound, count in zip(self.bounds + ["+Inf"], counts):
+            total += count
+            lines.append(f'{self.name}_bucket{{le="{bound}"}} {total}')
+        lines.append(f"{self.name}_sum {self.sum}")
+        lines.append(f"{self.name}_count {total}")
+        return lines
+
+
+def resident_bytes():
+    """Current resident set size of this process, or 0 where /proc is not available."""
+    try:
+        with open("/proc/self/statm") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return 0
+
+
+class QuizMetrics:
+    """
+    Live health metrics for one kiosk, served in the Prometheus text format.
+    Metrics are only ever changed from the Tk thread and read by the exporter thread, so updates
+    are plain additions with no locks; a scrape may see one observation half-recorded, never a stall.
+    """
+
+    def __init__(self):
+        """Initializes the QuizMetrics with every metric the quiz exports."""
+        self.sessions_in_progress = Gauge("quiz_sessions_in_progress",
+                                          "Games started and not yet finished or cancelled.")
+        self.sessions_started = Counter("quiz_sessions_started_total", "Games started, including resumed ones.")
+        self.sessions_finished = Counter("quiz_sessions_finished_total", "Games played to the final score.")
+        self.answers = Counter("quiz_answers_total", "Answers given, by result.", label="result")
+        self.answer_seconds = Histogram("quiz_answer_seconds", "Time taken to answer a question.",
+                                        (1, 2, 3, 5, 8, 13, 21, 34))
+        self.loop_lag = Histogram("quiz_event_loop_lag_seconds", "How late the Tk event loop ran a timer callback.",
+                                  (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1))
+        self.timer_lateness = Histogram("quiz_speed_timer_lateness_seconds",
+                                        "Worst countdown update lateness in each speed game.",
+                                        (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1))
+        self.bank_load_seconds = Gauge("quiz_bank_load_seconds", "Time taken to load the question bank.")
+        self.resident_bytes = Gauge("process_resident_memory_bytes", "Resident memory size.", read=resident_bytes)
+        self.metrics = [self.sessions_in_progress, self.sessions_started, self.sessions_finished, self.answers,
+                        self.answer_seconds, self.loop_lag, self.timer_lateness, self.bank_load_seconds,
+                        self.resident_bytes]
+        self.server = None
+        self.lag_due = 0.0
+
+    def record(self, event, **fields):
+        """Updates the metrics from a quiz event; takes the same arguments as EventLog.emit."""
+        if event == "answer":
+            self.answers.inc(label_value="timeout" if fields.get("timed_out") else
+                             "correct" if fields.get("correct") else "wrong")
+            self.answer_seconds.observe(fields.get("seconds", 0.0))
+        elif event == "session_start":
+            self.sessions_started.inc()
+            self.sessions_in_progress.inc()
+        elif event == "session_end":
+            self.sessions_finished.inc()
+            self.sessions_in_progress.inc(-1)
+        elif event == "cancel":
+            self.sessions_in_progress.inc(-1)
+        elif event == "timer_accuracy":
+            self.timer_lateness.observe(fields.get("worst_ms", 0.0) / 1000)
+
+    def render(self):
+        """Returns every metric in the Prometheus text format."""
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def serve(self, port):
+        """Starts the exporter on localhost in a daemon thread; it sleeps in select() between scrapes."""
+        metrics = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path not in ("/metrics", "/"):
+                    self.send_error(404)
+                    return
+                body = metrics.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # Scrapes every few seconds would flood the console
+
+        self.server = HTTPServer(("127.0.0.1", port), MetricsHandler)
+        threading.Thread(target=self.server.serve_forever, kwargs={"poll_interval": 5}, name="metrics-exporter",
+                         daemon=True).start()
+
+    def probe_loop_lag(self, root, interval_ms=1000):
+        """Measures event-loop lag by timing a Tk callback scheduled every interval_ms."""
+        self.lag_due = time.monotonic() + interval_ms / 1000
+
+        def check():
+            self.loop_lag.observe(max(0.0, time.monotonic() - self.lag_due))
+            self.lag_due = time.monotonic() + interval_ms / 1000
+            root.after(interval_ms, check)
+
+        root.after(interval_ms, check)
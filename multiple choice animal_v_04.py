@@ -1,244 +1,708 @@
-import csv
-import tkinter as tk
-import tkinter.font as tkfont
+import argparse
+import math
+import os
 import random
+import shutil
+import tempfile
+import time
+import tkinter as tk
+import uuid
 
-
-class QuizData:
-    """Handles loading and storing quiz questions from a CSV file."""
-
-    def __init__(self, csv_file):
-        """
-        Initializes the QuizData object and attempts to load questions
-        from the specified CSV file.
-        """
-        try:
-            # Load questions from the CSV file
-            self.questions = self.load_questions_from_csv(csv_file)
-        except FileNotFoundError:
-            # Handle missing file error
-            print(f"Error: '{csv_file}' file not found. Please ensure the file is in the correct directory.")
-            self.questions = []
-        except csv.Error:
-            # Handle invalid CSV format error
-            print("Error: Could not read the CSV file. Please check its format.")
-            self.questions = []
-
-    def load_questions_from_csv(self, csv_file):
-        """
-        Reads the CSV file and creates quiz questions.
-        Each question includes the correct answer and three random incorrect options.
-        """
-        questions = []
-        with open(csv_file, 'r') as file:
-            # Read the CSV content into a list
-            animals_young_only = list(csv.reader(file, delimiter=","))
-            animals_young_only.pop(0)  # Remove header row
-
-            # Gather all possible answers for incorrect options
-            all_young_names = [row[1] for row in animals_young_only]
-
-            for row in animals_young_only:
-                # Create a question and shuffle the answer options
-                question = f"What is a baby {row[0]} called?"
-                correct_answer = row[1]
-                incorrect_options = list(set(all_young_names) - {correct_answer})
-                options = [correct_answer] + random.sample(incorrect_options, 3)
-                random.shuffle(options)
-                questions.append({
-                    "question": question,
-                    "options": options,
-                    "correct_index": options.index(correct_answer)
-                })
-        return questions
+from animal_images import AnimalImages
+from event_log import EventLog
+from input_recording import InputRecorder, InputReplayer
+from kiosk_results import ResultLog
+from localization import get_catalog, set_locale, translate as _
+from metrics import QuizMetrics
+from quiz_data import PlayerProfile, QuizData, SessionSnapshot
+from theme import Theme
 
 
 class Menu:
     """Manages the initial menu for choosing the number of quiz rounds."""
 
-    def __init__(self, root, start_game_callback):
+    def __init__(self, root, theme, start_game_callback, browse_callback=None, resume_callback=None, recorder=None):
         """
         Initializes the Menu class.
         :param root: The main tkinter root window.
+        :param theme: The app's Theme.
         :param start_game_callback: Callback function to start the quiz game.
+        :param browse_callback: Optional callback to open the browse animals screen.
+        :param resume_callback: Optional callback to resume an unfinished game; shows a RESUME button.
+        :param recorder: Optional InputRecorder that records the menu choices.
         """
         self.root = root
+        self.theme = theme
         self.start_game_callback = start_game_callback
+        self.browse_callback = browse_callback
+        self.resume_callback = resume_callback
+        self.recorder = recorder
         self.setup_menu()
 
     def setup_menu(self):
         """Sets up the menu interface for choosing the number of rounds."""
-        main_frame = tk.Frame(self.root, bg="#F0F4C3")
+        main_frame = tk.Frame(self.root)
         main_frame.place(relx=0.5, rely=0.5, anchor="center")
 
         # Display welcome text and instructions
-        tk.Label(main_frame, text="Welcome to the Young Animal Quiz!",
-                 font=("Helvetica", 14, "bold"), bg="#F0F4C3").grid(row=0, column=0, columnspan=2, pady=10, padx=20)
-        tk.Label(main_frame, text="How many rounds would you like to play? (1-10)",
-                 bg="#F0F4C3").grid(row=1, column=0, columnspan=2, pady=10, padx=20)
+        tk.Label(main_frame, text=_("Welcome to the Young Animal Quiz!"),
+                 font=self.theme.font("heading")).grid(row=0, column=0, columnspan=2, pady=10, padx=20)
+        tk.Label(main_frame, text=_("How many rounds would you like to play? (1-10)")).grid(row=1, column=0,
+                                                                                           columnspan=2, pady=10,
+                                                                                           padx=20)
 
         # Entry box for the number of rounds
         self.rounds_entry = tk.Entry(main_frame)
         self.rounds_entry.grid(row=2, column=0, columnspan=2, pady=10, padx=20)
 
-        # Error label for displaying invalid input messages
-        self.error_label = tk.Label(main_frame, text="", fg="red", bg="#F0F4C3", font=("Helvetica", 10))
-        self.error_label.grid(row=3, column=0, columnspan=2, pady=(5, 10))
+        # Difficulty choice controls how plausible the wrong options are
+        self.difficulty = tk.StringVar(value="medium")
+        difficulty_frame = tk.Frame(main_frame)
+        difficulty_frame.grid(row=3, column=0, columnspan=2, pady=5)
+        for i, difficulty in enumerate(("easy", "medium", "hard")):
+            tk.Radiobutton(difficulty_frame, text=_(difficulty.capitalize()), value=difficulty,
+                           variable=self.difficulty).grid(row=0, column=i, padx=5)
+
+        # Answer mode: pick from four buttons or type the young-name
+        self.mode = tk.StringVar(value="choice")
+        mode_frame = tk.Frame(main_frame)
+        mode_frame.grid(row=4, column=0, columnspan=2, pady=5)
+        for i, (mode, text) in enumerate((("choice", "Multiple choice"), ("typed", "Typed answer"),
+                                          ("reverse", "Reverse"), ("speed", "Speed round"))):
+            tk.Radiobutton(mode_frame, text=_(text), value=mode, variable=self.mode).grid(row=0, column=i, padx=5)
+
+        # Optional player name so returning players get questions they have not seen yet
+        tk.Label(main_frame, text=_("Player name (optional):")).grid(row=5, column=0, pady=5, sticky="e")
+        self.name_entry = tk.Entry(main_frame, width=15)
+        self.name_entry.grid(row=5, column=1, pady=5, sticky="w")
 
-        # Submit button
-        tk.Button(main_frame, text="SUBMIT", command=self.submit_rounds, bg="#AED581").grid(row=4, column=0,
-                                                                                            columnspan=2, pady=10,
-                                                                                            padx=20)
+        # Error label for displaying invalid input messages
+        self.error_label = self.theme.colour(tk.Label(main_frame, text="", font=self.theme.font("small")),
+                                             foreground="error")
+        self.error_label.grid(row=6, column=0, columnspan=2, pady=(5, 10))
+
+        # Submit button, plus a button to study the animals before playing
+        if self.browse_callback:
+            self.theme.button(main_frame, "go", text=_("SUBMIT"), command=self.submit_rounds).grid(row=7, column=0,
+                                                                                                pady=10, padx=20)
+            self.theme.button(main_frame, "help", text=_("BROWSE"), command=self.browse_callback).grid(row=7, column=1,
+                                                                                                    pady=10, padx=20)
+        else:
+            self.theme.button(main_frame, "go", text=_("SUBMIT"), command=self.submit_rounds).grid(row=7, column=0,
+                                                                                                columnspan=2, pady=10,
+                                                                                                padx=20)
+        if self.resume_callback:
+            self.theme.button(main_frame, "option", text=_("RESUME"), command=self.resume_callback).grid(
+                row=8, column=0, columnspan=2, pady=(0, 10), padx=20)
+
+        # Larger text and stronger colours, applied to the open screen without rebuilding it
+        self.high_contrast = tk.BooleanVar(value=self.theme.name == "high_contrast")
+        self.switch_theme_button = tk.Checkbutton(main_frame, text=_("High contrast"), variable=self.high_contrast,
+                                                  command=self.switch_theme)
+        self.switch_theme_button.grid(row=9, column=0, columnspan=2, pady=(0, 10))
+
+    def switch_theme(self):
+        """Switches between the standard and high-contrast themes."""
+        if self.recorder:
+            self.recorder.record("theme", high_contrast=self.high_contrast.get())
+        self.theme.apply("high_contrast" if self.high_contrast.get() else "standard")
 
     def submit_rounds(self):
         """Validates the user's input and starts the game if valid."""
+        if self.recorder:
+            # Recorded as typed, so invalid entries replay their error messages too
+            self.recorder.record("submit", rounds=self.rounds_entry.get(), difficulty=self.difficulty.get(),
+                                 player=self.name_entry.get().strip(), mode=self.mode.get())
         try:
             rounds = int(self.rounds_entry.get())
             if 1 <= rounds <= 10:
                 # Clear any existing error message
                 self.error_label.config(text="")
                 # Start the game with the specified number of rounds
-                self.start_game_callback(rounds)
+                self.start_game_callback(rounds, difficulty=self.difficulty.get(),
+                                         player_name=self.name_entry.get().strip(), mode=self.mode.get())
             else:
                 # Show an error if the number is out of bounds
-                self.error_label.config(text="Please enter a number between 1 and 10.")
+                self.error_label.config(text=_("Please enter a number between 1 and 10."))
         except ValueError:
             # Show an error if the input is not a number
-            self.error_label.config(text="Please enter a valid number.")
+            self.error_label.config(text=_("Please enter a valid number."))
+
+
+class CountdownTimer:
+    """
+    Counts down to a deadline on the Tk event loop without drifting.
+    Each callback works out the time left from a monotonic clock and schedules the next one for the
+    next whole second before the deadline, so a late callback shortens the following wait instead of
+    pushing every later tick back.
+    """
+
+    def __init__(self, root, seconds, on_tick, on_expire):
+        """
+        Initializes the CountdownTimer.
+        :param root: The main tkinter root window, used for scheduling.
+        :param seconds: Length of the countdown.
+        :param on_tick: Called with the whole seconds left, once per second.
+        :param on_expire: Called once the deadline has passed.
+        """
+        self.root = root
+        self.seconds = seconds
+        self.on_tick = on_tick
+        self.on_expire = on_expire
+        self.deadline = 0.0
+        self.due = 0.0
+        self.after_id = None
+        self.lateness = []  # Seconds each callback ran after it was due
+
+    def start(self):
+        """Starts the countdown and shows the full time straight away."""
+        self.due = time.monotonic()
+        self.deadline = self.due + self.seconds
+        self.tick()
+
+    def tick(self):
+        """Updates the countdown, or expires it once the deadline has passed."""
+        now = time.monotonic()
+        if now < self.due:
+            # Tk delays are whole milliseconds, so a callback can arrive a fraction early
+            self.schedule(self.due)
+            return
+        self.lateness.append(now - self.due)
+        remaining = self.deadline - now
+        if remaining <= 0:
+            self.after_id = None
+            self.on_expire()
+            return
+        seconds_left = math.ceil(remaining)
+        self.on_tick(seconds_left)
+        self.schedule(self.deadline - (seconds_left - 1))
+
+    def schedule(self, due):
+        """Arranges for tick to run at the given monotonic time."""
+        self.due = due
+        self.after_id = self.root.after(max(0, int((due - time.monotonic()) * 1000)), self.tick)
+
+    def cancel(self):
+        """Stops the countdown without expiring it."""
+        if self.after_id is not None:
+            self.root.after_cancel(self.after_id)
+            self.after_id = None
 
 
 class Play:
     """Controls the main gameplay, displaying questions and options."""
 
-    def __init__(self, root, quiz_data, rounds, show_menu_callback, display_help_callback, show_final_score_callback):
+    SPEED_ROUND_SECONDS = 10  # Time allowed per question in speed rounds
+    SPEED_FEEDBACK_MS = 1500  # How long speed-round feedback stays up before moving on
+
+    def __init__(self, root, theme, quiz_data, rounds, show_menu_callback, display_help_callback,
+                 show_final_score_callback, difficulty="medium", profile=None, mode="choice", snapshot=None,
+                 images=None, event_log=None, metrics=None, seed=None, recorder=None):
         """
         Initializes the Play class.
         :param root: The main tkinter root window.
+        :param theme: The app's Theme.
         :param quiz_data: The QuizData object containing quiz questions.
         :param rounds: Total number of rounds to play.
         :param show_menu_callback: Callback to return to the menu.
         :param display_help_callback: Callback to display help information.
         :param show_final_score_callback: Callback to display the final score.
+        :param difficulty: Distractor tier, one of "easy", "medium" or "hard".
+        :param profile: Optional PlayerProfile whose unseen questions are preferred.
+        :param mode: "choice" for four option buttons, "typed" for a free-text answer,
+                     "reverse" to name an animal from its young-name or "speed" for
+                     multiple choice against a countdown.
+        :param snapshot: Optional SessionSnapshot of an unfinished game to carry on from.
+        :param images: Optional AnimalImages with pictures of the adult animals.
+        :param event_log: Optional EventLog that receives the session's events.
+        :param metrics: Optional QuizMetrics updated from the same events.
+        :param seed: Seed for this game's question and option draws; the same seed gives the same game.
+        :param recorder: Optional InputRecorder that records answers and button presses.
         """
         self.root = root
+        self.theme = theme
         self.quiz_data = quiz_data
         self.num_rounds = rounds
+        self.difficulty = difficulty
+        self.profile = profile
+        self.mode = mode
         self.round_count = 0
         self.score = 0
         self.current_question_index = 0
+        self.question_data = None
+        self.next_question_data = None  # Drawn during the feedback pause
+        self.prepared_frame = None  # The next question's screen, built during the feedback pause
+        self.prepare_id = None
+        self.shown_round = -1  # Round whose question was last put on screen
+        self.session_id = uuid.uuid4().hex  # Identifies this game in the merged kiosk results
+        self.response_times = []  # Seconds taken to answer each question
+        self.question_shown_at = 0.0
+        self.images = images
+        self.event_log = event_log
+        self.metrics = metrics
+        self.rng = random.Random(seed)
+        self.recorder = recorder
+        self.timer = None
+        self.advance_id = None  # Pending speed-round move to the next question
+        self.timer_lateness = []  # Speed rounds: how late each countdown callback ran, in seconds
+        self.expiry_lateness = []  # Speed rounds: how long after the deadline each time-out was handled
         self.show_menu_callback = show_menu_callback
         self.display_help_callback = display_help_callback
         self.show_final_score_callback = show_final_score_callback
 
-        # Shuffle the questions at the start of each game
-        random.shuffle(self.quiz_data.questions)
-
+        if snapshot:
+            # Resuming: the saved deck and cursor are used as they are, nothing is redrawn
+            self.session_id = snapshot.session_id
+            self.deck = snapshot.deck
+            self.round_count = self.current_question_index = snapshot.answered
+            self.score = snapshot.score
+            self.response_times = snapshot.response_times
+        else:
+            # Draw this game's questions; weighted banks favour heavier rows and
+            # named players get questions they have not been asked before
+            self.deck = self.quiz_data.draw_deck(rounds, rng=self.rng, seen=profile.seen if profile else None)
+            # With a difficulty table loaded, each game starts easy and gets harder
+            self.deck = self.quiz_data.order_by_difficulty(self.deck)
+        self.num_rounds = min(rounds, len(self.deck))
+        self.record_input("session", seed=seed, deck=self.deck[:self.num_rounds])
+
+        self.log_event("session_start", mode=mode, difficulty=difficulty, rounds=self.num_rounds,
+                       player=profile.name if profile else "", resumed=snapshot is not None)
         self.display_question()
 
     def display_question(self):
         """Displays the current question and answer options."""
-        self.clear_window()
-        main_frame = tk.Frame(self.root, bg="#F0F4C3")
-        main_frame.place(relx=0.5, rely=0.5, anchor="center")
-
-        if self.round_count < self.num_rounds:
-            # Get the current question data
-            question_data = self.quiz_data.questions[self.current_question_index]
-
-            # Display question number, score, and the question
-            tk.Label(main_frame, text=f"Question {self.round_count + 1} of {self.num_rounds}",
-                     font=("Helvetica", 16, "bold"), bg="#F0F4C3").grid(row=0, column=0, columnspan=2, pady=10)
-            tk.Label(main_frame, text=f"Score: {self.score}",
-                     font=("Helvetica", 14), bg="#F0F4C3").grid(row=1, column=0, columnspan=2, pady=5)
-            tk.Label(main_frame, text=question_data["question"], font=("Helvetica", 12), bg="#F0F4C3").grid(
-                row=2, column=0, columnspan=2, pady=10, padx=20)
-
-            # Display answer options
-            option_frame = tk.Frame(main_frame, bg="#F0F4C3")
-            option_frame.grid(row=3, column=0, columnspan=2, pady=10)
-            for i, option in enumerate(question_data["options"]):
-                tk.Button(option_frame, text=option,
-                          command=lambda opt=option: self.check_answer(opt),
-                          bg="#FFCC80", font=("Helvetica", 12), relief="flat").grid(row=i // 2, column=i % 2, padx=10,
-                                                                                    pady=5)
-
-            # Display HELP and CANCEL buttons
-            button_frame = tk.Frame(main_frame, bg="#F0F4C3")
-            button_frame.grid(row=4, column=0, columnspan=2, pady=20)
-            tk.Button(button_frame, text="HELP", command=self.display_help_callback,
-                      bg="#90CAF9", font=("Helvetica", 12), relief="flat").grid(row=0, column=0, padx=10)
-            tk.Button(button_frame, text="CANCEL", command=self.show_menu_callback,
-                      bg="#F48FB1", font=("Helvetica", 12), relief="flat").grid(row=0, column=1, padx=10)
-        else:
+        if self.round_count >= self.num_rounds:
             # End the game and show the final score
+            self.clear_window()
+            if self.mode == "speed":
+                self.report_timer_accuracy()
             self.show_final_score_callback(self.score)
+            return
+
+        # Usually the screen was already built off-screen while the feedback was up
+        main_frame = self.prepared_frame
+        self.prepared_frame = None
+        if main_frame is None:
+            # Build the current question once; redisplaying after HELP keeps the same options
+            if self.question_data is None:
+                self.question_data = self.make_question_data(self.current_question_index)
+            main_frame = self.build_question_frame(self.question_data, self.current_question_index)
+        self.clear_window(keep=main_frame)
+        main_frame.place(relx=0.5, rely=0.5, anchor="center")
+        if self.mode == "typed":
+            self.answer_entry.focus_set()
+
+        if self.shown_round != self.round_count:
+            self.shown_round = self.round_count
+            self.question_shown_at = time.monotonic()
+            question_index = self.deck[self.current_question_index]
+            self.log_event("question_shown", animal=self.quiz_data.questions[question_index]["key"])
+            if self.profile:
+                self.profile.seen.add(question_index)
+            if self.mode == "speed":
+                self.timer = CountdownTimer(self.root, self.SPEED_ROUND_SECONDS, self.update_countdown,
+                                            self.time_out)
+                self.timer.start()
+        elif self.timer:
+            # Back from HELP: the clock kept running, just show the time left
+            self.update_countdown(math.ceil(self.timer.deadline - time.monotonic()))
+
+    def make_question_data(self, position):
+        """Builds the options for the question at a position in the deck."""
+        make_question = self.quiz_data.make_reverse_question if self.mode == "reverse" \
+            else self.quiz_data.make_question
+        return make_question(self.deck[position], self.difficulty, rng=self.rng)
+
+    def build_question_frame(self, question_data, position):
+        """
+        Builds a question screen without showing it.
+        :param question_data: Options built by make_question_data.
+        :param position: The question's position in the deck.
+        :return: The unplaced frame holding the whole screen.
+        """
+        main_frame = tk.Frame(self.root)
+
+        # Display question number, score, and the question
+        tk.Label(main_frame, text=_("Question {number} of {total}", number=position + 1, total=self.num_rounds),
+                 font=self.theme.font("title")).grid(row=0, column=0, columnspan=2, pady=10)
+        tk.Label(main_frame, text=_("Score: {score}", score=self.score),
+                 font=self.theme.font("large")).grid(row=1, column=0, columnspan=2, pady=5)
+        question_label = tk.Label(main_frame, text=question_data["question"], compound="top")
+        question_label.grid(row=2, column=0, columnspan=2, pady=10, padx=20)
+        # The adult animal's picture, if there is one; reverse questions would give the answer away.
+        # A picture still being read is added when it arrives rather than holding up the screen.
+        if self.images and self.mode != "reverse":
+            def show_picture(image):
+                if question_label.winfo_exists():
+                    question_label.config(image=image)
+
+            image = self.images.get(self.quiz_data.questions[self.deck[position]]["key"], on_ready=show_picture)
+            if image is not None:
+                show_picture(image)
+        if self.mode == "speed":
+            # Only this label changes while the clock runs; the rest of the screen is left alone
+            self.countdown_label = self.theme.colour(tk.Label(main_frame, font=self.theme.font("heading")),
+                                                     foreground="countdown")
+            self.countdown_label.grid(row=5, column=0, columnspan=2)
+
+        # Display answer options, or a text box for typed answers
+        option_frame = tk.Frame(main_frame)
+        option_frame.grid(row=3, column=0, columnspan=2, pady=10)
+        if self.mode == "typed":
+            self.display_answer_entry(option_frame)
+        else:
+            for i, option in enumerate(question_data["options"]):
+                self.theme.button(option_frame, "option", text=option,
+                                  command=lambda opt=option: self.choose_answer(opt)).grid(row=i // 2, column=i % 2,
+                                                                                            padx=10, pady=5,
+                                                                                            sticky="ew")
+            # Equal-width option buttons, sized from cached text measurements rather than by Tk per layout
+            width = max(self.theme.measure(option) for option in question_data["options"])
+            option_frame.grid_columnconfigure(0, minsize=width + 24, uniform="options")
+            option_frame.grid_columnconfigure(1, minsize=width + 24, uniform="options")
+
+        # Display HELP and CANCEL buttons
+        button_frame = tk.Frame(main_frame)
+        button_frame.grid(row=4, column=0, columnspan=2, pady=20)
+        self.theme.button(button_frame, "help", text=_("HELP"), command=self.display_help_callback).grid(row=0,
+                                                                                                         column=0,
+                                                                                                         padx=10)
+        self.theme.button(button_frame, "cancel", text=_("CANCEL"), command=self.cancel).grid(row=0, column=1, padx=10)
+        return main_frame
+
+    def prepare_next_question(self):
+        """
+        Idle callback while the feedback is up: draws the next question, loads its picture and builds its
+        screen off-screen, so Next Question only has to swap it in.
+        """
+        self.prepare_id = None
+        position = self.current_question_index + 1
+        if position >= self.num_rounds:
+            return
+        self.next_question_data = self.make_question_data(position)
+        self.prepared_frame = self.build_question_frame(self.next_question_data, position)
+
+    def record_paint(self, clicked_at, prepared):
+        """Idle callback after Next Question: finishes drawing the new screen and logs how long it took."""
+        self.root.update_idletasks()
+        milliseconds = (time.perf_counter() - clicked_at) * 1000
+        self.log_event("question_painted", ms=round(milliseconds, 2), prepared=prepared)
+
+    def update_countdown(self, seconds_left):
+        """Shows the seconds left, if the question is on screen (the clock keeps running during HELP)."""
+        if self.countdown_label.winfo_exists():
+            self.countdown_label.config(text=_("Time left: {seconds}s", seconds=seconds_left))
+
+    def time_out(self):
+        """Marks the current question wrong when its countdown runs out."""
+        self.record_input("timeout")
+        self.expiry_lateness.append(self.timer.lateness[-1])
+        self.check_answer(None)
+
+    def report_timer_accuracy(self):
+        """Logs how closely the speed-round countdowns kept to time, once per game."""
+        if not self.timer_lateness:
+            return
+        lateness_ms = sorted(seconds * 1000 for seconds in self.timer_lateness)
+        self.log_event("timer_accuracy", updates=len(lateness_ms),
+                       mean_ms=round(sum(lateness_ms) / len(lateness_ms), 2),
+                       p95_ms=round(lateness_ms[int(0.95 * (len(lateness_ms) - 1))], 2),
+                       worst_ms=round(lateness_ms[-1], 2), timeouts=len(self.expiry_lateness),
+                       worst_timeout_ms=round(max(self.expiry_lateness, default=0.0) * 1000, 2))
+
+    def stop_timers(self):
+        """Cancels the countdown and any pending speed-round advance."""
+        if self.timer:
+            self.timer.cancel()
+            self.timer_lateness.extend(self.timer.lateness)
+            self.timer = None
+        if self.advance_id is not None:
+            self.root.after_cancel(self.advance_id)
+            self.advance_id = None
+        if self.prepare_id is not None:
+            self.root.after_cancel(self.prepare_id)
+            self.prepare_id = None
+
+    def cancel(self):
+        """Leaves the game for the menu; the session snapshot is kept so it can be resumed."""
+        self.record_input("cancel")
+        self.stop_timers()
+        self.log_event("cancel")
+        self.show_menu_callback()
+
+    def log_event(self, event, **fields):
+        """Sends an event about this session and round to the event log and metrics, if there are any."""
+        if self.event_log:
+            self.event_log.emit(event, session=self.session_id, round=self.round_count + 1, **fields)
+        if self.metrics:
+            self.metrics.record(event, **fields)
+
+    def record_input(self, action, **fields):
+        """Sends a player input to the input recorder, if there is one."""
+        if self.recorder:
+            self.recorder.record(action, **fields)
+
+    def display_answer_entry(self, option_frame):
+        """Shows a text box with autocomplete suggestions for typed-answer mode."""
+        self.answer_entry = tk.Entry(option_frame)
+        self.answer_entry.grid(row=0, column=0, padx=10, pady=5)
+        self.answer_entry.focus_set()
+        self.theme.button(option_frame, "option", text=_("ANSWER"),
+                          command=lambda: self.choose_answer(self.answer_entry.get())).grid(row=0, column=1, padx=10,
+                                                                                           pady=5)
+
+        # Suggestions come from the prefix trie, so each keystroke is a handful of dict lookups
+        self.suggestion_list = tk.Listbox(option_frame, height=4, activestyle="none")
+        self.suggestion_list.grid(row=1, column=0, padx=10, pady=5)
+        self.answer_entry.bind("<KeyRelease>", self.update_suggestions)
+        self.answer_entry.bind("<Return>", lambda event: self.choose_answer(self.answer_entry.get()))
+        self.suggestion_list.bind("<<ListboxSelect>>", self.choose_suggestion)
+
+    def update_suggestions(self, event):
+        """Refreshes the suggestion list for the text typed so far."""
+        if event.keysym == "Return":
+            return
+        prefix = self.answer_entry.get().strip()
+        self.suggestion_list.delete(0, "end")
+        if prefix:
+            self.suggestion_list.insert("end", *self.quiz_data.answer_trie.suggest(prefix))
+
+    def choose_suggestion(self, event):
+        """Copies a clicked suggestion into the answer box."""
+        selection = self.suggestion_list.curselection()
+        if selection:
+            self.answer_entry.delete(0, "end")
+            self.answer_entry.insert(0, self.suggestion_list.get(selection[0]))
+
+    def choose_answer(self, selected_option):
+        """Handles an answer chosen or typed by the player."""
+        self.record_input("answer", answer=selected_option)
+        self.check_answer(selected_option)
 
     def check_answer(self, selected_option):
-        """Checks if the selected answer is correct and updates the score."""
-        question_data = self.quiz_data.questions[self.current_question_index]
+        """Checks if the selected answer is correct and updates the score; None means the time ran out."""
+        self.response_times.append(time.monotonic() - self.question_shown_at)
+        self.stop_timers()
+        question_data = self.question_data
         correct_option = question_data["options"][question_data["correct_index"]]
-
-        if selected_option == correct_option:
+        # The animal and the right answer travel with every answer so item_analytics can read the log directly
+        animal = self.quiz_data.questions[self.deck[self.current_question_index]]["key"]
+
+        if selected_option is None:
+            self.log_event("answer", animal=animal, answer=None, correct_answer=correct_option, correct=False,
+                           timed_out=True, seconds=self.response_times[-1])
+            feedback_text = _("Time's up! The correct answer is {answer}.", answer=correct_option)
+            self.finish_answer(feedback_text, "incorrect")
+            return
+
+        if self.mode == "typed" and correct_option in self.quiz_data.resolve_answer(selected_option):
+            # Close enough: small typos in typed answers are forgiven
+            selected_option = correct_option
+
+        is_correct = self.quiz_data.is_correct(question_data, selected_option)
+        self.log_event("answer", animal=animal, answer=selected_option, correct_answer=correct_option,
+                       correct=is_correct, timed_out=False, seconds=self.response_times[-1])
+        if is_correct:
             self.score += 1
-            feedback_text = "Correct!"
-            feedback_color = "#cde777"  # Light green for correct answer
+            feedback_text = _("Correct!")
+            feedback_role = "correct"  # Light green for correct answer
         else:
-            feedback_text = f"Incorrect! The correct answer is {correct_option}."
-            feedback_color = "#E76C6C"  # Light red for incorrect answer
-
-        self.display_feedback(feedback_text, feedback_color)
-
-    def display_feedback(self, feedback_text, feedback_color):
-        """Displays feedback for the user's answer before moving to the next question."""
+            feedback_text = _("Incorrect! The correct answer is {answer}.", answer=correct_option)
+            feedback_role = "incorrect"  # Light red for incorrect answer
+        self.finish_answer(feedback_text, feedback_role)
+
+    def finish_answer(self, feedback_text, feedback_role):
+        """Saves progress after an answer and shows the feedback."""
+        if self.profile:
+            # Persist after every answer so a closed window does not lose the seen questions
+            self.profile.save()
+        self.save_snapshot()
+        self.display_feedback(feedback_text, feedback_role)
+        if self.images and self.mode != "reverse" and self.round_count + 1 < self.num_rounds:
+            # Read and decode the next picture while the feedback is on screen
+            self.images.prefetch(self.quiz_data.questions[self.deck[self.current_question_index + 1]]["key"])
+        # Use the pause while the feedback is read to get the next question ready
+        self.prepare_id = self.root.after_idle(self.prepare_next_question)
+        if self.mode == "speed":
+            # Speed rounds keep moving without waiting for the button
+            self.advance_id = self.root.after(self.SPEED_FEEDBACK_MS, self.next_question, True)
+
+    def save_snapshot(self):
+        """Checkpoints the game after an answer so it can be resumed from the menu."""
+        SessionSnapshot(self.session_id, self.deck[:self.num_rounds], self.round_count + 1, self.score,
+                        self.response_times, self.mode, self.difficulty, self.profile.name if self.profile else "",
+                        len(self.quiz_data.questions)).save()
+
+    def display_feedback(self, feedback_text, feedback_role):
+        """
+        Displays feedback for the user's answer before moving to the next question.
+        :param feedback_role: Theme colour role for the feedback, "correct" or "incorrect".
+        """
         self.clear_window()
 
-        feedback_frame = tk.Frame(self.root, bg=feedback_color)
+        feedback_frame = self.theme.colour(tk.Frame(self.root), background=feedback_role)
         feedback_frame.place(relx=0.5, rely=0.5, anchor="center")
 
-        tk.Label(feedback_frame, text=feedback_text, font=("Helvetica", 14), bg=feedback_color).grid(
-            row=0, column=0, columnspan=2, pady=20, padx=20)
+        self.theme.colour(tk.Label(feedback_frame, text=feedback_text, font=self.theme.font("large")),
+                          background=feedback_role, foreground="button_text").grid(row=0, column=0, columnspan=2,
+                                                                                    pady=20, padx=20)
 
         # Button to move to the next question
-        next_button = tk.Button(feedback_frame, text="Next Question", command=self.next_question,
-                                font=("Helvetica", 12), bg="#C2C2C2", relief="flat")
+        next_button = self.theme.button(feedback_frame, "next", text=_("Next Question"), command=self.next_question)
         next_button.grid(row=1, column=0, columnspan=2, pady=10)
 
-    def next_question(self):
-        """Moves to the next question."""
+    def next_question(self, auto=False):
+        """Moves to the next question; auto is True when a speed round moves on by itself."""
+        self.record_input("next", auto=auto)
+        clicked_at = time.perf_counter()
+        prepared = self.prepared_frame is not None
+        self.stop_timers()
         self.round_count += 1
         self.current_question_index += 1
+        self.question_data, self.next_question_data = self.next_question_data, None
         self.display_question()
+        if self.round_count < self.num_rounds:
+            self.root.after_idle(self.record_paint, clicked_at, prepared)
 
-    def clear_window(self):
-        """Clears the tkinter window of all widgets."""
+    def clear_window(self, keep=None):
+        """Clears the tkinter window of all widgets, except keep if given."""
         for widget in self.root.winfo_children():
-            widget.destroy()
+            if widget is not keep:
+                widget.destroy()
 
 
 class Help:
     """Displays help instructions for the quiz."""
 
-    def __init__(self, root, dismiss_help_callback):
+    def __init__(self, root, theme, dismiss_help_callback, event_log=None, session_id=None):
         """
         Initializes the Help class.
         :param root: The main tkinter root window.
+        :param theme: The app's Theme.
         :param dismiss_help_callback: Callback to dismiss the help screen.
+        :param event_log: Optional EventLog that records the help screen being opened.
+        :param session_id: The game the help was opened from.
         """
         self.root = root
+        self.theme = theme
         self.dismiss_help_callback = dismiss_help_callback
+        if event_log:
+            event_log.emit("help_opened", session=session_id)
         self.show_help()
 
     def show_help(self):
         """Displays help text explaining the quiz rules."""
         self.clear_window()
-        main_frame = tk.Frame(self.root, bg="#DAE8FC")
+        main_frame = self.theme.colour(tk.Frame(self.root), background="help_background")
         main_frame.place(relx=0.5, rely=0.5, anchor="center")
 
-        tk.Label(main_frame, text="This is a quiz about young animals. Select your answer from the options.",
-                 wraplength=300, justify="center", bg="#DAE8FC", font=("Helvetica", 12)).grid(row=0, column=0, padx=20,
-                                                                                              pady=10)
-        tk.Button(main_frame, text="Dismiss", command=self.dismiss_help_callback,
-                  bg="#AED581", font=("Helvetica", 12), relief="flat").grid(row=1, column=0, pady=20, padx=20)
+        self.theme.colour(tk.Label(main_frame, wraplength=300, justify="center",
+                                   text=_("This is a quiz about young animals. Select your answer from the options.")),
+                          background="help_background").grid(row=0, column=0, padx=20, pady=10)
+        self.theme.button(main_frame, "go", text=_("Dismiss"), command=self.dismiss_help_callback).grid(row=1, column=0,
+                                                                                                     pady=20, padx=20)
+
+    def clear_window(self):
+        """Clears the tkinter window of all widgets."""
+        for widget in self.root.winfo_children():
+            widget.destroy()
+
+
+class Browse:
+    """Scrollable list of every animal and its young-name, with a search box."""
+
+    VISIBLE_ROWS = 12
+    ROW_HEIGHT = 22
+
+    def __init__(self, root, theme, quiz_data, dismiss_browse_callback):
+        """
+        Initializes the Browse class.
+        :param root: The main tkinter root window.
+        :param theme: The app's Theme.
+        :param quiz_data: The QuizData object containing quiz questions.
+        :param dismiss_browse_callback: Callback to leave the browse screen.
+        """
+        self.root = root
+        self.theme = theme
+        self.quiz_data = quiz_data
+        self.dismiss_browse_callback = dismiss_browse_callback
+        self.rows = range(len(quiz_data.questions))
+        self.first_row = 0
+        self.show_browse()
+
+    def show_browse(self):
+        """Displays the search box and the list of animals."""
+        self.clear_window()
+        main_frame = tk.Frame(self.root)
+        main_frame.place(relx=0.5, rely=0.5, anchor="center")
+
+        tk.Label(main_frame, text=_("Browse animals"), font=self.theme.font("heading")).grid(row=0, column=0,
+                                                                                           columnspan=2, pady=10)
+        self.search_entry = tk.Entry(main_frame)
+        self.search_entry.grid(row=1, column=0, columnspan=2, pady=5)
+        self.search_entry.bind("<KeyRelease>", self.filter_rows)
+        self.search_entry.focus_set()
+        self.count_label = tk.Label(main_frame, text="", font=self.theme.font("small"))
+        self.count_label.grid(row=2, column=0, columnspan=2)
+
+        # Only VISIBLE_ROWS pairs of canvas text items exist; scrolling changes their text
+        self.canvas = tk.Canvas(main_frame, width=300, height=self.VISIBLE_ROWS * self.ROW_HEIGHT)
+        self.canvas.grid(row=3, column=0, pady=5)
+        self.scrollbar = tk.Scrollbar(main_frame, command=self.scroll)
+        self.scrollbar.grid(row=3, column=1, sticky="ns", pady=5)
+        self.row_items = []
+        for i in range(self.VISIBLE_ROWS):
+            y = i * self.ROW_HEIGHT + self.ROW_HEIGHT // 2
+            self.row_items.append((
+                self.canvas.create_text(10, y, anchor="w", font=self.theme.font("body"),
+                                        fill=self.theme.colours["text"]),
+                self.canvas.create_text(200, y, anchor="w", font=self.theme.font("italic"),
+                                        fill=self.theme.colours["text"])
+            ))
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.canvas.bind(sequence, self.on_mouse_wheel)
+
+        self.theme.button(main_frame, "go", text=_("Back"), command=self.dismiss_browse_callback).grid(
+            row=4, column=0, columnspan=2, pady=10)
+        self.render_rows()
+
+    def filter_rows(self, event=None):
+        """Narrows the list to rows containing the search text, using the n-gram index."""
+        self.rows = self.quiz_data.get_search_index().search(self.search_entry.get().strip())
+        self.first_row = 0
+        self.render_rows()
+
+    def scroll(self, action, amount, unit=None):
+        """Handles scrollbar commands: ("moveto", fraction) or ("scroll", count, "units"/"pages")."""
+        if action == "moveto":
+            self.first_row = int(float(amount) * len(self.rows))
+        else:
+            self.first_row += int(amount) * (self.VISIBLE_ROWS if unit == "pages" else 1)
+        self.render_rows()
+
+    def on_mouse_wheel(self, event):
+        """Scrolls three rows per wheel notch (Button-4/5 on Linux, MouseWheel elsewhere)."""
+        self.scroll("scroll", -3 if event.num == 4 or event.delta > 0 else 3, "units")
+
+    def render_rows(self):
+        """Copies the rows currently in view into the pooled canvas items."""
+        total = len(self.rows)
+        self.first_row = max(0, min(self.first_row, total - self.VISIBLE_ROWS))
+        for offset, (animal_item, young_item) in enumerate(self.row_items):
+            position = self.first_row + offset
+            if position < total:
+                question = self.quiz_data.questions[self.rows[position]]
+                self.canvas.itemconfigure(animal_item, text=question["animal"])
+                self.canvas.itemconfigure(young_item, text=question["answer"])
+            else:
+                self.canvas.itemconfigure(animal_item, text="")
+                self.canvas.itemconfigure(young_item, text="")
+        if total:
+            self.scrollbar.set(self.first_row / total, min(1.0, (self.first_row + self.VISIBLE_ROWS) / total))
+        else:
+            self.scrollbar.set(0, 1)
+        self.count_label.config(text=_("{count} animals", count=total))
 
     def clear_window(self):
         """Clears the tkinter window of all widgets."""
@@ -249,42 +713,127 @@ class Help:
 class YoungAnimalQuiz:
     """Main app that orchestrates the menu, gameplay, and help functionality."""
 
-    def __init__(self, root):
+    def __init__(self, root, metrics=None, recorder=None, seeds=None):
         """
         Initializes the YoungAnimalQuiz app.
         :param root: The main tkinter root window.
+        :param metrics: Optional QuizMetrics to keep up to date for the kiosk's exporter.
+        :param recorder: Optional InputRecorder that records every player input.
+        :param seeds: Optional iterator of game seeds, used in order instead of fresh random ones (for replays).
         """
         self.root = root
         self.root.title("Young Animal Quiz")
         self.root.geometry("450x450")  # Set a fixed window size for better display
-        self.root.configure(bg="#F0F4C3")
-        self.quiz_data = QuizData('animals_young_only.csv')  # Load quiz questions from the CSV file
+        # Fonts, colours and widget defaults for every screen
+        self.theme = Theme(self.root)
+        self.metrics = metrics
+        self.recorder = recorder
+        self.seeds = seeds
+        # Load quiz questions from the CSV file, plus the difficulty table if analytics have been run
+        load_started = time.perf_counter()
+        self.quiz_data = QuizData('animals_young_only.csv', difficulty_file='item_difficulty.csv'
+                                  if os.path.exists('item_difficulty.csv') else None, catalog=get_catalog())
+        if self.metrics:
+            self.metrics.bank_load_seconds.set(time.perf_counter() - load_started)
+        self.profiles = {}  # Player profiles loaded so far, keyed by lower-case name
+        self.result_log = ResultLog()
+        self.images = AnimalImages(self.root)  # Pictures in images/<animal>.png, if any
+        self.event_log = EventLog()  # Session events in logs/events.jsonl
+        # Closing the window flushes the event log while its folder is certain to still exist
+        self.root.protocol("WM_DELETE_WINDOW", self.quit)
         self.show_menu()
 
+    def close(self):
+        """Writes out the event log and stops the picture reader; safe to call more than once."""
+        self.event_log.close()
+        self.images.close()
+
+    def quit(self):
+        """Window close button: shuts the app down cleanly, then destroys the window."""
+        self.close()
+        self.root.destroy()
+
     def show_menu(self):
         """Displays the main menu screen."""
         self.clear_window()
-        self.menu = Menu(self.root, self.start_game)
+        # An unfinished game (cancelled, or the window was closed) can be picked up again
+        resume_callback = self.resume_game if os.path.exists(SessionSnapshot.PATH) else None
+        self.menu = Menu(self.root, self.theme, self.start_game, self.show_browse, resume_callback, self.recorder)
 
-    def start_game(self, rounds):
-        """Starts the game with the specified number of rounds."""
+    def start_game(self, rounds, difficulty="medium", player_name="", mode="choice", snapshot=None):
+        """Starts the game with the chosen number of rounds, distractor difficulty, optional player and mode."""
+        self.clear_window()
+        profile = None
+        if player_name:
+            # Profiles are read once per session and kept in memory afterwards
+            if player_name.lower() not in self.profiles:
+                self.profiles[player_name.lower()] = PlayerProfile.load(player_name)
+            profile = self.profiles[player_name.lower()]
+        seed = next(self.seeds, None) if self.seeds else None
+        if seed is None:
+            seed = random.randrange(2 ** 32)
+        self.play = Play(self.root, self.theme, self.quiz_data, rounds, self.show_menu, self.show_help,
+                         self.show_final_score, difficulty, profile, mode, snapshot, self.images, self.event_log,
+                         self.metrics, seed, self.recorder)
+
+    def resume_game(self):
+        """Carries on the unfinished game saved in the session snapshot."""
+        self.record_input("resume")
+        snapshot = SessionSnapshot.load()
+        if snapshot is None or snapshot.bank_size != len(self.quiz_data.questions) or \
+                snapshot.answered >= len(snapshot.deck):
+            # Unreadable, from a different question bank, or already finished
+            SessionSnapshot.discard()
+            self.show_menu()
+            return
+        self.start_game(len(snapshot.deck), snapshot.difficulty, snapshot.player_name, snapshot.mode, snapshot)
+
+    def show_browse(self):
+        """Displays the browse animals screen."""
+        self.record_input("browse")
         self.clear_window()
-        self.play = Play(self.root, self.quiz_data, rounds, self.show_menu, self.show_help, self.show_final_score)
+        self.browse = Browse(self.root, self.theme, self.quiz_data, self.close_browse)
+
+    def close_browse(self):
+        """Leaves the browse screen for the menu."""
+        self.record_input("back")
+        self.show_menu()
 
     def show_help(self):
         """Displays the help screen."""
+        self.record_input("help")
         self.clear_window()
-        self.help = Help(self.root, self.play.display_question)
+        self.help = Help(self.root, self.theme, self.dismiss_help, self.event_log, self.play.session_id)
+
+    def dismiss_help(self):
+        """Goes back from the help screen to the current question."""
+        self.record_input("dismiss")
+        self.play.display_question()
 
     def show_final_score(self, score):
         """Displays the final score at the end of the game."""
+        self.result_log.record(self.play.session_id, self.play.mode, self.play.difficulty, self.play.num_rounds, score)
+        SessionSnapshot.discard()
+        self.event_log.emit("session_end", session=self.play.session_id, score=score, rounds=self.play.num_rounds)
+        if self.metrics:
+            self.metrics.record("session_end", score=score, rounds=self.play.num_rounds)
         self.clear_window()
-        main_frame = tk.Frame(self.root, bg="#F0F4C3")
+        main_frame = tk.Frame(self.root)
         main_frame.place(relx=0.5, rely=0.5, anchor="center")
-        tk.Label(main_frame, text=f"End of {self.play.num_rounds} rounds. Your final score is {score}", bg="#F0F4C3",
-                 font=("Helvetica", 14)).grid(row=0, column=0, pady=10, padx=20)
-        tk.Button(main_frame, text="Play Again", command=self.show_menu, bg="#AED581", font=("Helvetica", 12),
-                  relief="flat").grid(row=1, column=0, pady=20, padx=20)
+        tk.Label(main_frame, text=_("End of {rounds} rounds. Your final score is {score}", rounds=self.play.num_rounds,
+                                    score=score), font=self.theme.font("large")).grid(row=0, column=0, pady=10, padx=20)
+        self.theme.button(main_frame, "go", text=_("Play Again"), command=self.play_again).grid(row=1, column=0,
+                                                                                                pady=20, padx=20)
+
+    def play_again(self):
+        """Goes from the final score back to the menu."""
+        self.record_input("play_again")
+        self.show_menu()
+
+    def record_input(self, action, **fields):
+        """Sends a player input to the input recorder, if there is one."""
+        if self.recorder:
+            self.recorder.record(action, **fields)
 
     def clear_window(self):
         """Clears the tkinter window of all widgets."""
@@ -293,6 +842,50 @@ class YoungAnimalQuiz:
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Young Animal Quiz.")
+    parser.add_argument("--locale", help="language for the quiz, e.g. es (compiled catalogs are in locales/)")
+    parser.add_argument("--metrics-port", type=int, help="serve Prometheus metrics on this localhost port")
+    parser.add_argument("--record", metavar="FILE", help="record every player input to this JSON-lines file")
+    parser.add_argument("--replay", metavar="FILE", help="play back a recording and report screen transition times")
+    parser.add_argument("--fast", action="store_true", help="replay as fast as possible instead of at recorded pace")
+    parser.add_argument("--replay-report", metavar="CSV", help="write every replayed transition time to this file")
+    parser.add_argument("--max-transition-ms", type=float, help="exit with status 1 if any transition is slower")
+    args = parser.parse_args()
+    if args.locale:
+        set_locale(args.locale)
+
     root = tk.Tk()
-    app = YoungAnimalQuiz(root)
-    root.mainloop()
+    quiz_metrics = None
+    if args.metrics_port:
+        quiz_metrics = QuizMetrics()
+        quiz_metrics.serve(args.metrics_port)
+        quiz_metrics.probe_loop_lag(root)
+
+    if args.replay:
+        replayer = InputReplayer(args.replay)
+        report_path = os.path.abspath(args.replay_report) if args.replay_report else None
+        # Profiles, results and snapshots made by the replay go to a scratch folder, not the kiosk's files
+        scratch_dir = tempfile.mkdtemp(prefix="quiz-replay-")
+        for file_name in ("animals_young_only.csv", "item_difficulty.csv"):
+            if os.path.exists(file_name):
+                shutil.copy(file_name, scratch_dir)
+        if os.path.isdir("images"):
+            shutil.copytree("images", os.path.join(scratch_dir, "images"))
+        os.chdir(scratch_dir)
+        app = YoungAnimalQuiz(root, quiz_metrics, seeds=replayer.seeds())
+        replayer.start(root, app, args.fast, on_finish=root.quit)
+        root.mainloop()
+        slowest = replayer.report(report_path)
+        app.close()  # Before the scratch folder holding its event log is removed
+        root.destroy()
+        shutil.rmtree(scratch_dir, ignore_errors=True)
+        if args.max_transition_ms is not None and slowest > args.max_transition_ms:
+            print(f"Error: slowest transition took {slowest:.2f} ms, over the {args.max_transition_ms} ms limit.")
+            raise SystemExit(1)
+    else:
+        recorder = InputRecorder(args.record) if args.record else None
+        app = YoungAnimalQuiz(root, quiz_metrics, recorder)
+        root.mainloop()
+        app.close()
+        if recorder:
+            recorder.close()
@@ -0,0 +1,1156 @@
+import array
+import csv
+import hashlib
+import itertools
+import os
+import random
+import re
+import struct
+
+from localization import SOURCE_LOCALE, load_catalog
+
+# numpy is only imported, by load_numpy, once a bank large enough to gain from it is scored
+numpy = None
+NUMPY_CHECKED = False
+BYTE_BIT_COUNTS = None  # Set bits in every byte value, for counting the bits of numpy masks
+
+
+def load_numpy():
+    """Imports numpy on first use, so small banks start without paying for it; None if it is not installed."""
+    global numpy, NUMPY_CHECKED, BYTE_BIT_COUNTS
+    if not NUMPY_CHECKED:
+        NUMPY_CHECKED = True
+        try:
+            import numpy as module
+        except ImportError:
+            return None
+        numpy = module
+        BYTE_BIT_COUNTS = numpy.array([bin(value).count("1") for value in range(256)])
+    return numpy
+
+
+class AliasTable:
+    """
+    Walker alias table giving O(1) weighted draws over row indexes.
+    Single rows can be reweighted without a rebuild: changed rows move to a small Fenwick tree and
+    are drawn from it in proportion to its share of the total weight, while draws from the table
+    that land on a changed row are rejected. The table is only rebuilt once the changed rows fill
+    the tree or hold half the table's weight, so updates cost amortized O(1) plus O(log changed rows).
+    """
+
+    def __init__(self, weights):
+        """
+        Builds the alias table for the given weights.
+        :param weights: Non-negative weight for each row, at least one positive.
+        """
+        self.build(weights)
+
+    def build(self, weights):
+        """Rebuilds the probability and alias columns in O(n), folding in any updated rows."""
+        size = len(weights)
+        total = float(sum(weights))
+        if size == 0 or total <= 0 or min(weights) < 0:
+            raise ValueError("Weights must be non-negative with at least one positive value.")
+
+        # Scale weights so the average bucket holds exactly 1.0
+        scaled = [weight * size / total for weight in weights]
+        self.probability = [1.0] * size
+        self.alias = list(range(size))
+
+        small = [i for i, value in enumerate(scaled) if value < 1.0]
+        large = [i for i, value in enumerate(scaled) if value >= 1.0]
+        while small and large:
+            # Top up an under-full bucket with probability mass from an over-full one
+            less, more = small.pop(), large.pop()
+            self.probability[less] = scaled[less]
+            self.alias[less] = more
+            scaled[more] += scaled[less] - 1.0
+            if scaled[more] < 1.0:
+                small.append(more)
+            else:
+                large.append(more)
+        # Anything left over is full up to floating point error
+
+        self.weights = [float(weight) for weight in weights]  # The weights the table was built from
+        self.total = total
+        # Rows reweighted since the build: row -> slot in the tree, and each slot's row and weight
+        self.changed = {}
+        self.changed_rows = []
+        self.changed_weights = []
+        self.capacity = max(16, size // 16)
+        self.tree = [0.0] * (self.capacity + 1)  # Fenwick tree over the slots' weights
+        self.changed_total = 0.0
+        self.retired_total = 0.0  # Weight the table still gives to changed rows, all of it rejected
+
+    def update(self, index, weight):
+        """
+        Sets the weight of one row in amortized O(1) + O(log changed rows).
+        :raises ValueError: If no row is left with a positive weight.
+        """
+        weight = float(weight)
+        if weight < 0:
+            raise ValueError("Weights must be non-negative with at least one positive value.")
+        slot = self.changed.get(index)
+        if slot is None:
+            if len(self.changed_rows) >= self.capacity or \
+                    self.retired_total + self.weights[index] > self.total / 2:
+                # Enough has changed that rejections would add up: start over from the current weights
+                self.build(self.current_weights(index, weight))
+                return
+            slot = self.changed[index] = len(self.changed_rows)
+            self.changed_rows.append(index)
+            self.changed_weights.append(0.0)
+            self.retired_total += self.weights[index]
+        delta = weight - self.changed_weights[slot]
+        self.changed_weights[slot] = weight
+        self.changed_total += delta
+        position = slot + 1
+        while position <= self.capacity:
+            self.tree[position] += delta
+            position += position & -position
+        if self.total - self.retired_total + self.changed_total <= self.total * 1e-12:
+            self.build(self.current_weights())  # Every weight is zero: raises ValueError
+
+    def current_weights(self, index=None, weight=None):
+        """Every row's weight with the updates applied, plus an optional new weight for one more row."""
+        weights = list(self.weights)
+        for row, changed_weight in zip(self.changed_rows, self.changed_weights):
+            weights[row] = changed_weight
+        if index is not None:
+            weights[index] = weight
+        return weights
+
+    def compact(self):
+        """Folds updated rows back into the probability and alias columns, for readers of those columns."""
+        if self.changed_rows:
+            self.build(self.current_weights())
+
+    def sample(self, rng=random):
+        """Draws one row index in O(1), or O(log changed rows) when the draw falls among updated rows."""
+        if self.changed_rows:
+            live_total = self.total - self.retired_total
+            changed_total = max(self.changed_total, 0.0)
+            if rng.random() * (live_total + changed_total) < changed_total:
+                return self.sample_changed(rng.random() * changed_total)
+        while True:
+            bucket = rng.randrange(len(self.probability))
+            index = bucket if rng.random() < self.probability[bucket] else self.alias[bucket]
+            # Changed rows are drawn from the tree instead; rejecting them here leaves the rest in proportion
+            if index not in self.changed:
+                return index
+
+    def sample_changed(self, target):
+        """The updated row whose share of the tree's weight covers target."""
+        position = 0
+        step = 1 << self.capacity.bit_length()
+        while step:
+            following = position + step
+            if following <= self.capacity and self.tree[following] <= target:
+                position = following
+                target -= self.tree[following]
+            step >>= 1
+        # Rounding can push target past the last slot; stay on a row that has weight
+        slot = min(position, len(self.changed_rows) - 1)
+        while slot > 0 and self.changed_weights[slot] <= 0:
+            slot -= 1
+        return self.changed_rows[slot]
+
+
+def edit_distance(first, second):
+    """
+    Returns the Levenshtein distance between two strings.
+    Uses the bit-parallel algorithm of Myers and Hyyrö, which handles a whole
+    column of the distance table per character with a handful of integer operations.
+    """
+    if len(first) < len(second):
+        first, second = second, first
+    if not second:
+        return len(first)
+
+    # One bit per position of the shorter string where each character occurs
+    char_masks = {}
+    for i, char in enumerate(second):
+        char_masks[char] = char_masks.get(char, 0) | 1 << i
+    full = (1 << len(second)) - 1
+    last_bit = 1 << (len(second) - 1)
+
+    plus_vertical, minus_vertical, distance = full, 0, len(second)
+    for char in first:
+        match = char_masks.get(char, 0)
+        cross_vertical = match | minus_vertical
+        cross_horizontal = (((match & plus_vertical) + plus_vertical) ^ plus_vertical) | match
+        plus_horizontal = minus_vertical | ~(cross_horizontal | plus_vertical)
+        minus_horizontal = plus_vertical & cross_horizontal
+        if plus_horizontal & last_bit:
+            distance += 1
+        elif minus_horizontal & last_bit:
+            distance -= 1
+        plus_horizontal = (plus_horizontal << 1) | 1
+        minus_horizontal <<= 1
+        plus_vertical = (minus_horizontal | ~(cross_vertical | plus_horizontal)) & full
+        minus_vertical = plus_horizontal & cross_vertical
+    return distance
+
+
+def shared_prefix_length(first, second):
+    """Returns how many leading characters two strings have in common."""
+    length = 0
+    for first_char, second_char in zip(first, second):
+        if first_char != second_char:
+            break
+        length += 1
+    return length
+
+
+def edit_distances(first, first_lengths, second, second_lengths):
+    """
+    Returns the Levenshtein distances of many pairs of strings at once with numpy.
+    The distance table is filled one row at a time for every pair together; within a row, insertions
+    are a running minimum, so each row is a handful of whole-array operations.
+    :param first: Character codes of the first string of each pair, one padded row per pair.
+    :param first_lengths: Length of each first string.
+    :param second: Character codes of the second strings, padded the same way.
+    :param second_lengths: Length of each second string.
+    """
+    pairs, width = second.shape
+    # Distances never exceed the longer string, so small integers keep the table in cache
+    columns = numpy.arange(width + 1, dtype=numpy.int16)
+    row = numpy.tile(columns, (pairs, 1))  # Distances from the empty start of each first string
+    distances = second_lengths.copy()
+    for i in range(1, int(first_lengths.max(initial=0)) + 1):
+        best = numpy.empty_like(row)
+        best[:, 0] = i
+        # Substituting (free where the characters match) or deleting
+        numpy.minimum(row[:, :-1] + (second != first[:, i - 1:i]), row[:, 1:] + 1, out=best[:, 1:])
+        # Inserting: row[j] = min over k <= j of best[k] + (j - k)
+        row = numpy.minimum.accumulate(best - columns, axis=1) + columns
+        done = first_lengths == i
+        distances[done] = row[done, second_lengths[done]]
+    return distances
+
+
+def bit_counts(masks):
+    """Number of set bits in each of an array of non-negative 64-bit masks."""
+    return BYTE_BIT_COUNTS[masks.view(numpy.uint8)].reshape(len(masks), 8).sum(axis=1)
+
+
+class DistractorIndex:
+    """
+    Groups young-names into easy, medium and hard distractor tiers for each answer.
+    All similarity work happens once when the bank is loaded; draws during play are O(1).
+    Large banks are scored with numpy when it is installed and their tiers are cached on disk, so each
+    is only scored the first time it is loaded; small banks use plain Python and never import numpy.
+    """
+
+    DIFFICULTIES = ("easy", "medium", "hard")
+
+    # Above this many distinct young-names each name is only scored against a
+    # bounded pool of candidates instead of every other name
+    FULL_COMPARISON_LIMIT = 300
+    CANDIDATE_POOL_SIZE = 24
+
+    # Banks with more young-names than this keep their tiers in the cache directory and are scored with numpy
+    CACHE_MIN_NAMES = 100
+    CACHE_MAGIC = b"YAQT"
+    CACHE_VERSION = 1  # Bump whenever the scoring changes, so older cache files are ignored
+    CACHE_HEADER = struct.Struct("<4sII")  # magic, version, number of young-names
+    PAIR_BATCH = 65536  # Pairs scored per numpy batch, which bounds the edit distance table to a few MB
+
+    def __init__(self, young_names, frequencies, classes=None, rng=None, cache_directory=None, use_numpy=True):
+        """
+        Builds the tiers for every young-name, or reads them from the cache.
+        :param young_names: Distinct young-names, indexed by young-name id.
+        :param frequencies: Number of animals sharing each young-name.
+        :param classes: Optional set of taxonomic classes for each young-name.
+        :param rng: Random number generator used to pick candidate pools for large banks. A fixed seed
+                    if not given, so a bank gets the same tiers on every load.
+        :param cache_directory: Folder for cached tiers; None to always score.
+        :param use_numpy: Set to False to force the pure Python scoring path for large banks too.
+        """
+        self.young_names = young_names
+        self.use_numpy = use_numpy and len(young_names) > self.CACHE_MIN_NAMES
+        rng = rng or random.Random(0)
+        self.prefix_buckets = {}
+        self.suffix_buckets = {}
+        if len(young_names) > self.FULL_COMPARISON_LIMIT:
+            for young_id, name in enumerate(young_names):
+                self.prefix_buckets.setdefault(name[:2], []).append(young_id)
+                self.suffix_buckets.setdefault(name[-2:], []).append(young_id)
+
+        cache_path = None
+        if cache_directory and len(young_names) > self.CACHE_MIN_NAMES:
+            # The key covers everything the tiers depend on, including the rng's state before any pool is drawn
+            cache_path = os.path.join(cache_directory, f"tiers-{self.cache_key(frequencies, classes, rng)}.bin")
+            self.tiers = self.load_tiers(cache_path)
+            if self.tiers is not None:
+                return
+
+        pools = [self.candidates(young_id, rng) for young_id in range(len(young_names))]
+        # Imported only on a cache miss, so a cached large bank starts without numpy as well
+        self.use_numpy = self.use_numpy and load_numpy() is not None
+        if self.use_numpy:
+            rankings = self.rank_with_numpy(pools, frequencies, classes)
+        else:
+            rankings = self.rank_with_python(pools, frequencies, classes)
+        self.tiers = [self.split_tiers(ranked) for ranked in rankings]
+        if cache_path:
+            self.save_tiers(cache_path)
+
+    def candidates(self, young_id, rng):
+        """Returns the young-name ids worth scoring against the given one."""
+        count = len(self.young_names)
+        if count <= self.FULL_COMPARISON_LIMIT:
+            return [other for other in range(count) if other != young_id]
+
+        # Large banks: names sharing a leading or trailing pair of letters, plus a random sample
+        name = self.young_names[young_id]
+        pool = set(self.prefix_buckets[name[:2]][:self.CANDIDATE_POOL_SIZE])
+        pool.update(self.suffix_buckets[name[-2:]][:self.CANDIDATE_POOL_SIZE])
+        pool.update(rng.sample(range(count), self.CANDIDATE_POOL_SIZE))
+        pool.discard(young_id)
+        return sorted(pool)
+
+    @staticmethod
+    def split_tiers(ranked):
+        """Splits candidates ranked most similar first into thirds."""
+        # Each tier needs at least three names so a full set of options can be drawn
+        third = max(3, len(ranked) // 3)
+        middle = max(0, (len(ranked) - third) // 2)
+        return {
+            "hard": ranked[:third],
+            "medium": ranked[middle:middle + third],
+            "easy": ranked[-third:],
+        }
+
+    def rank_with_python(self, pools, frequencies, classes):
+        """Pure Python fallback with the same results as rank_with_numpy."""
+        # Similarity is symmetric, so each pair is scored once and reused for the other name
+        pair_scores = {}
+        rankings = []
+        for young_id, pool in enumerate(pools):
+            scored = []
+            for other in pool:
+                pair = (young_id, other) if young_id < other else (other, young_id)
+                score = pair_scores.get(pair)
+                if score is None:
+                    score = pair_scores[pair] = self.similarity(young_id, other, frequencies, classes)
+                scored.append((score, other))
+            scored.sort(reverse=True)
+            rankings.append([other for _, other in scored])
+        return rankings
+
+    def rank_with_numpy(self, pools, frequencies, classes):
+        """
+        Scores every candidate pair in batches of whole-array operations and ranks each pool, most similar first.
+        The arithmetic is done in the same order as similarity, so both paths give identical tiers.
+        """
+        count = len(self.young_names)
+        lengths = numpy.array([len(name) for name in self.young_names], dtype=numpy.int64)
+        width = max(1, int(lengths.max(initial=0)))
+        # Character codes padded with -1, forwards for prefixes and edit distances and reversed for suffixes
+        codes = numpy.full((count, width), -1, dtype=numpy.int32)
+        reversed_codes = numpy.full((count, width), -1, dtype=numpy.int32)
+        for young_id, name in enumerate(self.young_names):
+            characters = [ord(char) for char in name]
+            codes[young_id, :len(characters)] = characters
+            reversed_codes[young_id, :len(characters)] = characters[::-1]
+        frequencies = numpy.array(frequencies, dtype=numpy.int64)
+        class_masks = self.class_masks(classes)
+
+        pool_sizes = [len(pool) for pool in pools]
+        owners = numpy.repeat(numpy.arange(count, dtype=numpy.int64), pool_sizes)
+        others = numpy.fromiter(itertools.chain.from_iterable(pools), dtype=numpy.int64, count=len(owners))
+        # Similarity is symmetric, so each pair is scored once and reused for the other name
+        keys = numpy.minimum(owners, others) * count + numpy.maximum(owners, others)
+        unique_keys, inverse = numpy.unique(keys, return_inverse=True)
+        pair_scores = numpy.empty(len(unique_keys))
+        for start in range(0, len(unique_keys), self.PAIR_BATCH):
+            batch = unique_keys[start:start + self.PAIR_BATCH]
+            first, second = batch // count, batch % count
+            first_lengths, second_lengths = lengths[first], lengths[second]
+            shortest = numpy.minimum(first_lengths, second_lengths)
+
+            # Shared beginnings or endings, e.g. kit/kitten or duckling/gosling
+            prefix = numpy.minimum(numpy.cumprod(codes[first] == codes[second], axis=1).sum(axis=1), shortest)
+            suffix = numpy.minimum(numpy.cumprod(reversed_codes[first] == reversed_codes[second], axis=1).sum(axis=1),
+                                   shortest)
+            affix_score = numpy.minimum(1.0, numpy.maximum(prefix, suffix) / numpy.maximum(shortest, 1))
+
+            # Only as many columns as the longest name in the batch
+            used = max(1, int(numpy.maximum(first_lengths, second_lengths).max()))
+            distances = edit_distances(codes[first, :used], first_lengths, codes[second, :used], second_lengths)
+            longest = numpy.maximum(numpy.maximum(first_lengths, second_lengths), 1)
+            spelling_score = 1.0 - distances / longest
+            frequency_score = (numpy.minimum(frequencies[first], frequencies[second]) /
+                               numpy.maximum(frequencies[first], frequencies[second]))
+            if class_masks is None:
+                class_score = numpy.zeros(len(batch))
+            elif isinstance(class_masks, list):
+                # More classes than fit in a bit mask: score them one pair at a time
+                class_score = numpy.array([self.class_similarity(int(young_id), int(other), classes)
+                                           for young_id, other in zip(first, second)], dtype=float)
+            else:
+                shared = bit_counts(class_masks[first] & class_masks[second])
+                either = bit_counts(class_masks[first] | class_masks[second])
+                both = (class_masks[first] != 0) & (class_masks[second] != 0)
+                class_score = numpy.where(both, shared / numpy.maximum(either, 1), 0.0)
+
+            pair_scores[start:start + len(batch)] = (0.35 * affix_score + 0.35 * spelling_score +
+                                                     0.15 * frequency_score + 0.15 * class_score)
+
+        # Highest score first and ties to the higher id, as sorting (score, other) pairs in reverse does
+        scores = pair_scores[inverse.ravel()]
+        order = numpy.lexsort((-others, -scores, owners))
+        ranked = others[order]
+        return [group.tolist() for group in numpy.split(ranked, numpy.cumsum(pool_sizes)[:-1])]
+
+    @staticmethod
+    def class_masks(classes):
+        """
+        One bit per taxonomic class for each young-name, as a numpy array; None without classes, or the
+        classes themselves if there are too many for a 63-bit mask.
+        """
+        if not classes or not any(classes):
+            return None
+        bits = {}
+        for names in classes:
+            for name in names:
+                bits.setdefault(name, len(bits))
+        if len(bits) > 63:
+            return list(classes)
+        return numpy.array([sum(1 << bits[name] for name in names) for names in classes], dtype=numpy.int64)
+
+    def similarity(self, young_id, other, frequencies, classes):
+        """Scores how plausible one young-name is as a wrong answer for another (0 to 1)."""
+        name = self.young_names[young_id]
+        other_name = self.young_names[other]
+        shortest = min(len(name), len(other_name)) or 1
+
+        # Shared beginnings or endings, e.g. kit/kitten or duckling/gosling
+        prefix = shared_prefix_length(name, other_name)
+        suffix = shared_prefix_length(name[::-1], other_name[::-1])
+        affix_score = min(1.0, max(prefix, suffix) / shortest)
+
+        spelling_score = 1.0 - edit_distance(name, other_name) / max(len(name), len(other_name), 1)
+        frequency_score = min(frequencies[young_id], frequencies[other]) / max(frequencies[young_id],
+                                                                                frequencies[other])
+        class_score = self.class_similarity(young_id, other, classes)
+        return 0.35 * affix_score + 0.35 * spelling_score + 0.15 * frequency_score + 0.15 * class_score
+
+    @staticmethod
+    def class_similarity(young_id, other, classes):
+        """Share of taxonomic classes two young-names have in common; 0 if either has none."""
+        if classes and classes[young_id] and classes[other]:
+            return len(classes[young_id] & classes[other]) / len(classes[young_id] | classes[other])
+        return 0.0
+
+    def cache_key(self, frequencies, classes, rng):
+        """Hex digest of everything the tiers are built from."""
+        key = (self.CACHE_VERSION, self.FULL_COMPARISON_LIMIT, self.CANDIDATE_POOL_SIZE, self.young_names,
+               list(frequencies), [sorted(names) for names in classes] if classes else None, rng.getstate())
+        return hashlib.sha256(repr(key).encode("utf-8")).hexdigest()[:20]
+
+    def load_tiers(self, path):
+        """Reads cached tiers, or returns None if there are none or the file does not fit this bank."""
+        count = len(self.young_names)
+        starts = array.array("I")
+        ids = array.array("I")
+        try:
+            with open(path, "rb") as file:
+                data = file.read()
+            magic, version, cached_count = self.CACHE_HEADER.unpack_from(data)
+            ids_offset = self.CACHE_HEADER.size + (count * len(self.DIFFICULTIES) + 1) * starts.itemsize
+            starts.frombytes(data[self.CACHE_HEADER.size:ids_offset])
+            ids.frombytes(data[ids_offset:])
+        except (OSError, struct.error, ValueError):
+            return None
+        if (magic != self.CACHE_MAGIC or version != self.CACHE_VERSION or cached_count != count or
+                len(starts) != count * len(self.DIFFICULTIES) + 1 or starts[-1] != len(ids)):
+            return None
+        tiers = []
+        for young_id in range(count):
+            slot = young_id * len(self.DIFFICULTIES)
+            tiers.append({difficulty: ids[starts[slot + i]:starts[slot + i + 1]].tolist()
+                          for i, difficulty in enumerate(self.DIFFICULTIES)})
+        return tiers
+
+    def save_tiers(self, path):
+        """Writes the tiers atomically: a header, where each tier starts, then every tier's ids."""
+        starts = array.array("I", [0])
+        ids = array.array("I")
+        for tiers in self.tiers:
+            for difficulty in self.DIFFICULTIES:
+                ids.extend(tiers[difficulty])
+                starts.append(len(ids))
+        # Worker processes loading the same bank may race to write it, so each uses its own temp file
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(temp_path, "wb") as file:
+                file.write(self.CACHE_HEADER.pack(self.CACHE_MAGIC, self.CACHE_VERSION, len(self.tiers)))
+                file.write(starts.tobytes())
+                file.write(ids.tobytes())
+            os.replace(temp_path, path)
+        except OSError as error:
+            print(f"Error: could not cache the distractor tiers in '{path}': {error}")
+
+    def draw(self, young_id, difficulty="medium", count=3, rng=random):
+        """
+        Draws distinct distractor ids for a young-name in O(1).
+        :param young_id: Id of the correct young-name.
+        :param difficulty: One of "easy", "medium" or "hard".
+        :param count: Number of distractors wanted.
+        :param rng: Random number generator to draw from.
+        """
+        tier = self.tiers[young_id][difficulty]
+        if len(tier) <= count:
+            return list(tier)
+        drawn = []
+        while len(drawn) < count:
+            # Rejection of repeats keeps each draw constant time
+            other = tier[rng.randrange(len(tier))]
+            if other not in drawn:
+                drawn.append(other)
+        return drawn
+
+
+class AnswerTrie:
+    """Prefix trie over young-names that answers autocomplete queries in O(prefix length)."""
+
+    def __init__(self, names, frequencies, limit=8):
+        """
+        Builds the trie, storing the best completions on every node.
+        :param names: Distinct young-names, indexed by young-name id.
+        :param frequencies: How often each young-name is an answer; more common names are suggested first.
+        :param limit: Maximum number of suggestions kept per prefix.
+        """
+        self.names = names
+        self.root = {}
+        # Inserting the most common names first means each node's list is already its top suggestions
+        for young_id in sorted(range(len(names)), key=lambda i: (-frequencies[i], names[i])):
+            node = self.root
+            for char in names[young_id].lower():
+                node = node.setdefault(char, {})
+                suggestions = node.setdefault(None, [])
+                if len(suggestions) < limit:
+                    suggestions.append(young_id)
+
+    def suggest(self, prefix):
+        """Returns up to the configured number of young-names starting with prefix."""
+        node = self.root
+        for char in prefix.lower():
+            node = node.get(char)
+            if node is None:
+                return []
+        return [self.names[young_id] for young_id in node.get(None, ())]
+
+
+class BKTree:
+    """Burkhard-Keller tree over young-names for finding near misses by edit distance."""
+
+    def __init__(self, names):
+        """
+        Builds the tree.
+        :param names: Distinct young-names, indexed by young-name id.
+        """
+        self.names = names
+        self.root = None
+        for young_id, name in enumerate(names):
+            self.add(young_id, name.lower())
+
+    def add(self, young_id, name):
+        """Inserts one name; each node is (young_id, lower-case name, {distance: child})."""
+        if self.root is None:
+            self.root = (young_id, name, {})
+            return
+        node = self.root
+        while True:
+            distance = edit_distance(name, node[1])
+            if distance == 0:
+                return
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = (young_id, name, {})
+                return
+            node = child
+
+    def search(self, word, tolerance):
+        """Returns (distance, young_id) pairs for every name within tolerance of word."""
+        matches = []
+        pending = [self.root] if self.root else []
+        word = word.lower()
+        while pending:
+            young_id, name, children = pending.pop()
+            distance = edit_distance(word, name)
+            if distance <= tolerance:
+                matches.append((distance, young_id))
+            # The triangle inequality rules out every other branch
+            for child_distance in range(distance - tolerance, distance + tolerance + 1):
+                child = children.get(child_distance)
+                if child is not None:
+                    pending.append(child)
+        return matches
+
+
+class SearchIndex:
+    """N-gram index over row texts for substring filtering while the player types."""
+
+    GRAM_LENGTH = 3
+
+    def __init__(self, texts):
+        """
+        Indexes every 1, 2 and 3 letter substring of each text.
+        :param texts: Searchable text for each row, e.g. "Polar bear cub".
+        """
+        self.texts = [text.lower() for text in texts]
+        self.postings = {}
+        for row, text in enumerate(self.texts):
+            grams = {text[i:i + length] for length in range(1, self.GRAM_LENGTH + 1)
+                     for i in range(len(text) - length + 1)}
+            for gram in grams:
+                # Rows are added in order, so every posting list stays sorted
+                self.postings.setdefault(gram, []).append(row)
+
+    def search(self, query):
+        """
+        Returns the sorted rows whose text contains query.
+        Queries up to three letters are a single lookup; longer ones only check
+        the rows in the rarest of their three letter substrings.
+        """
+        query = query.lower()
+        if not query:
+            return range(len(self.texts))
+        if len(query) <= self.GRAM_LENGTH:
+            return self.postings.get(query, [])
+        rarest = min((self.postings.get(query[i:i + self.GRAM_LENGTH], []) for i in
+                      range(len(query) - self.GRAM_LENGTH + 1)), key=len)
+        return [row for row in rarest if query in self.texts[row]]
+
+
+class SeenBitset:
+    """Compact record of which question ids a player has seen, one bit per question."""
+
+    # Clear bit positions for every possible byte value, used when scanning for free slots
+    FREE_BITS = [tuple(bit for bit in range(8) if not value >> bit & 1) for value in range(256)]
+
+    def __init__(self, size=0, bits=None):
+        """
+        Initializes the bitset.
+        :param size: Number of questions in the bank.
+        :param bits: Optional existing bytes, e.g. read back from a profile file.
+        """
+        self.size = size
+        self.bits = bytearray(bits) if bits is not None else bytearray((size + 7) // 8)
+
+    def resize(self, size):
+        """Adjusts to a bank of a different size, keeping the bits that still apply."""
+        if size == self.size:
+            return
+        length = (size + 7) // 8
+        self.bits = self.bits[:length] + bytearray(max(0, length - len(self.bits)))
+        if size % 8 and size < self.size:
+            # Drop bits past the new end of the bank
+            self.bits[-1] &= (1 << size % 8) - 1
+        self.size = size
+
+    def add(self, index):
+        """Marks a question id as seen."""
+        self.bits[index >> 3] |= 1 << (index & 7)
+
+    def __contains__(self, index):
+        return self.bits[index >> 3] >> (index & 7) & 1 == 1
+
+    def count(self):
+        """Returns how many questions have been seen."""
+        return int.from_bytes(self.bits, "little").bit_count()
+
+    def clear(self):
+        """Forgets every seen question, starting a new cycle through the bank."""
+        self.bits = bytearray(len(self.bits))
+
+    def unseen(self):
+        """Returns the ids of unseen questions, skipping full bytes with a regex scan."""
+        free = []
+        for match in re.finditer(rb"[^\xff]", self.bits):
+            base = match.start() * 8
+            free.extend(base + bit for bit in self.FREE_BITS[self.bits[match.start()]])
+        while free and free[-1] >= self.size:
+            free.pop()  # Padding bits in the last byte
+        return free
+
+
+class PlayerProfile:
+    """A named player and the questions they have already been asked, persisted to disk."""
+
+    MAGIC = b"YAQP"
+    HEADER = struct.Struct("<4sI")
+
+    def __init__(self, name, seen=None, directory="profiles"):
+        """
+        Initializes the PlayerProfile.
+        :param name: The player's name as typed in the menu.
+        :param seen: The player's SeenBitset; a new empty one if not given.
+        :param directory: Folder the profile file lives in.
+        """
+        self.name = name
+        self.seen = seen if seen is not None else SeenBitset()
+        self.directory = directory
+
+    @property
+    def path(self):
+        """File the profile is stored in, named after a filesystem-safe form of the player name."""
+        safe_name = "".join(char for char in self.name.lower() if char.isalnum() or char in "-_") or "player"
+        return os.path.join(self.directory, f"{safe_name}.profile")
+
+    @classmethod
+    def load(cls, name, directory="profiles"):
+        """Reads a saved profile, or returns a fresh one if the player is new or the file is unreadable."""
+        profile = cls(name, directory=directory)
+        try:
+            with open(profile.path, "rb") as file:
+                data = file.read()
+            magic, size = cls.HEADER.unpack_from(data)
+            bits = data[cls.HEADER.size:]
+            # A truncated or padded file would fail later on lookups, so it counts as unreadable
+            if magic == cls.MAGIC and len(bits) == (size + 7) // 8:
+                profile.seen = SeenBitset(size, bits)
+        except (OSError, struct.error):
+            pass
+        return profile
+
+    def save(self):
+        """Writes the profile atomically: a header followed by the raw seen bits."""
+        os.makedirs(self.directory, exist_ok=True)
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "wb") as file:
+            file.write(self.HEADER.pack(self.MAGIC, self.seen.size))
+            file.write(self.seen.bits)
+        os.replace(temp_path, self.path)
+
+
+class SessionSnapshot:
+    """
+    A game in progress, checkpointed after every answer so it can be resumed after a crash or CANCEL.
+    The file holds a fixed header, the deck, one response time per answer and the player name,
+    so a 10-round game takes well under a hundred bytes.
+    """
+
+    MAGIC = b"YAQS"
+    # magic, session id, bank size, mode, difficulty, rounds, answered, score, name length
+    HEADER = struct.Struct("<4s16sIBBHHHB")
+    MODES = ("choice", "typed", "reverse", "speed")
+    PATH = "session.snapshot"
+
+    def __init__(self, session_id, deck, answered=0, score=0, response_times=None, mode="choice",
+                 difficulty="medium", player_name="", bank_size=0):
+        """
+        Initializes the SessionSnapshot.
+        :param session_id: The game's 32-character hex session id.
+        :param deck: Question indexes of the game, in play order.
+        :param answered: Number of questions answered so far; the next question is deck[answered].
+        :param score: Correct answers so far.
+        :param response_times: Seconds taken for each answered question.
+        :param mode: "choice", "typed", "reverse" or "speed".
+        :param difficulty: Distractor tier, one of "easy", "medium" or "hard".
+        :param player_name: Name of the player's profile, or "" for a guest.
+        :param bank_size: Number of questions in the bank the deck was drawn from.
+        """
+        self.session_id = session_id
+        self.deck = list(deck)
+        self.answered = answered
+        self.score = score
+        self.response_times = list(response_times or [])
+        self.mode = mode
+        self.difficulty = difficulty
+        self.player_name = player_name
+        self.bank_size = bank_size
+
+    @classmethod
+    def load(cls, path=PATH):
+        """Reads a saved snapshot, or returns None if there is none or it is unreadable."""
+        try:
+            with open(path, "rb") as file:
+                data = file.read()
+            magic, session_id, bank_size, mode, difficulty, rounds, answered, score, name_length = \
+                cls.HEADER.unpack_from(data)
+            if magic != cls.MAGIC:
+                return None
+            index_format = "H" if bank_size <= 0xFFFF else "I"
+            offset = cls.HEADER.size
+            deck = struct.unpack_from(f"<{rounds}{index_format}", data, offset)
+            offset += struct.calcsize(f"<{rounds}{index_format}")
+            response_times = struct.unpack_from(f"<{answered}H", data, offset)
+            offset += 2 * answered
+            player_name = data[offset:offset + name_length].decode("utf-8", "ignore")
+            return cls(session_id.hex(), deck, answered, score, [time / 1000 for time in response_times],
+                       cls.MODES[mode], DistractorIndex.DIFFICULTIES[difficulty], player_name, bank_size)
+        except (OSError, struct.error, IndexError):
+            return None
+
+    def save(self, path=PATH):
+        """Writes the snapshot atomically, replacing any earlier one."""
+        name = self.player_name.encode("utf-8")[:255]
+        index_format = "H" if self.bank_size <= 0xFFFF else "I"
+        # Response times are stored in whole milliseconds, capped at about a minute
+        times = [min(round(seconds * 1000), 0xFFFF) for seconds in self.response_times]
+        temp_path = path + ".tmp"
+        with open(temp_path, "wb") as file:
+            file.write(self.HEADER.pack(self.MAGIC, bytes.fromhex(self.session_id), self.bank_size,
+                                        self.MODES.index(self.mode),
+                                        DistractorIndex.DIFFICULTIES.index(self.difficulty),
+                                        len(self.deck), self.answered, self.score, len(name)))
+            file.write(struct.pack(f"<{len(self.deck)}{index_format}", *self.deck))
+            file.write(struct.pack(f"<{len(times)}H", *times))
+            file.write(name)
+        os.replace(temp_path, path)
+
+    @classmethod
+    def discard(cls, path=PATH):
+        """Deletes the saved snapshot once its game has finished."""
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+class QuizData:
+    """Handles loading and storing quiz questions from a CSV file."""
+
+    def __init__(self, csv_file, weights=None, difficulty_file=None, catalog=None, rng=None, cache_directory="cache"):
+        """
+        Initializes the QuizData object and attempts to load questions
+        from the specified CSV file.
+        :param csv_file: Path to the animal/young CSV file.
+        :param weights: Optional per-row weights, either a sequence in CSV order or a
+                        mapping of animal name to weight (missing animals weigh 1.0).
+                        Overrides a "Weight" column in the CSV file.
+        :param difficulty_file: Optional difficulty table written by item_analytics.py.
+        :param catalog: Optional localization Catalog; questions, animals and young-names are
+                        translated as the bank is loaded. English if not given.
+        :param rng: Random number generator for the distractor tiers of large banks; a fixed seed if not given.
+        :param cache_directory: Folder the distractor tiers of large banks are cached in; None to disable.
+        """
+        self.catalog = catalog or load_catalog()
+        self.tier_rng = rng
+        self.cache_directory = cache_directory
+        self.weights = None
+        self.p_values = None
+        self.alias_table = None
+        self.young_names = []
+        self.animals_by_young = []
+        self.young_ids_by_animal = {}
+        self.distractors = None
+        self.answer_trie = None
+        self.answer_tree = None
+        self.search_index = None
+        try:
+            # Load questions from the CSV file
+            self.questions = self.load_questions_from_csv(csv_file)
+        except FileNotFoundError:
+            # Handle missing file error
+            print(f"Error: '{csv_file}' file not found. Please ensure the file is in the correct directory.")
+            self.questions = []
+        except csv.Error:
+            # Handle invalid CSV format error
+            print("Error: Could not read the CSV file. Please check its format.")
+            self.questions = []
+
+        if weights is not None:
+            self.set_weights(weights)
+        if difficulty_file is not None:
+            self.load_difficulty_table(difficulty_file)
+
+    def load_difficulty_table(self, table_file):
+        """
+        Reads the per-animal p-values (share answered correctly) from a difficulty table.
+        Animals missing from the table count as middling, with a p-value of 0.5.
+        """
+        try:
+            with open(table_file, newline="", encoding="utf-8") as file:
+                p_values = {row["animal"].strip().lower(): float(row["p_value"]) for row in csv.DictReader(file)}
+        except FileNotFoundError:
+            print(f"Error: '{table_file}' file not found. Questions will not be ordered by difficulty.")
+            return
+        except (csv.Error, KeyError, ValueError):
+            print(f"Error: Could not read the difficulty table '{table_file}'. Please check its format.")
+            return
+        self.p_values = [p_values.get(question["key"].lower(), 0.5) for question in self.questions]
+
+    def filter_by_difficulty(self, min_p_value=0.0, max_p_value=1.0):
+        """
+        Stops drawing questions whose p-value lies outside the range, by zeroing their weights.
+        Filters combine with any earlier weights; call set_weights to start again.
+        """
+        if self.p_values is None:
+            return
+        weights = self.weights or [1.0] * len(self.questions)
+        self.set_weights([weight if min_p_value <= p_value <= max_p_value else 0.0
+                          for weight, p_value in zip(weights, self.p_values)])
+
+    def order_by_difficulty(self, deck):
+        """Returns the deck with the easiest questions (highest p-value) first, if a table is loaded."""
+        if self.p_values is None:
+            return deck
+        return sorted(deck, key=lambda index: -self.p_values[index])
+
+    def set_weights(self, weights):
+        """
+        Replaces all row weights. Passing None switches back to uniform decks.
+        :param weights: Sequence in CSV order or mapping of animal name to weight.
+        """
+        if weights is None:
+            self.weights = None
+        elif isinstance(weights, dict):
+            lowered = {animal.lower(): weight for animal, weight in weights.items()}
+            self.weights = [float(lowered.get(question["key"].lower(), 1.0)) for question in self.questions]
+        else:
+            if len(weights) != len(self.questions):
+                raise ValueError(f"Expected {len(self.questions)} weights, got {len(weights)}.")
+            self.weights = [float(weight) for weight in weights]
+        # The alias table is rebuilt lazily on the next draw
+        self.alias_table = None
+
+    def set_weight(self, index, weight):
+        """
+        Updates the weight of a single row in amortized O(1) + O(log changed rows); see AliasTable.update.
+        """
+        if self.weights is None:
+            self.weights = [1.0] * len(self.questions)
+        self.weights[index] = float(weight)
+        if self.alias_table is not None:
+            try:
+                self.alias_table.update(index, self.weights[index])
+            except ValueError:
+                # No row can be drawn any more; the next draw rebuilds the table and reports it
+                self.alias_table = None
+
+    def draw_deck(self, size, rng=random, seen=None):
+        """
+        Picks the question indexes for one game, without repeats.
+        Uniform banks use random.sample; weighted banks use O(1) alias draws.
+        :param size: Number of questions wanted; capped at the drawable bank size.
+        :param rng: Random number generator to draw from.
+        :param seen: Optional SeenBitset of a player; unseen questions are preferred and
+                     the bitset starts a new cycle once every question has been seen.
+        """
+        count = len(self.questions)
+        if seen is None:
+            return self.sample_rows(range(count), size, rng)
+
+        seen.resize(count)
+        unseen_count = count - seen.count()
+        if unseen_count >= size:
+            # Mostly-seen uniform banks scan the free slots; otherwise reject seen draws
+            pool = seen.unseen() if self.weights is None and unseen_count < count // 2 else range(count)
+            return self.sample_rows(pool, size, rng, seen)
+
+        # Fewer unseen questions than rounds: use them all, then start a fresh cycle
+        deck = self.sample_rows(seen.unseen(), unseen_count, rng, seen)
+        seen.clear()
+        return deck + self.sample_rows(range(count), size - len(deck), rng, set(deck))
+
+    def sample_rows(self, pool, size, rng=random, exclude=None):
+        """
+        Draws up to size distinct row indexes from pool, skipping any in exclude.
+        :param pool: Sequence of candidate row indexes.
+        :param size: Number of rows wanted.
+        :param rng: Random number generator to draw from.
+        :param exclude: Optional container of row indexes that must not be drawn.
+        """
+        size = min(size, len(pool))
+        if self.weights is None and exclude is None:
+            return rng.sample(pool, size)
+        if self.weights is not None and self.alias_table is None:
+            self.alias_table = AliasTable(self.weights)
+        if exclude is None:
+            exclude = ()
+
+        deck = []
+        chosen = set()
+        attempts = 0
+        while len(deck) < size and attempts < size * 20:
+            # Reject repeats; a few retries are enough unless the weights are extremely skewed
+            attempts += 1
+            if self.weights is None:
+                index = pool[rng.randrange(len(pool))]
+            else:
+                index = self.alias_table.sample(rng)
+            if index not in chosen and index not in exclude:
+                chosen.add(index)
+                deck.append(index)
+        if len(deck) < size:
+            # Fall back to uniform picks among the remaining drawable rows
+            remaining = [i for i in pool if i not in chosen and i not in exclude and
+                         (self.weights is None or self.weights[i] > 0)]
+            deck.extend(rng.sample(remaining, min(size - len(deck), len(remaining))))
+        return deck
+
+    def load_questions_from_csv(self, csv_file):
+        """
+        Reads the CSV file and creates quiz questions.
+        Options are drawn later by make_question from the precomputed distractor tiers.
+        """
+        questions = []
+        with open(csv_file, 'r', encoding='utf-8-sig') as file:
+            # Read the CSV content into a list
+            animals_young_only = list(csv.reader(file, delimiter=","))
+            header = animals_young_only.pop(0)  # Remove header row
+
+            # An optional "Weight" column biases how often each animal is asked
+            weight_column = header.index("Weight") if "Weight" in header else None
+            if weight_column is not None:
+                self.weights = [float(row[weight_column] or 1.0) for row in animals_young_only]
+
+            # An optional "Class" column (mammal, bird, ...) makes distractors more plausible
+            class_column = header.index("Class") if "Class" in header else None
+
+            # The question template is split around the animal once, so each row is a plain concatenation
+            question_template = self.catalog.template("What is a baby {animal} called?")
+            affixes = question_template.around("animal")
+            prefix, suffix = affixes or ("", "")
+            translate = self.catalog.locale != SOURCE_LOCALE
+
+            # Intern the young-names so each distinct answer gets a small integer id, and build the
+            # inverted index from young-name id to the rows of every animal with that young-name
+            young_ids = {}
+            frequencies = []
+            classes = []
+            self.animals_by_young = []
+            self.young_ids_by_animal = {}
+            for index, row in enumerate(animals_young_only):
+                # Stray spaces ("chick ") would otherwise show up as a second, different answer
+                row[0], row[1] = row[0].strip(), row[1].strip()
+                key = row[0]
+                if translate:
+                    row[0], row[1] = self.catalog.animal(row[0]), self.catalog.young(row[1])
+                young_id = young_ids.setdefault(row[1], len(young_ids))
+                if young_id == len(frequencies):
+                    frequencies.append(0)
+                    classes.append(set())
+                    self.animals_by_young.append([])
+                frequencies[young_id] += 1
+                self.animals_by_young[young_id].append(index)
+                self.young_ids_by_animal.setdefault(row[0].lower(), set()).add(young_id)
+                if class_column is not None and row[class_column]:
+                    classes[young_id].add(row[class_column].lower())
+
+                questions.append({
+                    "key": key,  # The bank's own animal name, for pictures, logs and the difficulty table
+                    "animal": row[0],
+                    "question": prefix + row[0] + suffix if affixes else
+                    question_template.format(animal=row[0]),
+                    "answer": row[1],
+                    "young_id": young_id
+                })
+
+        self.young_names = list(young_ids)
+        # Precompute the distractor tiers once so play never does similarity work
+        self.distractors = DistractorIndex(self.young_names, frequencies, classes, self.tier_rng,
+                                           self.cache_directory)
+        # Indexes for typed answers: prefix suggestions and typo-tolerant matching
+        self.answer_trie = AnswerTrie(self.young_names, frequencies)
+        self.answer_tree = BKTree(self.young_names)
+        return questions
+
+    def get_search_index(self):
+        """Returns the browse screen's search index, building it the first time it is needed."""
+        if self.search_index is None:
+            self.search_index = SearchIndex([f"{question['animal']} {question['answer']}"
+                                             for question in self.questions])
+        return self.search_index
+
+    def resolve_answer(self, typed):
+        """
+        Works out which young-names a typed answer was meant to be.
+        Short words must be exact; longer ones forgive one or two typos ("hatchlng").
+        :param typed: Text entered by the player.
+        :return: The closest young-names within the typo tolerance; empty if nothing is close.
+        """
+        typed = typed.strip().lower()
+        tolerance = 0 if len(typed) < 4 else 1 if len(typed) < 8 else 2
+        matches = self.answer_tree.search(typed, tolerance) if self.answer_tree else []
+        if not matches:
+            return []
+        best = min(distance for distance, _ in matches)
+        return [self.young_names[young_id] for distance, young_id in matches if distance == best]
+
+    def make_question(self, index, difficulty="medium", rng=random):
+        """
+        Builds the multiple choice options for one question.
+        Each question gets the correct answer and three incorrect options from the chosen tier.
+        :param index: Index of the question in self.questions.
+        :param difficulty: Distractor tier, one of "easy", "medium" or "hard".
+        :param rng: Random number generator to draw from.
+        """
+        question = self.questions[index]
+        options = [question["answer"]] + [self.young_names[young_id] for young_id in
+                                          self.distractors.draw(question["young_id"], difficulty, rng=rng)]
+        rng.shuffle(options)
+        return {
+            "question": question["question"],
+            "options": options,
+            "correct_index": options.index(question["answer"])
+        }
+
+    def make_reverse_question(self, index, difficulty="medium", rng=random):
+        """
+        Builds a reverse question ("Which animal's baby is called a joey?") from one row.
+        The row's animal is the correct option; each wrong option is a random animal from
+        a distractor young-name group. Animals with more than one young-name can sit in several
+        groups, so any that also have the asked-about young-name are passed over.
+        :param index: Index of the question in self.questions.
+        :param difficulty: Distractor tier, one of "easy", "medium" or "hard".
+        :param rng: Random number generator to draw from.
+        """
+        question = self.questions[index]
+        young_id = question["young_id"]
+        options = [question["animal"]]
+        for _ in range(3):
+            # Another draw only happens when a whole group was passed over
+            for other in self.distractors.draw(young_id, difficulty, count=4 - len(options), rng=rng):
+                animal = self.reverse_distractor(other, young_id, options, rng)
+                if animal is not None:
+                    options.append(animal)
+            if len(options) == 4:
+                break
+        rng.shuffle(options)
+
+        young_name = question["answer"]
+        # The English article; templates for other languages can leave it out
+        article = "an" if young_name[:1].lower() in "aeiou" else "a"
+        return {
+            "question": self.catalog.text("Which animal's baby is called {article} {young}?", article=article,
+                                          young=young_name),
+            "options": options,
+            "correct_index": options.index(question["animal"]),
+            "young_id": young_id
+        }
+
+    def reverse_distractor(self, other, young_id, options, rng=random):
+        """
+        Picks an animal from a distractor young-name's group that is not already an option and
+        does not also have the correct young-name; None if there is no such animal.
+        :param other: Id of the distractor young-name.
+        :param young_id: Id of the asked-about young-name.
+        :param options: Options chosen so far.
+        :param rng: Random number generator to draw from.
+        """
+        group = self.animals_by_young[other]
+        start = rng.randrange(len(group))
+        # Usually the first animal tried is fine; the scan only matters for shared animals
+        for offset in range(len(group)):
+            animal = self.questions[group[(start + offset) % len(group)]]["animal"]
+            if animal not in options and young_id not in self.young_ids_by_animal[animal.lower()]:
+                return animal
+        return None
+
+    def is_correct(self, question_data, answer):
+        """
+        Checks an answer in O(1).
+        Reverse questions accept any animal whose young has the asked-about name.
+        :param question_data: A question built by make_question or make_reverse_question.
+        :param answer: The option the player chose.
+        """
+        if "young_id" in question_data:
+            return question_data["young_id"] in self.young_ids_by_animal.get(answer.strip().lower(), ())
+        return answer == question_data["options"][question_data["correct_index"]]
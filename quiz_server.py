@@ -0,0 +1,546 @@
+import argparse
+import array
+import asyncio
+import itertools
+import json
+import multiprocessing
+import os
+import random
+import socket
+import struct
+import tempfile
+import time
+from multiprocessing import shared_memory
+
+from benchmark_scaling import generate_bank
+from buzz_server import percentile
+from localization import Template, load_catalog
+from quiz_data import AliasTable, DistractorIndex, QuizData
+
+
+class SharedBank:
+    """
+    A question bank compiled once into a single shared memory block that every worker process reads in place.
+    After a fixed header come flat integer columns (see SECTIONS), each aligned to 8 bytes, and one UTF-8 blob
+    holding every animal name, every young-name and the question template back to back. Workers cast memoryviews
+    straight onto the shared pages, so attaching copies nothing however large the bank is.
+    """
+
+    MAGIC = b"QUIZBANK"
+    VERSION = 1
+    # Column name and array type code, in the order they are laid out
+    SECTIONS = (
+        ("young_of_row", "I"),  # Young-name id of each row
+        ("text_start", "I"),  # Blob offset of each text: rows' animals, then young-names, then the template
+        ("tier_start", "I"),  # Start of each young-name's easy, medium and hard tier in tier_ids
+        ("tier_ids", "I"),  # Distractor young-name ids, tier after tier
+        ("probability", "d"),  # Alias table of a weighted bank; empty when every row is equally likely
+        ("alias", "I"),
+        ("text", "B"),
+    )
+    HEADER = struct.Struct("<8s4I" + "2Q" * len(SECTIONS))  # Magic, version, rows, young-names, padding, sections
+    QUESTION = "What is a baby {animal} called?"
+
+    def __init__(self, memory, owner=False):
+        """
+        Reads the header of a compiled bank and maps its columns; use create or attach rather than this.
+        :param memory: The SharedMemory block holding the bank.
+        :param owner: True in the process that created the block and must unlink it.
+        """
+        self.memory = memory
+        self.owner = owner
+        magic, version, self.row_count, self.young_count, _, *spans = self.HEADER.unpack_from(memory.buf)
+        if magic != self.MAGIC or version != self.VERSION:
+            memory.close()
+            raise ValueError(f"Shared memory block '{memory.name}' does not hold a compiled question bank.")
+        self.columns = {}
+        for (name, code), offset, count in zip(self.SECTIONS, spans[::2], spans[1::2]):
+            self.columns[name] = memory.buf[offset:offset + count * struct.calcsize(code)].cast(code)
+        self.young_of_row = self.columns["young_of_row"]
+        self.text_start = self.columns["text_start"]
+        self.tier_start = self.columns["tier_start"]
+        self.tier_ids = self.columns["tier_ids"]
+        self.probability = self.columns["probability"]
+        self.alias = self.columns["alias"]
+        self.blob = self.columns["text"]
+
+        # The template is split around the animal once, as QuizData does while loading
+        self.template = Template(self.text(self.row_count + self.young_count))
+        self.affixes = self.template.around("animal")
+
+    @property
+    def name(self):
+        """Name other processes attach to the bank by."""
+        return self.memory.name
+
+    @classmethod
+    def create(cls, quiz_data):
+        """
+        Compiles a loaded bank into a new shared memory block.
+        :param quiz_data: The QuizData to compile; it is not needed once this returns.
+        """
+        questions = quiz_data.questions
+        texts = [question["animal"] for question in questions] + quiz_data.young_names
+        texts.append(quiz_data.catalog.translations.gettext(cls.QUESTION))
+        encoded = [text.encode("utf-8") for text in texts]
+
+        tier_start = [0]
+        tier_ids = array.array("I")
+        for tiers in quiz_data.distractors.tiers:
+            for difficulty in DistractorIndex.DIFFICULTIES:
+                tier_ids.extend(tiers[difficulty])
+                tier_start.append(len(tier_ids))
+
+        probability, alias = array.array("d"), array.array("I")
+        if quiz_data.weights is not None:
+            table = quiz_data.alias_table or AliasTable(quiz_data.weights)
+            table.compact()
+            probability.extend(table.probability)
+            alias.extend(table.alias)
+
+        columns = {
+            "young_of_row": array.array("I", (question["young_id"] for question in questions)),
+            "text_start": array.array("I", itertools.accumulate(map(len, encoded), initial=0)),
+            "tier_start": array.array("I", tier_start),
+            "tier_ids": tier_ids,
+            "probability": probability,
+            "alias": alias,
+            "text": b"".join(encoded),
+        }
+        spans = []
+        offset = cls.HEADER.size
+        for name, _ in cls.SECTIONS:
+            offset = (offset + 7) & ~7
+            spans.extend((offset, len(columns[name])))
+            offset += memoryview(columns[name]).nbytes
+
+        memory = shared_memory.SharedMemory(create=True, size=offset)
+        cls.HEADER.pack_into(memory.buf, 0, cls.MAGIC, cls.VERSION, len(questions), len(quiz_data.young_names), 0,
+                             *spans)
+        for (name, _), start in zip(cls.SECTIONS, spans[::2]):
+            data = memoryview(columns[name]).cast("B")
+            memory.buf[start:start + data.nbytes] = data
+        return cls(memory, owner=True)
+
+    @classmethod
+    def attach(cls, name):
+        """Maps a bank another process created, without copying it."""
+        return cls(shared_memory.SharedMemory(name=name))
+
+    def close(self):
+        """Releases the mapped columns; the creating process also frees the block."""
+        for view in self.columns.values():
+            view.release()
+        self.columns = {}
+        self.memory.close()
+        if self.owner:
+            self.memory.unlink()
+
+    def text(self, number):
+        """Decodes one text from the blob."""
+        return str(self.blob[self.text_start[number]:self.text_start[number + 1]], "utf-8")
+
+    def young_name(self, young_id):
+        """The young-name with the given id."""
+        return self.text(self.row_count + young_id)
+
+    def question(self, index):
+        """The question text of a row."""
+        animal = self.text(index)
+        if self.affixes:
+            return self.affixes[0] + animal + self.affixes[1]
+        return self.template.format(animal=animal)
+
+    def draw_deck(self, size, rng=random):
+        """
+        Picks the question indexes for one game, without repeats, as QuizData.draw_deck does for anonymous players.
+        :param size: Number of questions wanted; capped at the bank size, and at the rows with weight.
+        :param rng: Random number generator to draw from.
+        """
+        size = min(size, self.row_count)
+        if not self.probability:
+            return rng.sample(range(self.row_count), size)
+        deck = []
+        attempts = 0
+        while len(deck) < size and attempts < size * 20:
+            attempts += 1
+            bucket = rng.randrange(self.row_count)
+            index = bucket if rng.random() < self.probability[bucket] else self.alias[bucket]
+            if index not in deck:
+                deck.append(index)
+        if len(deck) < size:
+            # Fall back to uniform picks among the remaining drawable rows, as QuizData.sample_rows does. Only
+            # the alias columns are shared: a row of weight zero has no share of its own bucket and is not the
+            # alias of any bucket, so those rows stay retired.
+            aliased = {self.alias[bucket] for bucket in range(self.row_count) if self.probability[bucket] < 1.0}
+            remaining = [i for i in range(self.row_count) if i not in deck and
+                         (self.probability[i] > 0 or i in aliased)]
+            deck.extend(rng.sample(remaining, min(size - len(deck), len(remaining))))
+        return deck
+
+    def draw_distractors(self, young_id, difficulty="medium", count=3, rng=random):
+        """Draws distinct distractor ids from a young-name's tier, as DistractorIndex.draw does."""
+        slot = young_id * len(DistractorIndex.DIFFICULTIES) + DistractorIndex.DIFFICULTIES.index(difficulty)
+        start, end = self.tier_start[slot], self.tier_start[slot + 1]
+        if end - start <= count:
+            return list(self.tier_ids[start:end])
+        drawn = []
+        while len(drawn) < count:
+            other = self.tier_ids[rng.randrange(start, end)]
+            if other not in drawn:
+                drawn.append(other)
+        return drawn
+
+    def make_question(self, index, difficulty="medium", rng=random):
+        """
+        Builds the multiple choice options for one question, in the same form as QuizData.make_question.
+        :param index: Row of the question.
+        :param difficulty: Distractor tier, one of "easy", "medium" or "hard".
+        :param rng: Random number generator to draw from.
+        """
+        young_id = self.young_of_row[index]
+        answer = self.young_name(young_id)
+        options = [answer] + [self.young_name(other) for other in
+                              self.draw_distractors(young_id, difficulty, rng=rng)]
+        rng.shuffle(options)
+        return {
+            "question": self.question(index),
+            "options": options,
+            "correct_index": options.index(answer)
+        }
+
+    def is_correct(self, question_data, answer):
+        """Checks a multiple choice answer."""
+        return answer == question_data["options"][question_data["correct_index"]]
+
+
+class SessionProtocol(asyncio.Protocol):
+    """
+    One player's game over one connection, as JSON lines.
+    The player sends {"type": "start"} (optionally with rounds and difficulty), then {"type": "answer", "option": ...}
+    for each question; each answer is followed by its result and the next question, or by game_over.
+    """
+
+    MAX_ROUNDS = 50
+
+    def __init__(self, bank):
+        """
+        Initializes the SessionProtocol.
+        :param bank: A SharedBank, or a QuizData when each worker loads its own.
+        """
+        self.bank = bank
+        self.rng = random.Random()
+        self.transport = None
+        self.buffer = b""
+        self.deck = []
+        self.difficulty = "medium"
+        self.number = 0
+        self.score = 0
+        self.question_data = None
+
+    def connection_made(self, transport):
+        """Remembers the transport; the game starts when the player asks for it."""
+        self.transport = transport
+
+    def data_received(self, data):
+        """Handles every complete line received."""
+        self.buffer += data
+        *lines, self.buffer = self.buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                self.received(line)
+
+    def received(self, line):
+        """Handles one message from the player."""
+        try:
+            message = json.loads(line)
+            kind = message["type"]
+        except (ValueError, KeyError, TypeError):
+            self.send({"type": "error", "error": "Expected a JSON object with a type."})
+            return
+        if kind == "start":
+            self.start(message.get("rounds", 10), message.get("difficulty", "medium"))
+        elif kind == "answer" and self.question_data:
+            self.answer(str(message.get("option")))
+
+    def start(self, rounds, difficulty):
+        """Draws a new deck and sends its first question."""
+        try:
+            rounds = max(1, min(int(rounds), self.MAX_ROUNDS))
+        except (TypeError, ValueError):
+            rounds = 10
+        self.difficulty = difficulty if difficulty in DistractorIndex.DIFFICULTIES else "medium"
+        self.deck = self.bank.draw_deck(rounds, rng=self.rng)
+        self.number = 0
+        self.score = 0
+        self.send(self.next_message())
+
+    def answer(self, option):
+        """Scores an answer and sends its result together with what comes next."""
+        correct = self.bank.is_correct(self.question_data, option)
+        self.score += correct
+        result = {"type": "result", "correct": correct, "score": self.score,
+                  "answer": self.question_data["options"][self.question_data["correct_index"]]}
+        self.send(result, self.next_message())
+
+    def next_message(self):
+        """Makes the next question, or the end of the game once the deck is used up."""
+        if self.number == len(self.deck):
+            self.question_data = None
+            return {"type": "game_over", "score": self.score, "rounds": len(self.deck)}
+        self.question_data = self.bank.make_question(self.deck[self.number], self.difficulty, rng=self.rng)
+        self.number += 1
+        return {"type": "question", "number": self.number, "total": len(self.deck),
+                "question": self.question_data["question"], "options": self.question_data["options"]}
+
+    def send(self, *messages):
+        """Writes messages to the player in a single write."""
+        self.transport.write("".join(json.dumps(message, separators=(",", ":")) + "\n"
+                                     for message in messages).encode("utf-8"))
+
+
+def run_worker(listener, bank_name, bank_file, ready):
+    """
+    Worker process: serves sessions from the shared listening socket until it is stopped.
+    :param listener: The listening socket every worker accepts from.
+    :param bank_name: Shared memory name of the compiled bank, or None to load bank_file privately.
+    :param bank_file: CSV bank, only read when bank_name is None.
+    :param ready: Queue told this worker's process id once it is accepting connections.
+    """
+    bank = SharedBank.attach(bank_name) if bank_name else QuizData(bank_file)
+
+    async def serve_forever():
+        server = await asyncio.get_running_loop().create_server(lambda: SessionProtocol(bank), sock=listener)
+        ready.put(os.getpid())
+        async with server:
+            await server.serve_forever()
+
+    try:
+        asyncio.run(serve_forever())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if bank_name:
+            bank.close()
+
+
+def start_workers(count, listener, bank_name=None, bank_file=None):
+    """
+    Starts worker processes on one listening socket and waits until every one is accepting.
+    Workers are spawned rather than forked, so none of them inherits the parent's copy of the bank.
+    :return: The worker processes.
+    """
+    context = multiprocessing.get_context("spawn")
+    ready = context.Queue()
+    workers = [context.Process(target=run_worker, args=(listener, bank_name, bank_file, ready), daemon=True)
+               for _ in range(count)]
+    for worker in workers:
+        worker.start()
+    for _ in workers:
+        ready.get()
+    return workers
+
+
+def stop_workers(workers):
+    """Stops worker processes."""
+    for worker in workers:
+        worker.terminate()
+    for worker in workers:
+        worker.join()
+
+
+def process_memory(pid):
+    """
+    Memory of a process in bytes from /proc/<pid>/smaps_rollup: "rss", "pss" (shared pages divided among the
+    processes mapping them) and "private" (pages no other process shares). Empty where /proc is not available.
+    """
+    fields = {"Rss:": "rss", "Pss:": "pss", "Private_Clean:": "private", "Private_Dirty:": "private"}
+    memory = {}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as file:
+            for line in file:
+                parts = line.split()
+                if parts[0] in fields:
+                    key = fields[parts[0]]
+                    memory[key] = memory.get(key, 0) + int(parts[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        return {}
+    return memory
+
+
+def process_cpu_seconds(pid):
+    """User and system CPU time a process has used, from /proc/<pid>/stat; 0 where /proc is not available."""
+    try:
+        with open(f"/proc/{pid}/stat") as file:
+            # The command name may contain spaces, so count fields from the closing parenthesis
+            fields = file.read().rsplit(")", 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError):
+        return 0.0
+
+
+async def simulated_player(port, start_at, stop_at, rng, latencies):
+    """
+    A load-test player who plays game after game on one connection, answering each question at once.
+    Keeping the connection, as a kiosk would, measures the sessions rather than the accept path: every worker
+    is woken for each new connection on the shared socket and only one of them gets it.
+    :return: Answers whose result arrived between start_at and stop_at.
+    """
+    answers = 0
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    closed = False
+    while not closed and time.monotonic() < stop_at:
+        writer.write(b'{"type":"start","rounds":10}\n')
+        sent = 0.0
+        while True:
+            try:
+                line = await reader.readline()
+            except ConnectionError:
+                line = b""
+            if not line:
+                closed = True  # The server went away; starting another game would spin on an empty read
+                break
+            # Only questions are parsed, so the players spend as little of the machine's CPU as possible
+            if line.startswith(b'{"type":"question"'):
+                options = json.loads(line)["options"]
+                sent = time.monotonic()
+                writer.write((json.dumps({"type": "answer", "option": options[rng.randrange(len(options))]}) + "\n")
+                             .encode("utf-8"))
+            elif line.startswith(b'{"type":"result"'):
+                received = time.monotonic()
+                if start_at <= received < stop_at:
+                    answers += 1
+                    latencies.append(received - sent)
+            else:
+                break  # Game over
+    writer.close()
+    return answers
+
+
+def run_players(port, players, start_at, stop_at, seed, results):
+    """Load-test process: runs its share of the simulated players and reports their answers and latencies."""
+    async def swarm():
+        await asyncio.sleep(max(0.0, start_at - time.monotonic() - 0.5))
+        latencies = []
+        rng = random.Random(seed)
+        counts = await asyncio.gather(*(simulated_player(port, start_at, stop_at, random.Random(rng.random()),
+                                                         latencies) for _ in range(players)))
+        return sum(counts), latencies
+
+    results.put(asyncio.run(swarm()))
+
+
+def measure(worker_count, bank_name, bank_file, players, client_processes, seconds, seed):
+    """
+    Runs one timed load test against a fresh set of workers.
+    :return: Answers per second, result latencies in seconds, worker CPU seconds per answer
+             and the memory of each worker.
+    """
+    listener = socket.create_server(("127.0.0.1", 0), backlog=1024)
+    port = listener.getsockname()[1]
+    workers = start_workers(worker_count, listener, bank_name, bank_file)
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    start_at = time.monotonic() + 2.0  # Time for the player processes to start; both sides read the same clock
+    shares = [players // client_processes + (i < players % client_processes) for i in range(client_processes)]
+    swarms = [context.Process(target=run_players, args=(port, share, start_at, start_at + seconds, seed + i, results))
+              for i, share in enumerate(shares) if share]
+    for swarm in swarms:
+        swarm.start()
+    # The workers' CPU time over the timed window shows the cost per answer, whatever the players cost
+    time.sleep(max(0.0, start_at - time.monotonic()))
+    cpu_started = sum(process_cpu_seconds(worker.pid) for worker in workers)
+    time.sleep(max(0.0, start_at + seconds - time.monotonic()))
+    cpu_used = sum(process_cpu_seconds(worker.pid) for worker in workers) - cpu_started
+    answers = 0
+    latencies = []
+    for _ in swarms:
+        count, swarm_latencies = results.get()
+        answers += count
+        latencies.extend(swarm_latencies)
+    for swarm in swarms:
+        swarm.join()
+    memory = [process_memory(worker.pid) for worker in workers]
+    stop_workers(workers)
+    listener.close()
+    return answers / seconds, latencies, cpu_used / max(answers, 1), memory
+
+
+def load_test(bank_file, rows, worker_counts, players, client_processes, seconds, seed, private):
+    """
+    Measures throughput and per-worker memory for each worker count on localhost.
+    :param rows: Size of a synthetic bank to serve instead of bank_file; 0 to use bank_file.
+    :param private: True to have every worker load its own QuizData, for comparison with the shared bank.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        if rows:
+            bank_file = os.path.join(directory, "bank.csv")
+            generate_bank(bank_file, rows, seed)
+        started = time.perf_counter()
+        quiz_data = QuizData(bank_file)
+        loaded = time.perf_counter() - started
+        bank = None
+        if not private:
+            started = time.perf_counter()
+            bank = SharedBank.create(quiz_data)
+            print(f"Loaded {bank.row_count} rows in {loaded:.2f}s and compiled them into "
+                  f"{bank.memory.size / 1e6:.1f} MB of shared memory in {time.perf_counter() - started:.2f}s.")
+        del quiz_data
+
+        print(f"{'workers':>7}{'answers/s':>12}{'speed-up':>10}{'efficiency':>12}{'CPU us/answer':>15}"
+              f"{'p50 ms':>9}{'p99 ms':>9}{'private MB':>12}{'PSS MB':>9}")
+        first = None
+        try:
+            for worker_count in worker_counts:
+                throughput, latencies, cpu_per_answer, memory = measure(
+                    worker_count, bank and bank.name, bank_file, players, client_processes, seconds, seed)
+                first = first or (worker_count, throughput)
+                speed_up = throughput / first[1] if first[1] else 0.0
+                efficiency = speed_up * first[0] / worker_count
+                private_mb = sum(entry.get("private", 0) for entry in memory) / len(memory) / 1e6
+                pss_mb = sum(entry.get("pss", 0) for entry in memory) / len(memory) / 1e6
+                p50 = percentile(latencies, 0.5) * 1e3 if latencies else 0.0
+                p99 = percentile(latencies, 0.99) * 1e3 if latencies else 0.0
+                print(f"{worker_count:>7}{throughput:>12.0f}{speed_up:>10.2f}{efficiency:>12.0%}"
+                      f"{cpu_per_answer * 1e6:>15.1f}{p50:>9.2f}{p99:>9.2f}{private_mb:>12.1f}{pss_mb:>9.1f}")
+        finally:
+            if bank:
+                bank.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve quiz sessions from several worker processes.")
+    parser.add_argument("--bank", default="animals_young_only.csv", help="CSV file of animals and young-names")
+    commands = parser.add_subparsers(dest="command", required=True)
+    serve_parser = commands.add_parser("serve", help="serve quiz sessions")
+    serve_parser.add_argument("--host", default="127.0.0.1", help="address to listen on; 0.0.0.0 for the LAN")
+    serve_parser.add_argument("--port", type=int, default=8766)
+    serve_parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    serve_parser.add_argument("--locale", help="language of the questions, e.g. es (default: English)")
+    test_parser = commands.add_parser("load-test", help="measure throughput and memory as workers are added")
+    test_parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    test_parser.add_argument("--players", type=int, default=64, help="simulated players playing at once")
+    test_parser.add_argument("--client-processes", type=int, default=max(1, (os.cpu_count() or 2) // 2))
+    test_parser.add_argument("--seconds", type=float, default=5.0, help="length of each timed run")
+    test_parser.add_argument("--rows", type=int, default=0, help="serve a synthetic bank of this many rows")
+    test_parser.add_argument("--private", action="store_true", help="let every worker load its own bank instead")
+    test_parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        shared_bank = SharedBank.create(QuizData(args.bank, catalog=load_catalog(args.locale)))
+        listening_socket = socket.create_server((args.host, args.port), backlog=1024)
+        worker_processes = start_workers(args.workers, listening_socket, shared_bank.name)
+        print(f"Serving {shared_bank.row_count} questions from {args.workers} worker(s) on {args.host}:{args.port}.")
+        try:
+            for worker_process in worker_processes:
+                worker_process.join()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            stop_workers(worker_processes)
+            listening_socket.close()
+            shared_bank.close()
+    else:
+        load_test(args.bank, args.rows, args.workers, args.players, args.client_processes, args.seconds, args.seed,
+                  args.private)
@@ -0,0 +1,248 @@
+import argparse
+import csv
+import importlib.util
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tkinter as tk
+import tracemalloc
+
+APP_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "multiple choice animal_v_04.py")
+MODES = ("choice", "typed", "reverse", "speed")
+SAMPLE_FIELDS = ["games", "rounds", "elapsed", "rss_kb", "traced_kb", "tcl_commands", "widgets", "after_events"]
+# Allowed growth from the baseline to the last sample; Tk objects and timers must not grow at all
+DEFAULT_LIMITS = {"rss_kb": 20_000, "traced_kb": 2_000, "tcl_commands": 0, "widgets": 0, "after_events": 0}
+
+
+def load_app_module():
+    """Imports the Tk app from its file; the name has spaces so it cannot be imported normally."""
+    spec = importlib.util.spec_from_file_location("young_animal_quiz", APP_FILE)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def resident_kb():
+    """Current resident set size in KB (peak size where /proc is not available)."""
+    try:
+        with open("/proc/self/statm") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+    except OSError:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def all_widgets(widget):
+    """Yields every descendant of a widget."""
+    for child in widget.winfo_children():
+        yield child
+        yield from all_widgets(child)
+
+
+class SoakDriver:
+    """Plays the real YoungAnimalQuiz through its buttons and bindings, as a kiosk user would."""
+
+    def __init__(self, root, app, rng):
+        """
+        Initializes the SoakDriver.
+        :param root: The withdrawn tkinter root window the app runs in.
+        :param app: The YoungAnimalQuiz being driven.
+        :param rng: Random number generator choosing modes, answers and detours.
+        """
+        self.root = root
+        self.app = app
+        self.rng = rng
+        self.games = 0
+        self.rounds = 0
+
+    def find_button(self, text):
+        """Returns the on-screen button with the given label, or None."""
+        for widget in all_widgets(self.root):
+            if isinstance(widget, tk.Button) and widget.cget("text") == text:
+                return widget
+        return None
+
+    def press(self, text):
+        """Invokes a button by its label and lets Tk process the resulting events."""
+        button = self.find_button(text)
+        if button is None:
+            raise RuntimeError(f"No '{text}' button on screen.")
+        button.invoke()
+        self.root.update()
+
+    def play_game(self):
+        """Plays one game from menu to final score, with the odd HELP, CANCEL/RESUME, BROWSE and theme switch."""
+        rng = self.rng
+        if rng.random() < 0.05:
+            self.browse()
+        if rng.random() < 0.02:
+            self.app.menu.switch_theme_button.invoke()
+            self.root.update()
+        menu = self.app.menu
+        menu.rounds_entry.delete(0, "end")
+        menu.rounds_entry.insert(0, str(rng.randint(1, 10)))
+        menu.difficulty.set(rng.choice(("easy", "medium", "hard")))
+        menu.mode.set(rng.choice(MODES))
+        menu.name_entry.delete(0, "end")
+        menu.name_entry.insert(0, rng.choice(("", "", "soak")))
+        self.press("SUBMIT")
+
+        while self.find_button("Play Again") is None:
+            if self.find_button("Next Question"):
+                self.press("Next Question")
+                continue
+            detour = rng.random()
+            if detour < 0.05:
+                self.press("HELP")
+                self.press("Dismiss")
+            elif detour < 0.07 and self.app.play.round_count:
+                # A snapshot exists once a question has been answered, so RESUME will be offered
+                self.press("CANCEL")
+                self.press("RESUME")
+            else:
+                self.answer()
+        self.press("Play Again")
+        self.games += 1
+
+    def answer(self):
+        """Answers the current question, correctly about two times in three."""
+        play = self.app.play
+        question_data = play.question_data
+        options = question_data["options"]
+        option = options[question_data["correct_index"]] if self.rng.random() < 0.66 else self.rng.choice(options)
+        if play.mode == "typed":
+            play.answer_entry.insert(0, option[:3])
+            play.answer_entry.event_generate("<KeyRelease>", keysym="a")
+            play.answer_entry.delete(0, "end")
+            play.answer_entry.insert(0, option)
+            self.press("ANSWER")
+        else:
+            self.press(option)
+        self.rounds += 1
+
+    def browse(self):
+        """Opens the browse screen, searches, scrolls and goes back."""
+        self.press("BROWSE")
+        browse = self.app.browse
+        browse.search_entry.insert(0, self.rng.choice("aeiou"))
+        browse.search_entry.event_generate("<KeyRelease>", keysym="a")
+        browse.canvas.event_generate("<MouseWheel>", delta=-120)
+        self.root.update()
+        self.press("Back")
+
+
+def take_sample(driver, started):
+    """Measures the process and the Tk interpreter between games."""
+    root = driver.root
+    return {
+        "games": driver.games,
+        "rounds": driver.rounds,
+        "elapsed": round(time.perf_counter() - started, 2),
+        "rss_kb": resident_kb(),
+        "traced_kb": tracemalloc.get_traced_memory()[0] // 1024,
+        "tcl_commands": len(root.tk.splitlist(root.tk.call("info", "commands"))),
+        "widgets": sum(1 for _ in all_widgets(root)),
+        "after_events": len(root.tk.splitlist(root.tk.call("after", "info"))),
+    }
+
+
+def slope_per_1000_rounds(samples, field):
+    """Least-squares growth of a measurement per thousand rounds."""
+    xs = [sample["rounds"] / 1000 for sample in samples]
+    ys = [sample[field] for sample in samples]
+    mean_x = sum(xs) / len(xs)
+    mean_y = sum(ys) / len(ys)
+    spread = sum((x - mean_x) ** 2 for x in xs)
+    return sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / spread if spread else 0.0
+
+
+def run_soak(rounds, sample_every=50, warmup_games=100, seed=0, report="soak_report.csv", limits=None):
+    """
+    Drives the app for the given number of rounds and checks its resource use stays flat after warm-up.
+    :param rounds: Questions to answer in total.
+    :param sample_every: Games between measurements.
+    :param warmup_games: Games played before the baseline sample, so caches and the profile can fill up.
+    :param seed: Seed for the driver's choices.
+    :param report: CSV file for the samples.
+    :param limits: Allowed growth from the baseline to the last sample, per measurement; missing
+        measurements use DEFAULT_LIMITS.
+    :return: True if nothing grew past its limit.
+    """
+    app_module = load_app_module()
+    bank_dir = os.path.dirname(APP_FILE)
+    with tempfile.TemporaryDirectory() as work_dir:
+        # Profiles, results and snapshots go to a scratch folder, not the real kiosk files
+        shutil.copy(os.path.join(bank_dir, "animals_young_only.csv"), work_dir)
+        if os.path.exists(os.path.join(bank_dir, "item_difficulty.csv")):
+            shutil.copy(os.path.join(bank_dir, "item_difficulty.csv"), work_dir)
+        previous_dir = os.getcwd()
+        os.chdir(work_dir)
+        try:
+            tracemalloc.start(10)
+            root = tk.Tk()
+            root.withdraw()
+            driver = SoakDriver(root, app_module.YoungAnimalQuiz(root), random.Random(seed))
+            started = time.perf_counter()
+            samples = []
+            baseline_snapshot = None
+            while driver.rounds < rounds:
+                driver.play_game()
+                if driver.games == warmup_games:
+                    baseline_snapshot = tracemalloc.take_snapshot()
+                if driver.games % sample_every == 0:
+                    samples.append(take_sample(driver, started))
+            samples.append(take_sample(driver, started))
+            final_snapshot = tracemalloc.take_snapshot()
+            # The event log lives in work_dir, so it is flushed before the folder goes away
+            driver.app.close()
+            root.destroy()
+        finally:
+            os.chdir(previous_dir)
+            tracemalloc.stop()
+
+    with open(report, "w", newline="", encoding="utf-8") as file:
+        writer = csv.DictWriter(file, fieldnames=SAMPLE_FIELDS)
+        writer.writeheader()
+        writer.writerows(samples)
+
+    settled = [sample for sample in samples if sample["games"] >= warmup_games] or samples
+    baseline, last = settled[0], settled[-1]
+    print(f"Played {driver.games} games ({driver.rounds} rounds) in {last['elapsed']:.0f}s; samples in '{report}'.")
+    print(f"{'measurement':<14}{'baseline':>12}{'final':>12}{'growth':>10}{'per 1k rounds':>16}{'limit':>8}")
+    passed = True
+    limits = {**DEFAULT_LIMITS, **(limits or {})}
+    for field, limit in limits.items():
+        growth = last[field] - baseline[field]
+        ok = growth <= limit
+        passed = passed and ok
+        print(f"{field:<14}{baseline[field]:>12}{last[field]:>12}{growth:>10}"
+              f"{slope_per_1000_rounds(settled, field):>16.2f}{limit:>8}{'' if ok else '  FAIL'}")
+
+    if baseline_snapshot is not None:
+        print("Top allocation growth since warm-up:")
+        for stat in final_snapshot.compare_to(baseline_snapshot, "lineno")[:10]:
+            print(f"  {stat}")
+    return passed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Soak-test the Tk quiz app for leaks by playing it for a long time.")
+    parser.add_argument("--rounds", type=int, default=200_000, help="questions to answer in total")
+    parser.add_argument("--sample-every", type=int, default=50, help="games between measurements")
+    parser.add_argument("--warmup-games", type=int, default=100, help="games played before the baseline sample")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the driver's choices")
+    parser.add_argument("--report", default="soak_report.csv", help="CSV trend report to write")
+    parser.add_argument("--max-rss-growth-kb", type=int, default=DEFAULT_LIMITS["rss_kb"])
+    parser.add_argument("--max-traced-growth-kb", type=int, default=DEFAULT_LIMITS["traced_kb"])
+    parser.add_argument("--max-command-growth", type=int, default=DEFAULT_LIMITS["tcl_commands"],
+                        help="allowed growth in Tcl commands")
+    parser.add_argument("--max-widget-growth", type=int, default=DEFAULT_LIMITS["widgets"])
+    args = parser.parse_args()
+
+    growth_limits = {"rss_kb": args.max_rss_growth_kb, "traced_kb": args.max_traced_growth_kb,
+                     "tcl_commands": args.max_command_growth, "widgets": args.max_widget_growth}
+    sys.exit(0 if run_soak(args.rounds, args.sample_every, args.warmup_games, args.seed, args.report,
+                           growth_limits) else 1)
@@ -0,0 +1,350 @@
+import argparse
+import curses
+import os
+import uuid
+
+from kiosk_results import ResultLog
+from localization import load_catalog
+from quiz_data import PlayerProfile, QuizData
+
+DIFFICULTIES = ("easy", "medium", "hard")
+# Labels are the English messages, translated when the menu is drawn
+MODES = (("choice", "Multiple choice"), ("typed", "Typed answer"), ("reverse", "Reverse"))
+
+
+class TerminalScreen:
+    """Draws whole screens of text lines, rewriting only the lines that changed since the last draw."""
+
+    def __init__(self, window):
+        """
+        Initializes the TerminalScreen.
+        :param window: The curses window to draw on.
+        """
+        self.window = window
+        self.lines = []
+        self.colours = {"normal": 0, "title": curses.A_BOLD, "error": curses.A_BOLD}
+        if curses.has_colors():
+            curses.start_color()
+            curses.use_default_colors()
+            for pair, colour in enumerate((curses.COLOR_GREEN, curses.COLOR_RED, curses.COLOR_BLUE), 1):
+                curses.init_pair(pair, colour, -1)
+            self.colours.update(correct=curses.color_pair(1) | curses.A_BOLD,
+                                error=curses.color_pair(2) | curses.A_BOLD,
+                                incorrect=curses.color_pair(2) | curses.A_BOLD,
+                                help=curses.color_pair(3))
+        else:
+            self.colours.update(correct=curses.A_BOLD, incorrect=curses.A_BOLD, help=0)
+
+    def draw(self, lines, cursor=None):
+        """
+        Shows a screen made of (text, style) lines.
+        Unchanged lines are not sent to the terminal at all, which keeps redraws cheap over SSH.
+        :param lines: List of (text, style name) tuples, one per screen row.
+        :param cursor: Optional (row, column) to leave the visible cursor at, for text input.
+        """
+        height, width = self.window.getmaxyx()
+        for row in range(min(height, max(len(lines), len(self.lines)))):
+            line = lines[row] if row < len(lines) else ("", "normal")
+            if row < len(self.lines) and self.lines[row] == line:
+                continue
+            self.window.move(row, 0)
+            self.window.clrtoeol()
+            self.window.addnstr(row, 0, line[0], width - 1, self.colours.get(line[1], 0))
+        self.lines = list(lines)
+        if cursor:
+            curses.curs_set(1)
+            self.window.move(min(cursor[0], height - 1), min(cursor[1], width - 1))
+        else:
+            curses.curs_set(0)
+        self.window.refresh()
+
+    def reset(self):
+        """Forgets what is on screen so the next draw repaints everything, e.g. after a resize."""
+        self.window.erase()
+        self.lines = []
+
+
+class TerminalQuiz:
+    """Terminal version of the Young Animal Quiz, with the same menu, rounds, help and scoring as the Tk app."""
+
+    def __init__(self, window, quiz_data, catalog=None):
+        """
+        Initializes the TerminalQuiz.
+        :param window: The curses standard screen.
+        :param quiz_data: The QuizData object containing quiz questions.
+        :param catalog: Catalog for the screens' text; the one quiz_data was loaded with by default.
+        """
+        self.window = window
+        self.screen = TerminalScreen(window)
+        self.quiz_data = quiz_data
+        self.catalog = catalog or quiz_data.catalog
+        self.gettext = self.catalog.translations.gettext
+        self.profiles = {}  # Player profiles loaded so far, keyed by lower-case name
+        self.result_log = ResultLog()
+
+    def read_key(self):
+        """Waits for a key press, repainting the whole screen if the terminal was resized."""
+        while True:
+            key = self.window.get_wch()
+            if key == curses.KEY_RESIZE:
+                lines = self.screen.lines
+                self.screen.reset()
+                self.screen.draw(lines)
+                continue
+            return key
+
+    def run(self):
+        """Alternates between the menu and games until the player quits."""
+        while True:
+            settings = self.show_menu()
+            if settings is None:
+                return
+            self.play(**settings)
+
+    def show_menu(self):
+        """
+        Shows the menu for choosing rounds, difficulty, mode and an optional player name.
+        :return: Keyword arguments for play(), or None if the player quit.
+        """
+        _ = self.gettext
+        fields = {"rounds": "", "name": ""}
+        difficulty, mode = 1, 0
+        focus = 0  # 0 rounds, 1 difficulty, 2 mode, 3 name
+        error = ""
+        while True:
+            marker = ["  "] * 4
+            marker[focus] = "> "
+            lines = [
+                (_("Welcome to the Young Animal Quiz!"), "title"),
+                ("", "normal"),
+                (f"{marker[0]}{_('How many rounds would you like to play? (1-10)')}: {fields['rounds']}", "normal"),
+                (f"{marker[1]}{_('Difficulty:')} < {_(DIFFICULTIES[difficulty].capitalize())} >", "normal"),
+                (f"{marker[2]}{_('Mode:')} < {_(MODES[mode][1])} >", "normal"),
+                (f"{marker[3]}{_('Player name (optional):')} {fields['name']}", "normal"),
+                ("", "normal"),
+                (error, "error"),
+                ("", "normal"),
+                (_("Up/Down: move   Left/Right: change   Enter: start   F2: browse   Esc: quit"), "help"),
+            ]
+            cursor = None
+            if focus == 0:
+                cursor = (2, len(lines[2][0]))
+            elif focus == 3:
+                cursor = (5, len(lines[5][0]))
+            self.screen.draw(lines, cursor)
+
+            key = self.read_key()
+            if key == "\x1b":
+                return None
+            if key == curses.KEY_F2:
+                self.show_browse()
+                continue
+            if key in ("\n", "\r", curses.KEY_ENTER):
+                try:
+                    rounds = int(fields["rounds"])
+                except ValueError:
+                    error = _("Please enter a valid number.")
+                    continue
+                if not 1 <= rounds <= 10:
+                    error = _("Please enter a number between 1 and 10.")
+                    continue
+                return {"rounds": rounds, "difficulty": DIFFICULTIES[difficulty], "mode": MODES[mode][0],
+                        "player_name": fields["name"].strip()}
+            if key in (curses.KEY_UP, curses.KEY_BTAB):
+                focus = (focus - 1) % 4
+            elif key in (curses.KEY_DOWN, "\t"):
+                focus = (focus + 1) % 4
+            elif key in (curses.KEY_LEFT, curses.KEY_RIGHT) and focus in (1, 2):
+                step = 1 if key == curses.KEY_RIGHT else -1
+                if focus == 1:
+                    difficulty = (difficulty + step) % len(DIFFICULTIES)
+                else:
+                    mode = (mode + step) % len(MODES)
+            elif focus in (0, 3):
+                field = "rounds" if focus == 0 else "name"
+                if key in (curses.KEY_BACKSPACE, "\x7f", "\b"):
+                    fields[field] = fields[field][:-1]
+                elif isinstance(key, str) and key.isprintable():
+                    fields[field] += key
+
+    def play(self, rounds, difficulty="medium", mode="choice", player_name=""):
+        """
+        Plays one game of the chosen number of rounds.
+        :param rounds: Total number of rounds to play.
+        :param difficulty: Distractor tier, one of "easy", "medium" or "hard".
+        :param mode: "choice", "typed" or "reverse", as in the Tk app.
+        :param player_name: Optional name whose unseen questions are preferred.
+        """
+        profile = None
+        if player_name:
+            if player_name.lower() not in self.profiles:
+                self.profiles[player_name.lower()] = PlayerProfile.load(player_name)
+            profile = self.profiles[player_name.lower()]
+
+        deck = self.quiz_data.order_by_difficulty(self.quiz_data.draw_deck(rounds,
+                                                                           seen=profile.seen if profile else None))
+        num_rounds = min(rounds, len(deck))
+        score = 0
+        incorrect = self.catalog.template("Incorrect! The correct answer is {answer}.")
+        for round_count, index in enumerate(deck[:num_rounds]):
+            make_question = self.quiz_data.make_reverse_question if mode == "reverse" \
+                else self.quiz_data.make_question
+            question_data = make_question(index, difficulty)
+            if profile:
+                profile.seen.add(index)
+
+            answer = self.ask_question(question_data, round_count, num_rounds, score, mode)
+            if answer is None:
+                # CANCEL goes straight back to the menu
+                return
+
+            correct_option = question_data["options"][question_data["correct_index"]]
+            if mode == "typed" and correct_option in self.quiz_data.resolve_answer(answer):
+                answer = correct_option
+            if self.quiz_data.is_correct(question_data, answer):
+                score += 1
+                self.show_feedback(self.gettext("Correct!"), "correct")
+            else:
+                self.show_feedback(incorrect.format(answer=correct_option), "incorrect")
+            if profile:
+                profile.save()
+
+        self.result_log.record(uuid.uuid4().hex, mode, difficulty, num_rounds, score)
+        self.show_final_score(num_rounds, score)
+
+    def ask_question(self, question_data, round_count, num_rounds, score, mode):
+        """
+        Shows one question and waits for an answer.
+        :return: The chosen or typed answer, or None if the player cancelled.
+        """
+        _ = self.gettext
+        # The header only changes between questions, so it is formatted once rather than on every key
+        header = self.catalog.template("Question {number} of {total}").format(number=round_count + 1,
+                                                                              total=num_rounds)
+        score_line = self.catalog.template("Score: {score}").format(score=score)
+        typed = ""
+        while True:
+            lines = [
+                (header, "title"),
+                (score_line, "normal"),
+                ("", "normal"),
+                (question_data["question"], "normal"),
+                ("", "normal"),
+            ]
+            cursor = None
+            if mode == "typed":
+                lines.append((f"{_('Your answer:')} {typed}", "normal"))
+                cursor = (len(lines) - 1, len(lines[-1][0]))
+                suggestions = self.quiz_data.answer_trie.suggest(typed.strip()) if typed.strip() else []
+                lines.append((f"{_('Suggestions:')} " + ", ".join(suggestions), "help"))
+                lines.append(("", "normal"))
+                lines.append((_("Enter: answer   F1: help   Esc: cancel"), "help"))
+            else:
+                for i, option in enumerate(question_data["options"]):
+                    lines.append((f"  {i + 1}) {option}", "normal"))
+                lines.append(("", "normal"))
+                lines.append((_("1-4: answer   H: help   C: cancel"), "help"))
+            self.screen.draw(lines, cursor)
+
+            key = self.read_key()
+            if mode == "typed":
+                if key == "\x1b":
+                    return None
+                if key == curses.KEY_F1:
+                    self.show_help()
+                elif key in ("\n", "\r", curses.KEY_ENTER):
+                    if typed.strip():
+                        return typed
+                elif key in (curses.KEY_BACKSPACE, "\x7f", "\b"):
+                    typed = typed[:-1]
+                elif isinstance(key, str) and key.isprintable():
+                    typed += key
+            elif key in ("c", "C", "\x1b"):
+                return None
+            elif key in ("h", "H"):
+                self.show_help()
+            elif isinstance(key, str) and key.isdigit() and 1 <= int(key) <= len(question_data["options"]):
+                return question_data["options"][int(key) - 1]
+
+    def show_feedback(self, feedback_text, style):
+        """Shows whether the answer was right and waits for the next question."""
+        self.screen.draw([
+            (feedback_text, style),
+            ("", "normal"),
+            (self.gettext("Press Enter for the next question"), "help"),
+        ])
+        while self.read_key() not in ("\n", "\r", " ", curses.KEY_ENTER):
+            pass
+
+    def show_help(self):
+        """Shows the help text until any key is pressed."""
+        self.screen.draw([
+            (self.gettext("This is a quiz about young animals. Select your answer from the options."), "normal"),
+            ("", "normal"),
+            (self.gettext("Press any key to dismiss"), "help"),
+        ])
+        self.read_key()
+
+    def show_final_score(self, num_rounds, score):
+        """Shows the final score and waits before returning to the menu."""
+        self.screen.draw([
+            (self.catalog.text("End of {rounds} rounds. Your final score is {score}", rounds=num_rounds, score=score),
+             "title"),
+            ("", "normal"),
+            (self.gettext("Press Enter to play again"), "help"),
+        ])
+        while self.read_key() not in ("\n", "\r", curses.KEY_ENTER):
+            pass
+
+    def show_browse(self):
+        """Lists animals and their young-names, filtered by the typed text, until Esc is pressed."""
+        _ = self.gettext
+        count_template = self.catalog.template("{count} animals")
+        query = ""
+        first_row = 0
+        while True:
+            height, _ = self.window.getmaxyx()
+            visible = max(1, height - 4)
+            rows = self.quiz_data.get_search_index().search(query)
+            first_row = max(0, min(first_row, len(rows) - visible))
+            lines = [(f"{_('Search:')} {query}", "title"), (count_template.format(count=len(rows)), "help")]
+            for position in range(first_row, min(first_row + visible, len(rows))):
+                question = self.quiz_data.questions[rows[position]]
+                lines.append((f"  {question['animal']:<24}{question['answer']}", "normal"))
+            lines.append((_("Type to filter   Up/Down/PgUp/PgDn: scroll   Esc: back"), "help"))
+            self.screen.draw(lines, (0, len(lines[0][0])))
+
+            key = self.read_key()
+            if key == "\x1b":
+                return
+            if key == curses.KEY_UP:
+                first_row -= 1
+            elif key == curses.KEY_DOWN:
+                first_row += 1
+            elif key == curses.KEY_PPAGE:
+                first_row -= visible
+            elif key == curses.KEY_NPAGE:
+                first_row += visible
+            elif key in (curses.KEY_BACKSPACE, "\x7f", "\b"):
+                query, first_row = query[:-1], 0
+            elif isinstance(key, str) and key.isprintable():
+                query, first_row = query + key, 0
+
+
+def main(window, quiz_data):
+    """Runs the terminal quiz inside curses.wrapper."""
+    window.keypad(True)
+    TerminalQuiz(window, quiz_data).run()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Young Animal Quiz for text terminals.")
+    parser.add_argument("--bank", default="animals_young_only.csv", help="CSV file of animals and young-names")
+    parser.add_argument("--difficulty-table", help="item_analytics.py output used to order questions")
+    parser.add_argument("--locale", help="language for the quiz, e.g. es (compiled catalogs are in locales/)")
+    args = parser.parse_args()
+    # Make Esc respond immediately instead of waiting a second for an escape sequence
+    os.environ.setdefault("ESCDELAY", "25")
+    # Load before curses takes over the terminal so any loading errors stay readable
+    curses.wrapper(main, QuizData(args.bank, difficulty_file=args.difficulty_table,
+                                  catalog=load_catalog(args.locale)))
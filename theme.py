@@ -0,0 +1,151 @@
+import tkinter as tk
+import tkinter.font as tkfont
+
+# Font roles: family, size and style for each theme
+FONTS = {
+    "standard": {
+        "title": ("Helvetica", 16, "bold"),
+        "heading": ("Helvetica", 14, "bold"),
+        "large": ("Helvetica", 14, "normal"),
+        "body": ("Helvetica", 12, "normal"),
+        "italic": ("Helvetica", 12, "italic"),
+        "small": ("Helvetica", 10, "normal"),
+    },
+    "high_contrast": {
+        "title": ("Helvetica", 18, "bold"),
+        "heading": ("Helvetica", 16, "bold"),
+        "large": ("Helvetica", 16, "bold"),
+        "body": ("Helvetica", 14, "bold"),
+        "italic": ("Helvetica", 14, "bold italic"),
+        "small": ("Helvetica", 12, "bold"),
+    },
+}
+
+# Colour roles for each theme
+PALETTES = {
+    "standard": {
+        "background": "#F0F4C3",
+        "text": "#000000",
+        "field": "#FFFFFF",
+        "help_background": "#DAE8FC",
+        "error": "#FF0000",
+        "countdown": "#C62828",
+        "button_text": "#000000",
+        "option": "#FFCC80",
+        "help": "#90CAF9",
+        "cancel": "#F48FB1",
+        "go": "#AED581",
+        "next": "#C2C2C2",
+        "correct": "#CDE777",
+        "incorrect": "#E76C6C",
+    },
+    "high_contrast": {
+        "background": "#000000",
+        "text": "#FFFFFF",
+        "field": "#000000",
+        "help_background": "#000000",
+        "error": "#FF6E6E",
+        "countdown": "#FFFF00",
+        "button_text": "#000000",
+        "option": "#FFFF00",
+        "help": "#00FFFF",
+        "cancel": "#FF80FF",
+        "go": "#00FF00",
+        "next": "#FFFFFF",
+        "correct": "#00FF00",
+        "incorrect": "#FF6E6E",
+    },
+}
+
+# Colour roles for widgets that are not given their own, by Tk widget class and option name.
+# These also fill the option database, so new widgets pick them up without any arguments.
+DEFAULT_ROLES = {
+    "Frame": {"background": "background"},
+    "Label": {"background": "background", "foreground": "text"},
+    "Radiobutton": {"background": "background", "foreground": "text", "activeBackground": "background",
+                    "activeForeground": "text", "selectColor": "field"},
+    "Checkbutton": {"background": "background", "foreground": "text", "activeBackground": "background",
+                    "activeForeground": "text", "selectColor": "field"},
+    "Button": {"background": "go", "foreground": "button_text", "activeForeground": "button_text"},
+    "Entry": {"background": "field", "foreground": "text", "insertBackground": "text"},
+    "Listbox": {"background": "field", "foreground": "text"},
+    "Canvas": {"background": "field"},
+}
+
+
+class Theme:
+    """
+    Named fonts, colours and option-database defaults shared by every screen.
+    Fonts are Tk named fonts, so widgets refer to them by name and pick up changes on their own;
+    switching themes reconfigures the fonts and recolours the live widgets in one pass.
+    """
+
+    def __init__(self, root, name="standard"):
+        """
+        Initializes the Theme and creates its named fonts.
+        :param root: The main tkinter root window.
+        :param name: One of the keys of FONTS and PALETTES.
+        """
+        self.root = root
+        self.name = name
+        self.colours = PALETTES[name]
+        self.fonts = {role: tkfont.Font(root, name=f"quiz_{role}") for role in FONTS[name]}
+        self.measurements = {}  # (font role, text) -> width in pixels
+        self.apply(name)
+
+    def font(self, role):
+        """Returns the Tk name of a font role, e.g. "quiz_body"."""
+        return f"quiz_{role}"
+
+    def apply(self, name):
+        """Switches to another theme: reconfigures the fonts, the option database and every live widget."""
+        self.name = name
+        self.colours = PALETTES[name]
+        for role, (family, size, style) in FONTS[name].items():
+            self.fonts[role].configure(family=family, size=size, weight="bold" if "bold" in style else "normal",
+                                       slant="italic" if "italic" in style else "roman")
+        self.measurements.clear()
+
+        self.root.option_clear()
+        self.root.option_add("*Font", self.font("body"))
+        self.root.option_add("*Button.relief", "flat")
+        self.root.option_add("*Canvas.highlightThickness", 0)
+        for widget_class, roles in DEFAULT_ROLES.items():
+            for option, role in roles.items():
+                self.root.option_add(f"*{widget_class}.{option}", self.colours[role])
+        self.root.configure(bg=self.colours["background"])
+        self.recolour(self.root)
+
+    def recolour(self, widget):
+        """Recolours a widget and everything inside it from the current palette."""
+        for child in widget.winfo_children():
+            roles = getattr(child, "theme_roles", None) or DEFAULT_ROLES.get(child.winfo_class(), {})
+            if roles:
+                child.configure(**{option.lower(): self.colours[role] for option, role in roles.items()})
+            if isinstance(child, tk.Canvas):
+                # Canvas text is drawn in the text colour
+                child.itemconfigure("all", fill=self.colours["text"])
+            self.recolour(child)
+
+    def colour(self, widget, **roles):
+        """
+        Colours a widget from palette roles and remembers them for theme switches.
+        :param roles: Option names mapped to colour roles, e.g. background="option".
+        :return: The widget, so creation and gridding can be chained.
+        """
+        widget.theme_roles = dict(DEFAULT_ROLES.get(widget.winfo_class(), {}), **roles)
+        widget.configure(**{option.lower(): self.colours[role] for option, role in widget.theme_roles.items()})
+        return widget
+
+    def button(self, parent, role, **options):
+        """Creates a button coloured from a palette role, e.g. "help" or "cancel"."""
+        button = tk.Button(parent, **options)
+        return self.colour(button, background=role, activeBackground=role)
+
+    def measure(self, text, role="body"):
+        """Returns the width of text in pixels in a font role, measuring each text only once per theme."""
+        key = (role, text)
+        width = self.measurements.get(key)
+        if width is None:
+            width = self.measurements[key] = self.fonts[role].measure(text)
+        return width
@@ -0,0 +1,162 @@
+import argparse
+import csv
+import html
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from quiz_data import QuizData
+
+# Prime larger than any bank, so it shares no factor with the number of possible decks
+RANK_STRIDE = 1_000_000_007
+OPTION_LETTERS = "abcd"
+
+# Each worker process loads the bank once and keeps it here
+worker_quiz_data = None
+
+
+def count_decks(bank_size, size):
+    """Returns how many distinct ordered decks of size questions a bank can produce."""
+    return math.perm(bank_size, size)
+
+
+def unrank_deck(rank, bank_size, size):
+    """
+    Turns a rank in [0, count_decks) into its own ordered deck of question indexes.
+    This is a Fisher-Yates shuffle driven by the digits of rank, with swaps kept in a
+    dict so it costs O(size) even for very large banks. Different ranks give different decks.
+    """
+    swaps = {}
+    deck = []
+    for position in range(size):
+        rank, digit = divmod(rank, bank_size - position)
+        pick = position + digit
+        deck.append(swaps.get(pick, pick))
+        swaps[pick] = swaps.get(position, position)
+    return deck
+
+
+def paper_rank(paper, first_rank, total):
+    """Spreads paper numbers over the deck ranks; paper numbers 1 to total all get distinct ranks."""
+    return (first_rank + paper * RANK_STRIDE) % total
+
+
+def load_worker_bank(csv_file, seed):
+    """Process pool initializer: loads the question bank once per worker."""
+    global worker_quiz_data
+    # Large banks draw distractor candidates from this rng, so every worker builds the batch seed's tiers
+    worker_quiz_data = QuizData(csv_file, rng=random.Random(seed))
+
+
+def render_text(paper, questions):
+    """Renders one paper as plain text."""
+    lines = [f"Young Animal Quiz - Paper {paper}", "", "Name: ______________________", ""]
+    for number, question in enumerate(questions, 1):
+        lines.append(f"{number}. {question['question']}")
+        lines.append("   " + "   ".join(f"{letter}) {option}" for letter, option in
+                                         zip(OPTION_LETTERS, question["options"])))
+        lines.append("")
+    return "\n".join(lines)
+
+
+def render_html(paper, questions):
+    """Renders one paper as a printable HTML page."""
+    parts = [f"<!DOCTYPE html><html><head><meta charset=\"utf-8\"><title>Paper {paper}</title></head><body>",
+             f"<h1>Young Animal Quiz - Paper {paper}</h1><p>Name: ______________________</p><ol>"]
+    for question in questions:
+        options = "".join(f"<li>{html.escape(option)}</li>" for option in question["options"])
+        parts.append(f"<li><p>{html.escape(question['question'])}</p><ol type=\"a\">{options}</ol></li>")
+    parts.append("</ol></body></html>")
+    return "".join(parts)
+
+
+def generate_papers(job):
+    """
+    Worker task: generates, renders and writes a run of papers.
+    :param job: Tuple of (first paper, last paper + 1, settings dict).
+    :return: Answer key rows (paper, question, animal, letter, answer) for the run.
+    """
+    start, stop, settings = job
+    quiz_data = worker_quiz_data
+    bank_size = len(quiz_data.questions)
+    make_question = quiz_data.make_reverse_question if settings["mode"] == "reverse" else quiz_data.make_question
+    render = render_html if settings["format"] == "html" else render_text
+    extension = "html" if settings["format"] == "html" else "txt"
+
+    key_rows = []
+    for paper in range(start, stop):
+        rank = paper_rank(paper, settings["first_rank"], settings["total"])
+        # Options are shuffled from a per-paper seed, so a paper can be regenerated on its own
+        rng = random.Random(settings["seed"] * RANK_STRIDE + paper)
+        deck = unrank_deck(rank, bank_size, settings["questions"])
+        questions = [make_question(index, settings["difficulty"], rng) for index in deck]
+
+        with open(os.path.join(settings["out"], f"paper_{paper:05d}.{extension}"), "w", encoding="utf-8") as file:
+            file.write(render(paper, questions))
+        for number, (index, question) in enumerate(zip(deck, questions), 1):
+            key_rows.append((paper, number, quiz_data.questions[index]["animal"],
+                             OPTION_LETTERS[question["correct_index"]],
+                             question["options"][question["correct_index"]]))
+    return key_rows
+
+
+def generate_batch(csv_file, papers, questions=10, out="worksheets", paper_format="text", difficulty="medium",
+                   mode="choice", seed=None, workers=None, chunk_size=250):
+    """
+    Generates a batch of distinct printable papers and a combined answer key.
+    :param csv_file: Question bank to draw from.
+    :param papers: Number of papers to generate.
+    :param questions: Questions per paper.
+    :param out: Output folder; papers and answer_key.csv are written here.
+    :param paper_format: "text" or "html".
+    :param difficulty: Distractor tier, one of "easy", "medium" or "hard".
+    :param mode: "choice" or "reverse".
+    :param seed: Batch seed; the same seed regenerates the same batch.
+    :param workers: Number of worker processes (default: one per core).
+    :param chunk_size: Papers per worker task.
+    :return: Papers generated per second.
+    """
+    seed = random.randrange(2 ** 32) if seed is None else seed
+    # Loading the bank here also caches its distractor tiers before the workers load it
+    bank_size = len(QuizData(csv_file, rng=random.Random(seed)).questions)
+    if not 1 <= questions <= bank_size:
+        raise ValueError(f"Questions per paper must be between 1 and {bank_size}.")
+    total = count_decks(bank_size, questions)
+    if papers > total:
+        raise ValueError(f"The bank only has {total} distinct question orders for {questions} questions.")
+
+    settings = {"questions": questions, "format": paper_format, "difficulty": difficulty, "mode": mode,
+                "seed": seed, "first_rank": random.Random(seed).randrange(total), "total": total, "out": out}
+    os.makedirs(out, exist_ok=True)
+    # Papers are numbered from 1; any paper numbers up to total still get distinct ranks
+    jobs = [(start, min(start + chunk_size, papers + 1), settings) for start in range(1, papers + 1, chunk_size)]
+
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=load_worker_bank, initargs=(csv_file, seed)) as pool, \
+            open(os.path.join(out, "answer_key.csv"), "w", newline="", encoding="utf-8") as key_file:
+        writer = csv.writer(key_file)
+        writer.writerow(["paper", "question", "animal", "letter", "answer"])
+        # Results arrive in paper order, so the key is streamed out as each run finishes
+        for key_rows in pool.map(generate_papers, jobs):
+            writer.writerows(key_rows)
+    return papers / (time.perf_counter() - started)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate printable Young Animal Quiz papers with answer keys.")
+    parser.add_argument("papers", type=int, help="number of papers to generate")
+    parser.add_argument("--bank", default="animals_young_only.csv", help="CSV file of animals and young-names")
+    parser.add_argument("--questions", type=int, default=10, help="questions per paper")
+    parser.add_argument("--out", default="worksheets", help="output folder")
+    parser.add_argument("--format", choices=("text", "html"), default="text", help="paper format")
+    parser.add_argument("--difficulty", choices=("easy", "medium", "hard"), default="medium")
+    parser.add_argument("--mode", choices=("choice", "reverse"), default="choice")
+    parser.add_argument("--seed", type=int, help="batch seed for reproducible papers")
+    parser.add_argument("--workers", type=int, help="worker processes (default: one per core)")
+    args = parser.parse_args()
+
+    rate = generate_batch(args.bank, args.papers, args.questions, args.out, args.format, args.difficulty,
+                          args.mode, args.seed, args.workers)
+    print(f"Generated {args.papers} papers in '{args.out}' ({rate:.0f} papers/sec).")